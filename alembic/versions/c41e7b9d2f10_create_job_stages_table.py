@@ -0,0 +1,54 @@
+"""create job_stages table
+
+Revision ID: c41e7b9d2f10
+Revises: 6a9f63cbea8c
+Create Date: 2026-10-19 09:12:04.118230
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e7b9d2f10"
+down_revision: Union[str, None] = "6a9f63cbea8c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("jobs", sa.Column("audio_duration", sa.Float(), nullable=True))
+    op.create_table(
+        "job_stages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.String(), nullable=False),
+        sa.Column("task_id", sa.String(), nullable=False),
+        sa.Column("stage", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("worker", sa.String(), nullable=True),
+        sa.Column("audio_duration", sa.Float(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("task_id"),
+    )
+    op.create_index(
+        "ix_job_stages_job_id_started_at",
+        "job_stages",
+        ["job_id", "started_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_job_stages_job_id_started_at", table_name="job_stages")
+    op.drop_table("job_stages")
+    op.drop_column("jobs", "audio_duration")
@@ -0,0 +1,38 @@
+"""add job limits to users and api_tokens
+
+Revision ID: d7e2a4c91b53
+Revises: c41e7b9d2f10
+Create Date: 2026-10-19 14:03:27.551902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e2a4c91b53"
+down_revision: Union[str, None] = "c41e7b9d2f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("max_active_jobs", sa.Integer(), nullable=True))
+    op.add_column("users", sa.Column("share_weight", sa.Float(), nullable=True))
+    op.add_column(
+        "api_tokens", sa.Column("max_active_jobs", sa.Integer(), nullable=True)
+    )
+    op.create_index(
+        "ix_jobs_user_id_status", "jobs", ["user_id", "status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_jobs_user_id_status", table_name="jobs")
+    op.drop_column("api_tokens", "max_active_jobs")
+    op.drop_column("users", "share_weight")
+    op.drop_column("users", "max_active_jobs")
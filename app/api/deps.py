@@ -3,7 +3,7 @@ API dependencies.
 """
 
 from datetime import datetime
-from typing import Annotated, Optional, cast
+from typing import Annotated, Optional, Tuple, cast
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import APIKeyHeader
@@ -62,9 +62,8 @@ AuthUserDep = Annotated[User, Depends(get_current_user)]
 api_key_header = APIKeyHeader(name="X-API-Token", auto_error=False)
 
 
-async def get_current_user_token(
-    db: DBSessionDep, api_token: str = Depends(api_key_header)
-) -> User:
+async def get_api_token(db: AsyncSession, api_token: Optional[str]) -> APIToken:
+    """Look up an API token and its user."""
     if not api_token:
         raise HTTPException(status_code=401, detail="API token missing")
 
@@ -76,7 +75,32 @@ async def get_current_user_token(
     token_record = cast(Optional[APIToken], result.scalar_one_or_none())
     if not token_record:
         raise HTTPException(status_code=401, detail="Invalid API token")
+    return token_record
+
+
+async def get_current_user_token(
+    db: DBSessionDep, api_token: str = Depends(api_key_header)
+) -> User:
+    token_record = await get_api_token(db, api_token)
     return cast(User, token_record.user)
 
 
 TokenUserDep = Annotated[User, Depends(get_current_user_token)]
+
+
+async def get_submitter(
+    db: DBSessionDep,
+    token: str = Depends(oauth2_scheme),
+    api_token: str = Depends(api_key_header),
+) -> Tuple[User, Optional[APIToken]]:
+    """User submitting jobs, by API token if given and by JWT otherwise.
+
+    The token is returned too, since job limits can be set per token.
+    """
+    if api_token:
+        token_record = await get_api_token(db, api_token)
+        return cast(User, token_record.user), token_record
+    return await get_current_user(db, token), None
+
+
+SubmitterDep = Annotated[Tuple[User, Optional[APIToken]], Depends(get_submitter)]
@@ -2,9 +2,18 @@
 Health check endpoints.
 """
 
-from fastapi import APIRouter, status
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import APIRouter, Response, status
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
-from typing import Dict
+from sqlalchemy import text
+
+from app.api.deps import DBSessionDep
+from app.core.config import settings
+from app.services.cache import REDIS_CACHE, S3_CACHE
 
 router = APIRouter()
 
@@ -14,9 +23,52 @@ class HealthStatusOutput(BaseModel):
     status: str
 
 
+class ReadinessOutput(BaseModel):
+
+    status: str
+    checks: Dict[str, str]  # "ok" or the error of each dependency
+
+
 @router.get(
     "/health", status_code=status.HTTP_200_OK, response_model=HealthStatusOutput
 )
 async def health_check() -> Dict:
-    """Health check endpoint."""
+    """
+    Liveness probe: the process serves requests. Dependencies are not
+    checked, an unreachable database or S3 must not restart the API.
+    """
     return {"status": "healthy"}
+
+
+async def _check(call: Callable[[], Awaitable[Any]]) -> str:
+    try:
+        await asyncio.wait_for(call(), timeout=settings.READINESS_TIMEOUT)
+    except asyncio.TimeoutError:
+        return "timeout"
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return "ok"
+
+
+@router.get("/ready", response_model=ReadinessOutput)
+async def readiness_check(db: DBSessionDep, response: Response) -> Dict[str, Any]:
+    """
+    Readiness probe: the database, Redis and the S3 bucket are reachable.
+    Answers ``503 Service Unavailable`` until they all are, and creates the
+    bucket if the startup could not.
+    """
+    checks = {
+        "database": await _check(lambda: db.execute(text("SELECT 1"))),
+        "redis": await _check(lambda: run_in_threadpool(REDIS_CACHE.cache.ping)),
+        "s3": await _check(lambda: run_in_threadpool(S3_CACHE.ensure_bucket)),
+    }
+    ready = all(result == "ok" for result in checks.values())
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if ready else "unavailable", "checks": checks}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics of the API process."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
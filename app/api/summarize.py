@@ -1,17 +1,47 @@
 import jsonpickle
-import librosa
-import io
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 import uuid
 
-from fastapi import APIRouter, status, HTTPException, UploadFile
-from typing import Dict, Any
-from app.services.cache import REDIS_CACHE, S3_CACHE
+import json
+from fastapi import APIRouter, Header, Query, status, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from typing import AsyncIterator, Dict, Any, Iterator, Literal, Optional, Tuple
+from app.core.config import settings
+from app.services.cache import REDIS_CACHE, S3_CACHE, job_key
+from app.services.events import iter_job_events
+from app.services.audio import probe_duration
+from app.services.events import JOB_EVENTS
+from app.services.metrics import (
+    JOBS_CANCELLED,
+    JOBS_REJECTED,
+    UPLOAD_AUDIO_SECONDS,
+    UPLOAD_BYTES,
+    record_cache,
+)
+from app.services.pipeline import (
+    PIPELINE,
+    build_pipeline,
+    cancel_job,
+    dispatch,
+    is_streaming,
+    job_task_ids,
+    purge_job_artifacts,
+    stage_outputs,
+)
+from app.services.profiling import enable_job_profiling, profile_urls
+from app.services.scheduler import SCHEDULER
 from app.services.celery_worker import c_worker
-from app.services.summarize.utils import DocumentGenerator
-from app.api.deps import AuthUserDep, DBSessionDep
-from app.models.job import Job
+from app.services.summarize.exports import EXPORT_MEDIA_TYPES, ReportExporter
+from app.services.summarize.render_pool import RENDER_POOL, RenderQueueFull
+from app.api.deps import AuthUserDep, DBSessionDep, SubmitterDep
+from app.db.session import sessionmanager
+from app.models.job import Job, JobStage
+from app.models.user import APIToken, User
+from app.schemas.job import JobStageOut, JobStatusOut
+from sqlalchemy import func
 from sqlalchemy.future import select
-from celery import chord, signature
 from celery.result import AsyncResult
 
 from app.utils.logging import setup_logging
@@ -21,27 +51,93 @@ setup_logging()
 logger = structlog.get_logger("fastapi-app")
 
 router = APIRouter()
-DOC_GEN = DocumentGenerator()
+# Jobs holding a place in the per-user limit
+ACTIVE_JOB_STATUSES = ("pending", "running")
+EXPORTER = ReportExporter(REDIS_CACHE, RENDER_POOL.render)
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+@contextmanager
+def render_errors() -> Iterator[None]:
+    """
+    Translate report rendering pool errors to HTTP errors.
+    """
+    try:
+        yield
+    except RenderQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many reports are being rendered, retry later.",
+            headers={"Retry-After": "10"},
+        )
+    except TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Report rendering timed out.")
+
+
+async def enforce_job_limit(db: Any, user: User, api_token: Optional[APIToken] = None) -> None:
+    """
+    Refuse a new job of a user who already has too many pending or running.
+
+    The limit of the API token used, if any, overrides the limit of the user,
+    which overrides ``USER_MAX_ACTIVE_JOBS``. Jobs older than the artifact TTL
+    are not counted, they cannot progress any more.
+    """
+    limits = (api_token.max_active_jobs if api_token else None, user.max_active_jobs)
+    limit = next((value for value in limits if value is not None), settings.USER_MAX_ACTIVE_JOBS)
+    if not limit:
+        return
+    since = datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_ARTIFACT_TTL)
+    active = (
+        await db.execute(
+            select(func.count(Job.id)).filter(
+                Job.user_id == user.id,
+                Job.status.in_(ACTIVE_JOB_STATUSES),
+                Job.created_at >= since,
+            )
+        )
+    ).scalar_one()
+    if active < limit:
+        return
+
+    retry_after = await run_in_threadpool(SCHEDULER.retry_after)
+    JOBS_REJECTED.labels(reason="user_limit").inc()
+    logger.warning("job_rejected", user_id=user.id, active_jobs=active, limit=limit, retry_after=retry_after)
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"{active} jobs are still pending or running, the limit is {limit}.",
+        headers={"Retry-After": str(retry_after)},
+    )
 
 
 @router.post("/query", status_code=status.HTTP_200_OK, summary="Upload audio for summarization")
-async def query(file: UploadFile , user: AuthUserDep, db: DBSessionDep
+async def query(file: UploadFile , submitter: SubmitterDep, db: DBSessionDep,
+    profile: bool = Query(False, description="Profile every stage, reports are linked from the job status"),
 ) -> Dict[str, str]:
     """
-    Accepts an audio file and submits it for summarization.
+    Accepts an audio file and submits it for summarization. Users over their
+    limit of active jobs get a ``429 Too Many Requests`` with ``Retry-After``.
     """
+    user, api_token = submitter
+    await enforce_job_limit(db, user, api_token)
     audio_bytes = await file.read()
 
     try:
-        _, _ = librosa.load(io.BytesIO(audio_bytes))
+        # Read from the header, the audio is decoded once, by the workers
+        duration = await run_in_threadpool(probe_duration, audio_bytes)
     except Exception:
         return {"status": "Invalid audio file"}
     
     size_mb = len(audio_bytes) / (1024 * 1024)
+    UPLOAD_BYTES.observe(len(audio_bytes))
+    UPLOAD_AUDIO_SECONDS.observe(duration)
+    # Long recordings are summarized window by window while transcription runs
+    streaming = is_streaming(duration)
     logger.info(
         "job_request",
         user_id=user.id,
         audio_size=f"{size_mb:.2f} MB",
+        duration=round(duration, 1),
+        streaming=streaming,
     )
     job_id = str(uuid.uuid4())
     audio_key = f"user_{user.id}/{job_id}/audio.wav"
@@ -51,24 +147,21 @@ async def query(file: UploadFile , user: AuthUserDep, db: DBSessionDep
         id=job_id,
         user_id=user.id,
         audio_key=audio_key,
-        report_key=report_key
+        report_key=report_key,
+        audio_duration=duration,
     )
     bytes_key = S3_CACHE.save(audio_bytes, job.audio_key)
-    
-    task = chord(
-        [
-            signature(
-                "app.services.transcribe.tasks.transcribe",
-                kwargs={"bytes_key": bytes_key}
-            ),
-            signature(
-                "app.services.diarize.tasks.diarize",
-                kwargs={"bytes_key": bytes_key}
-            )
-        ],
-        signature("app.services.conversation.tasks.create_conversation") |
-        signature("app.services.summarize.tasks.summarize_text")
-    ).delay()
+    # Committed before dispatch so that workers can record stages against it
+    db.add(job)
+    await db.commit()
+    if profile:
+        await run_in_threadpool(enable_job_profiling, job_id)
+
+    # Queued shortest job first within the user's share, dispatched once an audio slot is free
+    pipeline = build_pipeline(job_id, bytes_key, report_key, streaming)
+    task = await run_in_threadpool(
+        SCHEDULER.submit, job_id, pipeline, duration, user.id, user.share_weight
+    )
 
     logger.info(
         "job_submit",
@@ -81,23 +174,16 @@ async def query(file: UploadFile , user: AuthUserDep, db: DBSessionDep
     )
 
     job.task_id = task.id
-    db.add(job)
     await db.commit()
     await db.refresh(job)
     
     
     return {"id": job_id, "status": task.state}
 
-@router.get("/export_pdf")
-async def export_pdf(job_id: str, user: AuthUserDep, db: DBSessionDep) -> Dict[str, Any]:
+async def get_finished_job(job_id: str, user: Any, db: Any) -> Tuple[Job, AsyncResult, str]:
     """
-    Generates a PDF 
+    Look up a finished job of the user and the cache key of its result.
     """
-    logger.info(
-        "export_request",
-        user_id=user.id,
-        job_id=job_id,
-    )
     result = await db.execute(select(Job).filter(Job.id == job_id, Job.user_id == user.id))
     job = result.scalar_one_or_none()
     if not job:
@@ -110,12 +196,29 @@ async def export_pdf(job_id: str, user: AuthUserDep, db: DBSessionDep) -> Dict[s
             detail=f"Task state is still {task.state} or doesn't exist."
         )
 
-    key = task.get()
-    result = REDIS_CACHE.load(key)
-    pdf_bytes = DOC_GEN.generate_pdf(result)
-    
-    key = S3_CACHE.save(pdf_bytes, job.report_key)
-    url = S3_CACHE.get_presigned_url(key, expires_in=3600) 
+    return job, task, task.get()
+
+
+@router.get("/export_pdf")
+async def export_pdf(job_id: str, user: AuthUserDep, db: DBSessionDep) -> Dict[str, Any]:
+    """
+    Generates a PDF 
+    """
+    logger.info(
+        "export_request",
+        user_id=user.id,
+        job_id=job_id,
+    )
+    job, task, key = await get_finished_job(job_id, user, db)
+    # Already rendered by the report stage of the pipeline
+    prerendered = REDIS_CACHE.get(job_key(job.id, "report")) == key
+    record_cache("report", hit=prerendered)
+    if not prerendered:
+        result = REDIS_CACHE.load(key)
+        with render_errors():
+            pdf_bytes = await RENDER_POOL.render_async(result)
+        S3_CACHE.save(pdf_bytes, job.report_key)
+    url = S3_CACHE.get_presigned_url(job.report_key, expires_in=3600) 
     logger.info(
         "export_success",
         user_id=user.id,
@@ -124,4 +227,208 @@ async def export_pdf(job_id: str, user: AuthUserDep, db: DBSessionDep) -> Dict[s
         input_key=job.audio_key,
         output_key=job.report_key,
     )
-    return {"status": task.state, "url": url}
\ No newline at end of file
+    return {"status": task.state, "url": url}
+
+
+@router.get("/export", summary="Export a result as Markdown, JSON, HTML or PDF")
+async def export(
+    job_id: str,
+    user: AuthUserDep,
+    db: DBSessionDep,
+    fmt: Literal["md", "json", "html", "pdf"] = Query("pdf", alias="format"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+) -> Response:
+    """
+    Streams a report rendered from the stored result. Exports are cached per
+    job, and a matching ``If-None-Match`` gets a ``304 Not Modified``.
+    """
+    job, _, result_key = await get_finished_job(job_id, user, db)
+    entry = EXPORTER.cached(job.id, fmt, result_key)
+    cache_hit = entry is not None
+    record_cache("export", hit=cache_hit)
+    if not cache_hit:
+        result = REDIS_CACHE.load(result_key)
+        with render_errors():
+            entry = await run_in_threadpool(EXPORTER.render, job.id, fmt, result_key, result)
+    logger.info("export_format", user_id=user.id, job_id=job.id, format=fmt, cache_hit=cache_hit)
+
+    headers = {"ETag": entry["etag"], "Cache-Control": "private, must-revalidate"}
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or entry["etag"] in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body: bytes = entry["body"]
+    headers["Content-Length"] = str(len(body))
+    headers["Content-Disposition"] = f'inline; filename="{job.id}.{fmt}"'
+
+    def chunks() -> Iterator[bytes]:
+        for start in range(0, len(body), EXPORT_CHUNK_SIZE):
+            yield body[start:start + EXPORT_CHUNK_SIZE]
+
+    return StreamingResponse(chunks(), media_type=EXPORT_MEDIA_TYPES[fmt], headers=headers)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusOut, summary="Get job status and stage timings")
+async def job_status(job_id: str, user: AuthUserDep, db: DBSessionDep) -> JobStatusOut:
+    """
+    Returns the persisted status of a job, the timings of its stages and
+    its critical path, read from the database in a single query.
+    """
+    rows = (
+        await db.execute(
+            select(Job, JobStage)
+            .outerjoin(JobStage, JobStage.job_id == Job.id)
+            .filter(Job.id == job_id, Job.user_id == user.id)
+            .order_by(JobStage.started_at)
+        )
+    ).all()
+    if not rows:
+        raise HTTPException(404, "Job not found")
+
+    job = rows[0][0]
+    stages = [JobStageOut.model_validate(stage) for _, stage in rows if stage is not None]
+    # The last attempt of each stage, rows are ordered by start time
+    timings = {stage.stage: (stage.started_at, stage.finished_at) for stage in stages}
+    profiles = await run_in_threadpool(profile_urls, job.id)
+    return JobStatusOut(
+        id=job.id,
+        status=job.status,
+        audio_duration=job.audio_duration,
+        created_at=job.created_at,
+        stages=stages,
+        critical_path=PIPELINE.critical_path(timings),
+        profiles=profiles,
+    )
+
+
+@router.post("/jobs/{job_id}/retry", summary="Resume a failed job")
+async def retry_job(job_id: str, user: AuthUserDep, db: DBSessionDep) -> Dict[str, Any]:
+    """
+    Resumes a failed job from its first stage that did not complete. Stages
+    with a checkpointed output (e.g. transcription and diarization when the
+    summarization failed) are not run again.
+    """
+    result = await db.execute(select(Job).filter(Job.id == job_id, Job.user_id == user.id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(404, "Job not found")
+    failed = job.status == "failed" or (
+        job.status != "cancelled" and AsyncResult(job.task_id, app=c_worker).state == "FAILURE"
+    )
+    if not failed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status}, only failed jobs can be retried.",
+        )
+
+    completed = stage_outputs(job.id)
+    try:
+        pipeline = build_pipeline(
+            job.id, job.audio_key, job.report_key, is_streaming(job.audio_duration), completed
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job has no stage left to run.")
+    await enforce_job_limit(db, user)
+
+    # Committed before dispatch so that workers see the job running again
+    job.status = "pending"
+    await db.commit()
+    if "transcribe" in completed and "diarize" in completed:
+        task = await run_in_threadpool(dispatch, job.id, pipeline)
+    else:
+        task = await run_in_threadpool(
+            SCHEDULER.submit,
+            job.id,
+            pipeline,
+            job.audio_duration or 0.0,
+            user.id,
+            user.share_weight,
+        )
+    job.task_id = task.id
+    await db.commit()
+
+    logger.info("job_retry", user_id=user.id, job_id=job.id, task_id=task.id, completed=sorted(completed))
+    return {"id": job.id, "status": task.state, "completed_stages": sorted(completed)}
+
+
+@router.delete("/jobs/{job_id}", summary="Cancel a job")
+async def cancel(job_id: str, user: AuthUserDep, db: DBSessionDep) -> Dict[str, str]:
+    """
+    Cancels a pending or running job. Tasks that did not start are revoked,
+    running stages stop at their next safe point (transcript window,
+    diarization step, LLM token), and the audio and intermediate results
+    are deleted.
+    """
+    result = await db.execute(select(Job).filter(Job.id == job_id, Job.user_id == user.id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(404, "Job not found")
+    if job.status == "cancelled":
+        return {"id": job.id, "status": job.status}
+    if job.status in ("done", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is already {job.status}.",
+        )
+
+    previous_status = job.status
+    # Flagged first, so that tasks starting from now on stop immediately
+    await run_in_threadpool(cancel_job, job.id)
+    await run_in_threadpool(SCHEDULER.discard, job.id)
+    task_ids = await run_in_threadpool(job_task_ids, job.id) or [job.task_id]
+    await run_in_threadpool(c_worker.control.revoke, task_ids)
+    job.status = "cancelled"
+    await db.commit()
+
+    JOBS_CANCELLED.labels(status=previous_status).inc()
+    await run_in_threadpool(JOB_EVENTS.publish, job.id, "cancelled")
+    deleted = await run_in_threadpool(purge_job_artifacts, job.id, [job.audio_key, job.report_key])
+    logger.info(
+        "job_cancelled",
+        user_id=user.id,
+        job_id=job.id,
+        previous_status=previous_status,
+        revoked=len(task_ids),
+        deleted_keys=deleted,
+    )
+    return {"id": job.id, "status": job.status}
+
+
+@router.get("/jobs/{job_id}/events", summary="Stream partial results of a job")
+async def job_events(
+    job_id: str,
+    user: AuthUserDep,
+    db: DBSessionDep,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Relays the job event stream as Server-Sent Events: partial summary text,
+    each extracted topic/decision/action, then a final ``done`` event.
+    """
+    result = await db.execute(select(Job).filter(Job.id == job_id, Job.user_id == user.id))
+    if not result.scalar_one_or_none():
+        raise HTTPException(404, "Job not found")
+
+    async def job_status() -> Optional[str]:
+        # The request session is closed while the response streams
+        async with sessionmanager.session() as session:
+            return await session.scalar(select(Job.status).where(Job.id == job_id))
+
+    async def relay() -> AsyncIterator[str]:
+        events = iter_job_events(job_id, last_event_id or "0", job_status=job_status)
+        async for event_id, event, data in events:
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            # Terminal events made up from the job status have no stream id
+            event_line = f"id: {event_id}\n" if event_id else ""
+            yield f"{event_line}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    logger.info("events_request", user_id=user.id, job_id=job_id)
+    return StreamingResponse(
+        relay(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
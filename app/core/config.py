@@ -75,6 +75,88 @@ class Settings(BaseSettings):
             return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}-test"
         return f"{self.DB_ENGINE}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}-test"
 
+    # Audio decoding
+    AUDIO_RESAMPLE_QUALITY: str = "MQ"  # soxr quality: "QQ", "LQ", "MQ", "HQ" or "VHQ" (slowest)
+
+    # Streaming pipeline: long recordings are summarized window by window
+    # while later audio is still being transcribed
+    STREAMING_MIN_DURATION: int = 1800  # seconds of audio, 0 disables streaming
+    STREAMING_WINDOW_SECONDS: int = 300  # audio transcribed per window
+    STREAMING_POLL_SECONDS: int = 5  # wait between checks for diarization/windows
+    STREAMING_PARTIAL_WAIT: int = 120  # max wait for window summaries before redoing them
+    STREAMING_WAIT_FACTOR: float = 2.0  # max wait of a window for the diarization, x audio duration
+    JOB_ARTIFACT_TTL: int = 24 * 3600  # seconds intermediate job artifacts are kept
+
+    # Stage retries on transient errors (connections, timeouts)
+    STAGE_MAX_RETRIES: int = 3  # retries of the audio, conversation and report stages
+    LLM_MAX_RETRIES: int = 5  # retries of summarize_text
+    RETRY_BACKOFF: int = 10  # first retry delay in seconds, doubled on each retry
+    RETRY_BACKOFF_MAX: int = 600  # cap of the retry delay in seconds
+    CANCEL_POLL_SECONDS: float = 2.0  # how often a generating LLM call checks for cancellation
+
+    # Job scheduling: shortest job first, with aging
+    SCHEDULER_MAX_ACTIVE_JOBS: int = 2  # jobs in transcription/diarization at once, 0 disables
+    SCHEDULER_LEASE_SECONDS: int = 6 * 3600  # an admitted job silent this long frees its slot
+    SCHEDULER_RELEASE_INTERVAL: int = 60  # seconds between releases of expired slots by the API
+    SJF_DURATION_WEIGHT: float = 0.25  # queue seconds yielded per second of audio
+    USER_MAX_ACTIVE_JOBS: int = 3  # pending or running jobs per user, 0 disables; overridable per user/API token
+    ADMISSION_RETRY_AFTER_PER_JOB: int = 60  # Retry-After seconds per queued job per admission slot
+    ADMISSION_RETRY_AFTER_MAX: int = 3600  # cap of the Retry-After of a refused upload
+
+    # Summarization prompt encoding
+    LLM_NUM_CTX: int = 8192  # context window requested from Ollama
+    PROMPT_TOKEN_BUDGET: int = 6000  # max transcript tokens per LLM call
+    PROMPT_TOKEN_ENCODING: str = "cl100k_base"  # tiktoken encoding used for counting
+    PROMPT_TIME_RESOLUTION: int = 5  # timestamps are rounded down to this many seconds
+    PROMPT_MERGE_MAX_TOKENS: int = 12  # turns shorter than this join the previous line
+
+    # Summarization graph: ";" separates parallel branches, "," groups sections
+    SUMMARIZATION_SECTION_GROUPS: str = "summary;topics;decisions;actions"
+    SECTION_MAX_ATTEMPTS: int = 3
+
+    # LLM model routing: JSON list of tiers from the smallest model, e.g.
+    # [{"model": "qwen3:0.6b", "max_tokens": 3000, "max_speakers": 4}, {"model": "qwen3:1.7b"}]
+    LLM_MODEL_TIERS: str = ""  # empty routes everything to MODEL_NAME
+    LLM_ROUTING_PRESSURE_THRESHOLD: int = 4  # queued LLM calls considered as pressure
+    LLM_ROUTING_PRESSURE_FACTOR: float = 2.0  # tier limits multiplier under pressure
+
+    # LLM concurrency governor
+    LLM_MAX_INFLIGHT: int = 2  # concurrent requests to Ollama across all workers
+    LLM_QUEUE_ORDER: str = "fifo"  # "fifo" or "priority"
+    LLM_LEASE_SECONDS: int = 900  # a slot is released after this even if never freed
+    LLM_ACQUIRE_TIMEOUT: int = 3600  # seconds a call may wait for a slot
+    LLM_REQUEST_TIMEOUT: float = 600.0  # HTTP timeout of a single Ollama request
+    LLM_KEEPALIVE_CONNECTIONS: int = 4  # pooled keep-alive connections to Ollama
+
+    # Job event streams
+    JOB_EVENTS_TTL: int = 24 * 3600  # seconds events are kept after the last one
+    JOB_EVENTS_MAXLEN: int = 10000  # approximate cap of events per job
+    SUMMARY_STREAM_MIN_CHARS: int = 80  # new characters before a partial summary is sent
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL: int = 7 * 24 * 3600  # seconds
+
+    # PDF reports
+    PDF_BACKEND: str = "auto"  # "auto", "weasyprint" or "reportlab"
+    PDF_NATIVE_MIN_TURNS: int = 2000  # "auto" switches to reportlab from this many turns
+    PDF_FONT_PATH: str = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"  # reportlab Unicode font
+    PDF_BOLD_FONT_PATH: str = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+    RENDER_POOL_WORKERS: int = 2  # long-lived report rendering processes
+    RENDER_POOL_MAX_QUEUE: int = 8  # renders waiting for a process before 503
+    RENDER_TIMEOUT: int = 300  # seconds a single render may take
+    REPORT_PRERENDER: bool = False  # render the PDF as the last pipeline stage
+
+    # Prometheus
+    WORKER_METRICS_PORT: int = 9100  # metrics port of Celery workers, 0 disables
+
+    # Probes
+    READINESS_TIMEOUT: float = 2.0  # seconds each dependency check of /ready may take
+
+    # Profiling
+    PROFILE_STAGES: str = ""  # comma-separated stages profiled for every job, "all" for every stage
+    PROFILE_SAMPLE_INTERVAL: float = 0.01  # seconds between stack samples of profiled stages
+    PROFILE_TRACE_MEMORY: bool = True  # trace allocations of profiled stages with tracemalloc
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="allow")
 
@@ -18,7 +18,11 @@ from app.core.config import settings
 class DatabaseSessionManager:
     def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
         self._engine = create_async_engine(host, **engine_kwargs)
-        self._sessionmaker = async_sessionmaker(autocommit=False, bind=self._engine)
+        # Objects stay readable after commit, an expired attribute would need
+        # a lazy load, which async sessions cannot do implicitly
+        self._sessionmaker = async_sessionmaker(
+            autocommit=False, expire_on_commit=False, bind=self._engine
+        )
 
     async def close(self) -> None:
         if self._engine is None:
@@ -2,7 +2,7 @@
 Database base module.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -15,5 +15,30 @@ class Job(Base):
     task_id = Column(String, nullable=True)     # store Celery task ID
     audio_key = Column(String, nullable=True)  
     report_key = Column(String, nullable=True)  
-    status = Column(String, default="pending")  # optional: pending, done, failed
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    status = Column(String, default="pending")  # pending, running, done, failed, cancelled
+    audio_duration = Column(Float, nullable=True)  # seconds of audio
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Active jobs of a user are counted on every upload
+    __table_args__ = (Index("ix_jobs_user_id_status", "user_id", "status"),)
+
+
+class JobStage(Base):
+    """One Celery task of a job, recorded by the worker signal handlers."""
+
+    __tablename__ = "job_stages"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    task_id = Column(String, nullable=False, unique=True)  # retries keep the task id
+    stage = Column(String, nullable=False)  # e.g. transcribe, summarize_text
+    status = Column(String, nullable=False)  # started, retry, success, failure, cancelled
+    attempts = Column(Integer, nullable=False, default=1)
+    worker = Column(String, nullable=True)  # Celery worker hostname
+    audio_duration = Column(Float, nullable=True)  # seconds of audio of the job
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration = Column(Float, nullable=True)  # seconds spent in the last attempt
+    error = Column(String, nullable=True)
+
+    __table_args__ = (Index("ix_job_stages_job_id_started_at", "job_id", "started_at"),)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -10,6 +10,8 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    max_active_jobs = Column(Integer, nullable=True)  # None uses USER_MAX_ACTIVE_JOBS
+    share_weight = Column(Float, nullable=True)  # scheduler share, None is 1
     tokens = relationship("APIToken", back_populates="user")
 
 
@@ -19,5 +21,6 @@ class APIToken(Base):
     id = Column(Integer, primary_key=True, index=True)
     token = Column(String, unique=True, index=True, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    max_active_jobs = Column(Integer, nullable=True)  # None uses the user's limit
 
     user = relationship("User", back_populates="tokens")
@@ -0,0 +1,37 @@
+"""
+Job status schemas.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobStageOut(BaseModel):
+    """Schema for one pipeline stage of a job."""
+
+    stage: str
+    status: str
+    attempts: int
+    worker: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobStatusOut(BaseModel):
+    """Schema for job status response."""
+
+    id: str
+    status: str
+    audio_duration: Optional[float] = None
+    created_at: Optional[datetime] = None
+    stages: List[JobStageOut] = []
+    critical_path: List[str] = []  # stages the job waited on, in order
+    profiles: Dict[str, str] = {}  # presigned URLs of the stage profiles, by file name
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,12 +1,17 @@
 """
 langchain schemas for defining state and response format.
 """
+import operator
 from langgraph.graph import  MessagesState
 
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, create_model
+from typing import Annotated, Any, Dict, List, Optional, Sequence, Type
 from pydantic import BaseModel
 
+# Bump whenever the structured output schemas below change, so that cached
+# LLM responses produced with an older schema are not reused.
+SCHEMA_VERSION = 2
+
 class Turn(BaseModel):
     start: float = Field(..., description="Start time of the turn in seconds")
     end: float = Field(..., description="End time of the turn in seconds")
@@ -17,23 +22,54 @@ class Conversation(BaseModel):
     turns: List[Turn] = Field(..., description="List of turns in the transcript")
 
 class SummarizationState(MessagesState):
+    job_id: Optional[str]
+    model: str
+    chunks: List[str]
+    partials: List[Any]
+    aliases: Dict[str, str]
+    priority: int
+    context: str
+    reduce: bool
+    failed_sections: Annotated[List[str], operator.add]
+    last_attempt: bool
     summary: str
     topics: List[str]
     decisions: List[str]
     actions: List[str]
 
-class ItemFormatter(BaseModel):
+class ExtractedItem(BaseModel):
     """Structure of the extracted items."""
     text: str = Field(description="The key text of interest")
+
+class ItemFormatter(ExtractedItem):
+    """Extracted item grounded in the transcript."""
     start: float = Field(description="Moment when this item is mentioned")
     end: float = Field(description="Moment when it's no longer discussed")
 
 class SummarizationResponseFormatter(BaseModel):
     """Always structure and format the response to the user."""
     summary: str = Field(description="The summary of the provided text")
-    topics: List[ItemFormatter] = Field(description="The topics discussed in the text")
-    decisions: List[ItemFormatter] = Field(description="The decisions taken in the text")
-    actions: List[ItemFormatter] = Field(description="The action plan discussed in the text")
+    topics: List[ExtractedItem] = Field(description="The topics discussed in the text")
+    decisions: List[ExtractedItem] = Field(description="The decisions taken in the text")
+    actions: List[ExtractedItem] = Field(description="The action plan discussed in the text")
+
+SECTIONS = ("summary", "topics", "decisions", "actions")
+
+
+def section_schema(sections: Sequence[str]) -> Type[BaseModel]:
+    """Build a response schema restricted to some sections of the summarization."""
+    fields = {
+        name: (
+            SummarizationResponseFormatter.model_fields[name].annotation,
+            SummarizationResponseFormatter.model_fields[name],
+        )
+        for name in sections
+    }
+    return create_model(
+        "".join(name.capitalize() for name in sections) + "Formatter",
+        __doc__="Always structure and format the response to the user.",
+        **fields,
+    )
 
 class GradeSummarizationFormatter(BaseModel):
     """Grade summarization using a binary score for relevance check."""
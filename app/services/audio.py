@@ -0,0 +1,196 @@
+"""
+Audio helpers of the ingest path: duration probing and decoding.
+
+Decoding turns an uploaded recording into the mono float32 waveform at
+``SAMPLE_RATE`` that the models take. Formats libsndfile reads (WAV, FLAC,
+OGG, MP3) are read block by block, mixed down and resampled with soxr at
+``AUDIO_RESAMPLE_QUALITY``; recordings already at the target rate are not
+resampled at all. Other formats (e.g. M4A, WebM) are decoded by ffmpeg,
+streaming raw samples back through a pipe, and librosa is the last resort
+without ffmpeg.
+"""
+
+import io
+import shutil
+import subprocess
+import tempfile
+from typing import List, Optional
+
+import numpy as np
+import soundfile
+import soxr
+
+from app.core.config import settings
+
+# soxr qualities, from the fastest to the most accurate
+RESAMPLE_QUALITIES = ("QQ", "LQ", "MQ", "HQ", "VHQ")
+# Nearest ffmpeg soxr resampler settings of each quality: bits of precision
+# and passband end (soxr's LQ and MQ are 16-bit with a larger rolloff)
+FFMPEG_RESAMPLERS = {
+    "QQ": "resampler=soxr:precision=15:cutoff=0.67",
+    "LQ": "resampler=soxr:precision=16:cutoff=0.67",
+    "MQ": "resampler=soxr:precision=16:cutoff=0.8",
+    "HQ": "resampler=soxr:precision=20:cutoff=0.91",
+    "VHQ": "resampler=soxr:precision=28:cutoff=0.91",
+}
+# Frames read from libsndfile at a time, bounds the native-rate copy in memory
+BLOCK_FRAMES = 1 << 20
+# Bytes read from ffmpeg at a time
+PIPE_CHUNK = 1 << 20
+
+
+def probe_duration(audio_bytes: bytes) -> float:
+    """
+    Duration of a recording in seconds.
+
+    Read from the file header when libsndfile knows the format (WAV, FLAC,
+    OGG, MP3), which takes microseconds whatever the length. Other formats
+    are decoded.
+
+    Args:
+        audio_bytes (bytes): Uploaded file.
+
+    Returns:
+        float: Duration in seconds.
+
+    Raises:
+        Exception: If the file is not audio that can be decoded.
+    """
+    try:
+        info = soundfile.info(io.BytesIO(audio_bytes))
+        if info.frames > 0 and info.samplerate > 0:
+            return info.frames / info.samplerate
+    except RuntimeError:
+        pass
+    # Imported on first use, loading librosa's decoders slows the API startup
+    import librosa
+
+    waveform, sr = librosa.load(io.BytesIO(audio_bytes), sr=None)
+    return len(waveform) / sr
+
+
+def decode_audio(
+    audio_bytes: bytes, sr: int, quality: Optional[str] = None
+) -> np.ndarray:
+    """
+    Decode a recording to a mono float32 waveform.
+
+    Args:
+        audio_bytes (bytes): Uploaded file.
+        sr (int): Target sample rate.
+        quality (Optional[str]): soxr quality, one of ``RESAMPLE_QUALITIES``,
+            ``AUDIO_RESAMPLE_QUALITY`` by default.
+
+    Returns:
+        np.ndarray: Samples at ``sr``.
+
+    Raises:
+        ValueError: If the quality is unknown.
+        Exception: If the file is not audio that can be decoded.
+    """
+    quality = (quality or settings.AUDIO_RESAMPLE_QUALITY).upper()
+    if quality not in RESAMPLE_QUALITIES:
+        raise ValueError(
+            f"Unknown resample quality {quality!r}, expected one of {RESAMPLE_QUALITIES}"
+        )
+    try:
+        sound = soundfile.SoundFile(io.BytesIO(audio_bytes))
+    except RuntimeError:
+        sound = None
+    if sound is not None:
+        with sound:
+            return _decode_soundfile(sound, sr, quality)
+    if shutil.which("ffmpeg"):
+        return _decode_ffmpeg(audio_bytes, sr, quality)
+    # Without ffmpeg, librosa tries the other audioread backends
+    import librosa
+
+    waveform, _ = librosa.load(
+        io.BytesIO(audio_bytes),
+        sr=sr,
+        mono=True,
+        dtype="float32",
+        res_type=f"soxr_{quality.lower()}",
+    )
+    return waveform
+
+
+def mix_down(block: np.ndarray) -> np.ndarray:
+    """Average of the channels of a (frames, channels) block."""
+    if block.shape[1] == 1:
+        return block[:, 0]
+    # Column by column: mean(axis=1) on interleaved frames is ~6x slower
+    mono = block[:, 0].copy()
+    for channel in range(1, block.shape[1]):
+        mono += block[:, channel]
+    mono *= np.float32(1 / block.shape[1])
+    return mono
+
+
+def _decode_soundfile(sound: soundfile.SoundFile, sr: int, quality: str) -> np.ndarray:
+    """Read, mix down and resample a file libsndfile can read."""
+    if sound.samplerate == sr and sound.channels == 1:
+        # Fast path: the samples are already what the models take
+        return sound.read(dtype="float32")
+    stream = None
+    if sound.samplerate != sr:
+        stream = soxr.ResampleStream(
+            sound.samplerate, sr, 1, dtype="float32", quality=quality
+        )
+    chunks: List[np.ndarray] = []
+    # Blocks are read into one buffer, each is mixed down or resampled to a new array
+    buffer = np.empty((BLOCK_FRAMES, sound.channels), dtype=np.float32)
+    for block in sound.blocks(always_2d=True, out=buffer):
+        mono = mix_down(block)
+        chunks.append(mono if stream is None else stream.resample_chunk(mono))
+    if stream is not None:
+        chunks.append(stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+
+def _decode_ffmpeg(audio_bytes: bytes, sr: int, quality: str) -> np.ndarray:
+    """
+    Decode any format ffmpeg knows, mixed down and resampled by ffmpeg.
+
+    The input is a temporary file rather than a pipe: MP4/M4A recordings
+    often store their index after the audio, which ffmpeg cannot seek back
+    to in a pipe. The raw float32 samples are read from ffmpeg's stdout as
+    they are decoded. Resampling uses ffmpeg's soxr resampler (ffmpeg built
+    with ``--enable-libsoxr``, as Debian's is) at the settings nearest to
+    ``quality``.
+    """
+    with tempfile.NamedTemporaryFile() as source, tempfile.TemporaryFile() as errors:
+        source.write(audio_bytes)
+        source.flush()
+        process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-threads",
+                "0",
+                "-i",
+                source.name,
+                "-f",
+                "f32le",
+                "-af",
+                f"aresample={sr}:{FFMPEG_RESAMPLERS[quality]}",
+                "-ac",
+                "1",
+                "-ar",
+                str(sr),
+                "pipe:1",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=errors,
+        )
+        samples = bytearray()
+        while chunk := process.stdout.read(PIPE_CHUNK):
+            samples += chunk
+        if process.wait() != 0:
+            errors.seek(0)
+            message = errors.read().decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg could not decode the audio: {message}")
+    # A bytearray gives a writable array without copying the samples
+    return np.frombuffer(samples, dtype=np.float32)
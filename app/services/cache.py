@@ -1,10 +1,16 @@
 import redis
+import threading
 import uuid
 import pickle
-import boto3
 from abc import ABC, abstractmethod
 from typing import Any, Optional
 from app.core.config import settings
+from app.services.metrics import REDIS_PAYLOAD_BYTES
+
+
+def job_key(job_id: str, *parts: str) -> str:
+    """Build the Redis key of a per-job artifact, e.g. ``job:<id>:diarization``."""
+    return ":".join(["job", job_id, *parts])
 
 
 class Cache(ABC):
@@ -33,13 +39,27 @@ class RedisCache(Cache):
     def save(self, payload: Any) -> str:
         """Save a Python object to Redis and return a unique key."""
         key: str = f"payload:{uuid.uuid4()}"
-        self.cache.set(key, pickle.dumps(payload))
+        data = pickle.dumps(payload)
+        REDIS_PAYLOAD_BYTES.observe(len(data))
+        self.cache.set(key, data)
         return key
 
     def load(self, key: str) -> Any:
         """Load a Python object from Redis using its key."""
         return pickle.loads(self.cache.get(key))
 
+    def put(self, key: str, payload: Any, expire: Optional[int] = None) -> str:
+        """Save a Python object under a caller-chosen key with an optional TTL."""
+        data = pickle.dumps(payload)
+        REDIS_PAYLOAD_BYTES.observe(len(data))
+        self.cache.set(key, data, ex=expire)
+        return key
+
+    def get(self, key: str) -> Optional[Any]:
+        """Load a Python object by key. Return None if not found."""
+        data = self.cache.get(key)
+        return None if data is None else pickle.loads(data)
+
     def delete(self, key: str) -> None:
         """Delete an object from Redis using its key."""
         self.cache.delete(key)
@@ -52,21 +72,49 @@ class S3Cache(Cache):
                  aws_access_key_id: Optional[str] = None,
                  aws_secret_access_key: Optional[str] = None,
                  region_name: str = "us-east-1") -> None:
-        """Initialize S3 client and ensure the bucket exists."""
+        """
+        Initialize the S3 settings. Nothing is imported or requested until
+        first use, so that importing the app neither waits for nor fails
+        on S3, see ``ensure_bucket``.
+        """
         self.bucket = bucket
-        self.s3 = boto3.client(
-            "s3",
-            endpoint_url=endpoint_url,  # MinIO or AWS S3
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
-        )
+        self._client_kwargs = {
+            "endpoint_url": endpoint_url,  # MinIO or AWS S3
+            "aws_access_key_id": aws_access_key_id,
+            "aws_secret_access_key": aws_secret_access_key,
+            "region_name": region_name,
+        }
+        self._s3: Any = None
+        self._lock = threading.Lock()
+        self.bucket_ready = False
+
+    @property
+    def s3(self) -> Any:
+        """S3 client, created on first use (boto3 takes ~0.3 s to load)."""
+        if self._s3 is None:
+            with self._lock:
+                if self._s3 is None:
+                    import boto3
+
+                    self._s3 = boto3.client("s3", **self._client_kwargs)
+        return self._s3
+
+    def ensure_bucket(self) -> None:
+        """
+        Create the bucket if it doesn't exist (for local dev with MinIO).
+        Called on API and worker startup, and by the readiness probe until
+        it succeeds.
 
-        # Create bucket if it doesn't exist (for local dev with MinIO)
+        Raises:
+            botocore.exceptions.BotoCoreError: If S3 is unreachable.
+            botocore.exceptions.ClientError: If S3 refuses the request.
+        """
+        if self.bucket_ready:
+            return
         existing_buckets = [b["Name"] for b in self.s3.list_buckets()["Buckets"]]
-        print("Existing buckets are :", existing_buckets)
-        if bucket not in existing_buckets:
-            self.s3.create_bucket(Bucket=bucket)
+        if self.bucket not in existing_buckets:
+            self.s3.create_bucket(Bucket=self.bucket)
+        self.bucket_ready = True
 
     def save(self, data: bytes, key: Optional[str] = None) :
         key: str = f"payload:{uuid.uuid4()}" if key is None else key
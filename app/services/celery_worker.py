@@ -1,22 +1,58 @@
 from celery import Celery
+from celery.signals import worker_init
 from celery.utils.log import get_task_logger
+from prometheus_client import start_http_server
 from app.core.config import settings
 
 REDIS_HOST = settings.REDIS_HOST
 REDIS_PORT = settings.REDIS_PORT
 REDIS_BROKER_DB = settings.REDIS_BROKER_DB
-redis_url = f"{REDIS_HOST}://{REDIS_HOST}:{REDIS_PORT}/{REDIS_BROKER_DB}"
+redis_url = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_BROKER_DB}"
 
 c_worker = Celery(
     "c_worker",
     broker=redis_url,
     backend=redis_url
     )
+# Canvases are built and sent from API thread pools too, where the current
+# app would otherwise be Celery's default app, without a result backend
+c_worker.set_default()
 c_log = get_task_logger(__name__)
+# Stages are published with a priority (0 first) by the job scheduler. One
+# task is reserved at a time so that priorities decide what runs next.
+c_worker.conf.broker_transport_options = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+c_worker.conf.worker_prefetch_multiplier = 1
+
+# Registers the signal handlers persisting job and stage status
+import app.services.job_tracking  # noqa: E402,F401
+# Registers the handlers profiling the stages of profiled jobs
+import app.services.profiling  # noqa: E402,F401
+from app.services.cache import S3_CACHE  # noqa: E402
+
+
+@worker_init.connect
+def start_metrics_exporter(**_) -> None:
+    """Expose the worker Prometheus metrics."""
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT)
+
+
+@worker_init.connect
+def ensure_bucket(**_) -> None:
+    """Create the S3 bucket, stages retry their S3 calls if it is not up yet."""
+    try:
+        S3_CACHE.ensure_bucket()
+    except Exception as e:
+        c_log.warning("S3 unavailable at worker startup: %r", e)
 
 c_worker.autodiscover_tasks([
     "app.services.conversation.tasks",
     "app.services.diarize.tasks",
+    "app.services.report.tasks",
     "app.services.summarize.tasks",
     "app.services.transcribe.tasks",
 ])
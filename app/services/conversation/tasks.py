@@ -1,8 +1,10 @@
-from typing import List, Tuple, Any
+from typing import Any, Dict, List, Optional, Tuple
 from app.schemas.langchain import Turn, Conversation
 from pyannote.core import Segment
 from app.services.celery_worker import c_worker
+from app.core.config import settings
 from app.services.cache import REDIS_CACHE
+from app.services.pipeline import checkpointed, retry_policy
 
 
 def get_text_with_timestamp(segments: List[dict]) -> List[Tuple[Segment, str]]:
@@ -51,6 +53,11 @@ def add_speaker_info_to_text(
     """
     Adds speaker information to timestamped texts using diarization annotations.
 
+    Each text gets the speaker talking the longest during it, like
+    ``ann.crop(seg).argmax()``, or the previous speaker when nobody talks.
+    Texts are in time order, so the speaker turns are swept once instead of
+    cropping the whole annotation for every text.
+
     Args:
         timestamp_texts (List[Tuple[Segment, str]]): Timestamped texts.
         ann (Any): Diarization annotation.
@@ -58,10 +65,25 @@ def add_speaker_info_to_text(
     Returns:
         List[Tuple[Segment, Any, str]]: Tuples with segment, speaker, and text.
     """
+    turns = sorted(
+        (turn.start, turn.end, label)
+        for turn, _, label in ann.itertracks(yield_label=True)
+    )
     spk_text: List[Tuple[Segment, Any, str]] = []
     last_spk = None
+    active: List[Tuple[float, float, Any]] = []
+    upcoming = 0
+    last_start = float("-inf")
     for seg, text in timestamp_texts:
-        spk = ann.crop(seg).argmax()
+        if seg.start < last_start:
+            # Out of order text, restart the sweep
+            active, upcoming = [], 0
+        last_start = seg.start
+        while upcoming < len(turns) and turns[upcoming][0] < seg.end:
+            active.append(turns[upcoming])
+            upcoming += 1
+        active = [turn for turn in active if turn[1] > seg.start]
+        spk = dominant_speaker(active, seg)
         if spk:
             last_spk = spk
         else:
@@ -70,6 +92,28 @@ def add_speaker_info_to_text(
     return spk_text
 
 
+def dominant_speaker(turns: List[Tuple[float, float, Any]], seg: Segment) -> Any:
+    """
+    Speaker talking the longest during a segment, None if nobody talks.
+
+    Args:
+        turns (List[Tuple[float, float, Any]]): Start, end and speaker of the
+            turns that may overlap the segment.
+        seg (Segment): Segment of a text.
+
+    Returns:
+        Any: Speaker label, the first in sorted order on ties like pyannote.
+    """
+    durations: Dict[Any, float] = {}
+    for start, end, label in turns:
+        overlap = min(end, seg.end) - max(start, seg.start)
+        if overlap > 0:
+            durations[label] = durations.get(label, 0.0) + overlap
+    if not durations:
+        return None
+    return max(sorted(durations), key=durations.__getitem__)
+
+
 def merge_cache(text_cache: List[Tuple[Segment, Any, str]]) -> Turn:
     """
     Merges consecutive text segments of the same speaker into a single Turn.
@@ -136,14 +180,16 @@ def map_chunks(
     return conversation
 
 
-@c_worker.task
-def create_conversation(keys: List[str], use_word_timestamps: bool = True) -> str:
+@c_worker.task(**retry_policy(settings.STAGE_MAX_RETRIES))
+@checkpointed
+def create_conversation(keys: List[str], use_word_timestamps: bool = True, job_id: Optional[str] = None) -> str:
     """
     Celery task to create a conversation from cached transcription and diarization results.
 
     Args:
         keys (List[str]): List of cache keys [transcription_key, diarization_key].
         use_word_timestamps (bool): Whether to use word-level timestamps.
+        job_id (Optional[str]): Job the conversation belongs to.
 
     Returns:
         str: Cache key of the created Conversation object.
@@ -0,0 +1,244 @@
+"""
+Declarative pipeline DAGs compiled to Celery canvases.
+
+A stage declares the stages whose outputs it consumes, the job parameters
+it takes as keyword arguments, and the queue and resources it runs on.
+Every stage returns the cache key of its output, which is checkpointed
+against the job (see ``app.services.pipeline``), so stages exchange cache
+keys rather than data. A stage with one input receives its key as first
+argument, a stage with several inputs a list of keys in declaration order.
+
+The DAG is compiled to nested chains and chords: stages that do not depend
+on each other are in the header of a chord, so they run in parallel, and
+a stage only waits for its own inputs. Stages whose inputs are all cached
+get their keys as arguments, and stages upstream of them are left out.
+Celery canvases only express series-parallel graphs; a DAG whose compiled
+canvas would run a stage twice is rejected.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from celery import chain, chord, signature
+from celery.canvas import Signature
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One Celery task of a pipeline."""
+
+    name: str
+    task: str  # registered Celery task name
+    inputs: Tuple[str, ...] = ()  # stages whose output keys are passed as arguments
+    params: Tuple[str, ...] = ()  # job parameters passed as keyword arguments
+    queue: Optional[str] = None  # Celery queue, None is the default queue
+    resources: Tuple[str, ...] = ()  # e.g. gpu, llm, for capacity planning
+
+
+class PipelineDAG:
+    """Stages of a pipeline and their dependencies."""
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        """
+        Args:
+            stages (Iterable[Stage]): Stages, each after its inputs.
+
+        Raises:
+            ValueError: If a stage is defined twice or consumes an unknown or
+                later stage.
+        """
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Stage {stage.name} is defined twice")
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(
+                    f"Stage {stage.name} consumes undefined stages {unknown}"
+                )
+            self.stages[stage.name] = stage
+
+    def ancestors(self, name: str) -> Set[str]:
+        """Stages a stage depends on, directly or not."""
+        found: Set[str] = set()
+        pending = list(self.stages[name].inputs)
+        while pending:
+            current = pending.pop()
+            if current not in found:
+                found.add(current)
+                pending.extend(self.stages[current].inputs)
+        return found
+
+    def compile(
+        self,
+        sink: str,
+        params: Mapping[str, Any],
+        completed: Optional[Mapping[str, str]] = None,
+    ) -> Signature:
+        """
+        Build the canvas computing a stage, skipping cached stages.
+
+        Args:
+            sink (str): Last stage, the result of the canvas is its output.
+            params (Mapping[str, Any]): Job parameters, None values are not
+                passed.
+            completed (Optional[Mapping[str, str]]): Output keys of cached
+                stages.
+
+        Returns:
+            Signature: Chain or chord to dispatch.
+
+        Raises:
+            ValueError: If the sink is cached, or the stages to run cannot be
+                expressed as a canvas.
+        """
+        completed = completed or {}
+        if sink in completed:
+            raise ValueError(f"Stage {sink} is already cached")
+
+        # Stages to run: a stage whose inputs are all cached starts the
+        # canvas, otherwise all of its inputs run (cached ones return
+        # their checkpoint right away)
+        nodes: Set[str] = set()
+        pending = [sink]
+        while pending:
+            name = pending.pop()
+            if name in nodes:
+                continue
+            nodes.add(name)
+            if not self._is_cached_input(name, completed):
+                pending.extend(self.stages[name].inputs)
+
+        canvas, compiled = self._compile(sink, None, nodes, params, completed)
+        if sorted(compiled) != sorted(nodes):
+            raise ValueError(
+                f"Stages {sorted(nodes)} of {sink} cannot be expressed as a canvas"
+            )
+        if getattr(canvas, "tasks", None) is None:
+            canvas = chain(canvas)
+        return canvas
+
+    def critical_path(
+        self, timings: Mapping[str, Tuple[datetime, Optional[datetime]]]
+    ) -> List[str]:
+        """
+        Stages that determined the duration of a job.
+
+        Walks back from the stage that finished last, each time through the
+        input that finished last, i.e. the one the stage waited for.
+
+        Args:
+            timings (Mapping[str, Tuple[datetime, Optional[datetime]]]): Start
+                and finish time of each stage that ran, stages not in the DAG
+                are ignored.
+
+        Returns:
+            List[str]: Stage names, in execution order.
+        """
+        ran = {
+            name: finished or started
+            for name, (started, finished) in timings.items()
+            if name in self.stages
+        }
+        if not ran:
+            return []
+        path = [max(ran, key=ran.__getitem__)]
+        while True:
+            inputs = [name for name in self.stages[path[-1]].inputs if name in ran]
+            if not inputs:
+                return path[::-1]
+            path.append(max(inputs, key=ran.__getitem__))
+
+    def _is_cached_input(self, name: str, completed: Mapping[str, str]) -> bool:
+        return all(source in completed for source in self.stages[name].inputs)
+
+    def _signature(
+        self, name: str, params: Mapping[str, Any], completed: Mapping[str, str]
+    ) -> Signature:
+        stage = self.stages[name]
+        kwargs = {
+            key: params[key] for key in stage.params if params.get(key) is not None
+        }
+        sig = signature(stage.task, kwargs=kwargs)
+        if stage.inputs and self._is_cached_input(name, completed):
+            keys = [completed[source] for source in stage.inputs]
+            sig = sig.clone(args=(keys[0] if len(keys) == 1 else keys,))
+        if stage.queue:
+            sig.set(queue=stage.queue)
+        return sig
+
+    def _compile(
+        self,
+        name: str,
+        base: Optional[str],
+        nodes: Set[str],
+        params: Mapping[str, Any],
+        completed: Mapping[str, str],
+    ) -> Tuple[Signature, List[str]]:
+        """Canvas computing a stage from the output of ``base``, and its stages."""
+        sig = self._signature(name, params, completed)
+        inputs = [source for source in self.stages[name].inputs if source in nodes]
+        if not inputs or inputs == [base]:
+            # Celery passes the result of the previous task
+            return sig, [name]
+        if base in inputs:
+            raise ValueError(f"Stage {name} consumes {base} and a later stage")
+
+        if len(inputs) == 1:
+            upstream, stages = self._compile(inputs[0], base, nodes, params, completed)
+            return _then(upstream, sig), stages + [name]
+
+        # The inputs run in parallel after the last stage they all depend on
+        join = self._join(inputs, base, nodes)
+        branches, stages = [], []
+        for source in inputs:
+            branch, branch_stages = self._compile(
+                source, join, nodes, params, completed
+            )
+            branches.append(branch)
+            stages.extend(branch_stages)
+        canvas = chord(branches, sig)
+        stages.append(name)
+        if join is None or join == base:
+            return canvas, stages
+        upstream, upstream_stages = self._compile(join, base, nodes, params, completed)
+        return chain(upstream, canvas), upstream_stages + stages
+
+    def _join(
+        self, inputs: List[str], base: Optional[str], nodes: Set[str]
+    ) -> Optional[str]:
+        """Latest stage every path to the inputs goes through, after ``base``."""
+        scope = set(inputs).union(*(self.ancestors(name) for name in inputs)) & nodes
+        if base is not None:
+            scope -= self.ancestors(base) | {base}
+        dominators: Dict[str, Set[str]] = {}
+        for name in self.stages:
+            if name not in scope:
+                continue
+            preds = [source for source in self.stages[name].inputs if source in scope]
+            common = (
+                set.intersection(*(dominators[source] for source in preds))
+                if preds
+                else set()
+            )
+            dominators[name] = common | {name}
+        shared = set.intersection(*(dominators[name] - {name} for name in inputs))
+        if not shared:
+            return base
+        return max(shared, key=lambda name: len(dominators[name]))
+
+
+def _then(upstream: Signature, sig: Signature) -> Signature:
+    """
+    Chain a stage after a canvas.
+
+    A stage after a chord goes in the chord body, so that the canvas stays
+    a chord with a chain as body rather than a chain that Celery upgrades.
+    """
+    if isinstance(upstream, chord):
+        return chord(upstream.tasks, _then(upstream.body, sig))
+    tasks = getattr(upstream, "tasks", None)
+    if tasks is not None:
+        return chain(*tasks[:-1], _then(tasks[-1], sig))
+    return chain(upstream, sig)
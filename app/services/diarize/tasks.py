@@ -1,10 +1,11 @@
-from typing import Any
+from typing import Any, Callable, Optional
 import io
 import torch
 from pyannote.audio import Pipeline
 from app.core.config import settings
 from app.services.celery_worker import c_worker
-from app.services.cache import REDIS_CACHE, S3_CACHE
+from app.services.cache import REDIS_CACHE, S3_CACHE, job_key
+from app.services.pipeline import checkpointed, raise_if_cancelled, retry_policy
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 
@@ -15,19 +16,45 @@ pipeline = Pipeline.from_pretrained(
 pipeline.to(torch.device(DEVICE))
 
 
-@c_worker.task
-def diarize(bytes_key: str) -> str:
+def cancel_hook(job_id: Optional[str]) -> Optional[Callable[..., None]]:
+    """
+    Progress hook of the diarization pipeline stopping it between steps
+    (segmentation, embedding batches, clustering) once the job is cancelled.
+    """
+    if not job_id:
+        return None
+
+    def hook(step_name: str, step_artifact: Any, **kwargs: Any) -> None:
+        raise_if_cancelled(job_id)
+
+    return hook
+
+
+@c_worker.task(**retry_policy(settings.STAGE_MAX_RETRIES))
+@checkpointed
+def diarize(bytes_key: str, job_id: Optional[str] = None) -> str:
     """
     Diarize audio stored in cache and return a cache key for the result.
 
+    When a job id is given, the result is stored under the job so that
+    streaming summarization of transcript windows can find it, and is
+    checkpointed so that a resumed job does not diarize again.
+
     Args:
         bytes_key (str): Cache key pointing to audio bytes.
+        job_id (Optional[str]): Job the audio belongs to.
 
     Returns:
         key (str): Cache key of the diarization result.
     """
     audio_bytes: bytes = S3_CACHE.load(bytes_key)
     buffer: io.BytesIO = io.BytesIO(audio_bytes)
-    diarization_result: Any = pipeline(buffer)
+    diarization_result: Any = pipeline(buffer, hook=cancel_hook(job_id))
+    if job_id:
+        return REDIS_CACHE.put(
+            job_key(job_id, "diarization"),
+            diarization_result,
+            expire=settings.JOB_ARTIFACT_TTL,
+        )
     key: str = REDIS_CACHE.save(diarization_result)
     return key
@@ -0,0 +1,124 @@
+"""
+Per-job event streams stored in Redis streams.
+
+Workers publish partial results (summary text, extracted items, completion)
+as soon as they are available, and the API relays them to clients.
+"""
+
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.services.cache import (
+    REDIS_CACHE,
+    REDIS_CACHE_DB,
+    REDIS_HOST,
+    REDIS_PORT,
+    job_key,
+)
+
+# Events after which no more events are published for a job
+TERMINAL_EVENTS = ("done", "error", "cancelled")
+# Terminal event of each final job status
+FINAL_STATUS_EVENTS = {"done": "done", "failed": "error", "cancelled": "cancelled"}
+
+
+def events_key(job_id: str) -> str:
+    """Redis stream key holding the events of a job."""
+    return job_key(job_id, "events")
+
+
+class JobEventStream:
+    """Publishes job events to a capped Redis stream."""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        maxlen: Optional[int] = None,
+        ttl: Optional[int] = None,
+    ) -> None:
+        self.client = client
+        self.maxlen = maxlen or settings.JOB_EVENTS_MAXLEN
+        self.ttl = ttl or settings.JOB_EVENTS_TTL
+
+    def publish(self, job_id: Optional[str], event: str, **data: Any) -> None:
+        """
+        Append an event to the job stream. Jobs without an id are ignored.
+
+        Args:
+            job_id (Optional[str]): Job the event belongs to.
+            event (str): Event name, e.g. ``summary_partial`` or ``item``.
+            **data (Any): JSON-serializable payload.
+        """
+        if not job_id:
+            return
+        key = events_key(job_id)
+        pipe = self.client.pipeline()
+        pipe.xadd(
+            key,
+            {"event": event, "data": json.dumps(data)},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+
+async def iter_job_events(
+    job_id: str,
+    last_id: str = "0",
+    block_ms: int = 15000,
+    job_status: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+) -> AsyncIterator[Tuple[Optional[str], Optional[str], Dict[str, Any]]]:
+    """
+    Relay the events of a job until a terminal event is seen.
+
+    The job status is checked first and at every keep-alive: once the job
+    is over, the stored events are replayed without blocking and the stream
+    ends, with a terminal event of its own if none was published (e.g. the
+    events expired or the worker died).
+
+    Args:
+        job_id (str): Job to follow.
+        last_id (str): Stream id to resume after, ``"0"`` replays everything.
+        block_ms (int): How long a single read blocks before a keep-alive.
+        job_status (Optional[Callable]): Reads the status of the job row.
+
+    Yields:
+        Tuple: ``(event_id, event, data)``, or ``(None, None, {})`` as a
+        keep-alive when nothing was published during ``block_ms``.
+    """
+    client = aioredis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_CACHE_DB)
+    key = events_key(job_id)
+    status = await job_status() if job_status else None
+    try:
+        while True:
+            final = status in FINAL_STATUS_EVENTS
+            response = await client.xread(
+                {key: last_id}, block=None if final else block_ms, count=100
+            )
+            if not response:
+                if final:
+                    yield None, FINAL_STATUS_EVENTS[status], {"status": status}
+                    return
+                if job_status:
+                    status = await job_status()
+                    if status in FINAL_STATUS_EVENTS:
+                        continue
+                yield None, None, {}
+                continue
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id.decode()
+                    event = fields[b"event"].decode()
+                    yield last_id, event, json.loads(fields[b"data"])
+                    if event in TERMINAL_EVENTS:
+                        return
+    finally:
+        await client.aclose()
+
+
+JOB_EVENTS = JobEventStream(REDIS_CACHE.cache)
@@ -0,0 +1,273 @@
+"""
+Persistence of job status and per-stage timings from Celery signals.
+
+Every task that receives a ``job_id`` keyword argument gets a row in the
+``job_stages`` table, written by the worker when the task starts, finishes
+or fails. Job status is kept up to date on the ``jobs`` row, so status
+queries are a single indexed read instead of a result backend lookup.
+Stage latency, broker queue wait and real-time factor are also exported
+as Prometheus metrics. The end of the audio stages frees the scheduler slot
+of the job, and the final failure of a pipeline stage ends the job event
+stream with an ``error`` event.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Coroutine, Dict, Optional
+
+import structlog
+from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.models.job import Job, JobStage
+from app.services.events import JOB_EVENTS
+from app.services.metrics import (
+    STAGE_QUEUE_WAIT_SECONDS,
+    STAGE_REAL_TIME_FACTOR,
+    STAGE_SECONDS,
+)
+from app.services.pipeline import PIPELINE, JobCancelled
+from app.services.scheduler import SCHEDULER
+
+logger = structlog.get_logger("job-tracking")
+
+# Stages of the main pipeline, other tasks (e.g. streaming window summaries)
+# are recorded but do not change the job status.
+PIPELINE_STAGES = tuple(PIPELINE.stages)
+
+# Stages whose duration scales with the audio, reported as real-time factor
+AUDIO_STAGES = ("transcribe", "diarize")
+
+STATUS_BY_STATE = {"SUCCESS": "success", "FAILURE": "failure", "RETRY": "retry"}
+
+_engine: Optional[AsyncEngine] = None
+# Monotonic start time of the running attempt of each task
+_attempt_started: Dict[str, float] = {}
+
+
+def _sessionmaker() -> async_sessionmaker:
+    global _engine
+    if _engine is None:
+        # Every signal runs its own event loop, connections must not outlive it
+        _engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    return async_sessionmaker(bind=_engine, expire_on_commit=False)
+
+
+def _run(coro: Coroutine[Any, Any, None], event: str, task_id: str) -> None:
+    """Run a database write, tracking failures must never fail the task."""
+    try:
+        asyncio.run(coro)
+    except Exception as e:
+        logger.warning(
+            "job_tracking_failed", tracking_event=event, task_id=task_id, error=str(e)
+        )
+
+
+def _release_slot(job_id: str) -> None:
+    """Free the scheduler slot of a job, releasing the next queued job."""
+    try:
+        SCHEDULER.finish(job_id)
+    except Exception as e:
+        logger.warning("scheduler_release_failed", job_id=job_id, error=str(e))
+
+
+def _publish_error(job_id: str, stage: str, error: str) -> None:
+    """End the event stream of a failed job, clients stop waiting for results."""
+    try:
+        JOB_EVENTS.publish(job_id, "error", stage=stage, error=error)
+    except Exception as e:
+        logger.warning("job_error_event_failed", job_id=job_id, error=str(e))
+
+
+def stage_name(task: Any) -> str:
+    """Short stage name of a task, e.g. ``summarize_text``."""
+    return task.name.rsplit(".", 1)[-1]
+
+
+def is_last_stage(task: Any) -> bool:
+    """Whether nothing runs after this task in its canvas."""
+    request = task.request
+    return not (request.chain or request.callbacks or request.chord)
+
+
+async def _start(task_id: str, job_id: str, stage: str, worker: Optional[str]) -> None:
+    async with _sessionmaker()() as session:
+        job = await session.get(Job, job_id)
+        if job is None:
+            return
+        row = await session.scalar(select(JobStage).where(JobStage.task_id == task_id))
+        if row is None:
+            session.add(
+                JobStage(
+                    job_id=job_id,
+                    task_id=task_id,
+                    stage=stage,
+                    status="started",
+                    attempts=1,
+                    worker=worker,
+                    audio_duration=job.audio_duration,
+                    started_at=datetime.now(timezone.utc),
+                )
+            )
+        else:
+            row.status = "started"
+            row.attempts += 1
+            row.worker = worker
+            row.finished_at = None
+        if stage in PIPELINE_STAGES and job.status == "pending":
+            job.status = "running"
+        await session.commit()
+
+
+async def _finish(
+    task_id: str,
+    job_id: str,
+    stage: str,
+    status: str,
+    duration: Optional[float],
+    last_stage: bool,
+    error: Optional[str] = None,
+) -> None:
+    async with _sessionmaker()() as session:
+        row = await session.scalar(select(JobStage).where(JobStage.task_id == task_id))
+        if row is not None:
+            row.status = status
+            row.finished_at = datetime.now(timezone.utc)
+            if duration is not None:
+                row.duration = duration
+                if stage in AUDIO_STAGES and status == "success" and row.audio_duration:
+                    STAGE_REAL_TIME_FACTOR.labels(stage=stage).observe(
+                        duration / row.audio_duration
+                    )
+            if error is not None:
+                row.error = error
+        if stage in PIPELINE_STAGES:
+            job = await session.get(Job, job_id)
+            if job is not None and job.status not in ("failed", "cancelled"):
+                if status in ("failure", "cancelled"):
+                    job.status = "failed" if status == "failure" else "cancelled"
+                elif status == "success" and last_stage:
+                    job.status = "done"
+        await session.commit()
+
+
+async def _status(job_id: str) -> Optional[str]:
+    async with _sessionmaker()() as session:
+        job = await session.get(Job, job_id)
+        return job.status if job is not None else None
+
+
+def job_status(job_id: str) -> Optional[str]:
+    """
+    Read the status of a job from a task.
+
+    Args:
+        job_id (str): Job to look up.
+
+    Returns:
+        Optional[str]: Status of the job row, None if unknown or unreadable.
+    """
+    try:
+        return asyncio.run(_status(job_id))
+    except Exception as e:
+        logger.warning("job_status_failed", job_id=job_id, error=str(e))
+        return None
+
+
+@before_task_publish.connect
+def on_before_task_publish(headers: Optional[Dict[str, Any]] = None, **_: Any) -> None:
+    # Lets the worker measure how long the task waited in the broker
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+
+
+def enqueued_at(task: Any) -> Optional[float]:
+    """Publish time of the running task, set by ``on_before_task_publish``."""
+    request = task.request
+    value = getattr(request, "enqueued_at", None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get("enqueued_at")
+    return value
+
+
+@task_prerun.connect
+def on_task_prerun(
+    task_id: str, task: Any, kwargs: Optional[Dict[str, Any]] = None, **_: Any
+) -> None:
+    published = enqueued_at(task)
+    if published is not None:
+        STAGE_QUEUE_WAIT_SECONDS.labels(stage=stage_name(task)).observe(
+            max(0.0, time.time() - published)
+        )
+    job_id = (kwargs or {}).get("job_id")
+    if not job_id:
+        return
+    _attempt_started[task_id] = time.monotonic()
+    if stage_name(task) == "create_conversation":
+        # Both audio stages are done
+        _release_slot(job_id)
+    _run(
+        _start(task_id, job_id, stage_name(task), task.request.hostname),
+        "prerun",
+        task_id,
+    )
+
+
+@task_postrun.connect
+def on_task_postrun(
+    task_id: str,
+    task: Any,
+    kwargs: Optional[Dict[str, Any]] = None,
+    retval: Any = None,
+    state: Optional[str] = None,
+    **_: Any,
+) -> None:
+    job_id = (kwargs or {}).get("job_id")
+    if not job_id:
+        return
+    started = _attempt_started.pop(task_id, None)
+    duration = None if started is None else time.monotonic() - started
+    if isinstance(retval, JobCancelled):
+        status = "cancelled"
+    else:
+        status = STATUS_BY_STATE.get(state or "", (state or "unknown").lower())
+    if duration is not None:
+        STAGE_SECONDS.labels(stage=stage_name(task), status=status).observe(duration)
+    _run(
+        _finish(
+            task_id, job_id, stage_name(task), status, duration, is_last_stage(task)
+        ),
+        "postrun",
+        task_id,
+    )
+
+
+@task_failure.connect
+def on_task_failure(
+    task_id: str,
+    exception: BaseException,
+    sender: Any,
+    kwargs: Optional[Dict[str, Any]] = None,
+    **_: Any,
+) -> None:
+    job_id = (kwargs or {}).get("job_id")
+    if not job_id:
+        return
+    if isinstance(exception, JobCancelled):
+        status, error = "cancelled", None
+    else:
+        status, error = "failure", f"{type(exception).__name__}: {exception}"[:1000]
+    if stage_name(sender) in AUDIO_STAGES:
+        _release_slot(job_id)
+    # Sent once retries are exhausted, autoretried errors raise Retry instead
+    if status == "failure" and stage_name(sender) in PIPELINE_STAGES:
+        _publish_error(job_id, stage_name(sender), error)
+    _run(
+        _finish(task_id, job_id, stage_name(sender), status, None, False, error),
+        "failure",
+        task_id,
+    )
@@ -0,0 +1,102 @@
+"""
+Prometheus metrics of the summarization pipeline.
+
+The API serves them on ``/metrics``; Celery workers expose them on their own
+port (``WORKER_METRICS_PORT``). Metrics are defined here once and observed
+where the work happens.
+"""
+
+from prometheus_client import Counter, Histogram
+
+# Byte-size buckets, 1 KiB to 1 GiB
+_BYTES = tuple(2**exp for exp in range(10, 31, 2))
+# Duration buckets, 10 ms to ~1 h
+_SECONDS = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+    600,
+    1800,
+    3600,
+)
+
+UPLOAD_BYTES = Histogram(
+    "upload_size_bytes", "Size of uploaded audio files", buckets=_BYTES
+)
+UPLOAD_AUDIO_SECONDS = Histogram(
+    "upload_audio_duration_seconds",
+    "Duration of uploaded audio",
+    buckets=(60, 300, 600, 1800, 3600, 7200, 14400),
+)
+
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent running a pipeline stage",
+    ["stage", "status"],
+    buckets=_SECONDS,
+)
+STAGE_QUEUE_WAIT_SECONDS = Histogram(
+    "pipeline_stage_queue_wait_seconds",
+    "Time a stage waited in the broker before a worker picked it up",
+    ["stage"],
+    buckets=_SECONDS,
+)
+STAGE_REAL_TIME_FACTOR = Histogram(
+    "pipeline_stage_real_time_factor",
+    "Processing seconds per second of audio",
+    ["stage"],
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5),
+)
+
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "llm_queue_wait_seconds", "Time an LLM call waited for a slot", buckets=_SECONDS
+)
+LLM_GENERATION_SECONDS = Histogram(
+    "llm_generation_seconds", "Duration of a single LLM call", buckets=_SECONDS
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "llm_output_tokens_per_second",
+    "Output tokens generated per second by the LLM, as reported by Ollama",
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250),
+)
+
+REPORT_RENDER_SECONDS = Histogram(
+    "report_render_seconds",
+    "Time to render a PDF report, including time queued in the render pool",
+    buckets=_SECONDS,
+)
+
+JOB_ADMISSION_WAIT_SECONDS = Histogram(
+    "job_admission_wait_seconds",
+    "Time a job waited in the scheduler queue before its audio stages started",
+    ["priority"],
+    buckets=_SECONDS,
+)
+JOBS_REJECTED = Counter(
+    "jobs_rejected_total", "Uploads refused by admission control", ["reason"]
+)
+JOBS_CANCELLED = Counter(
+    "jobs_cancelled_total", "Jobs cancelled by their user", ["status"]
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+REDIS_PAYLOAD_BYTES = Histogram(
+    "redis_payload_bytes", "Size of payloads written to Redis", buckets=_BYTES
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup, the hit ratio is derived in the dashboard."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
@@ -0,0 +1,305 @@
+"""
+Summarization pipeline: stage DAG, stage checkpoints, retries and
+cancellation.
+
+Every stage records the cache key of its output against the job once it
+succeeds. A stage that runs again for the same job returns the recorded key
+instead of redoing its work, and a failed job is resumed by dispatching only
+the stages after the last checkpoint. Transient errors (broker, cache, S3 or
+LLM connections) are retried by Celery with exponential backoff.
+
+A cancelled job has a flag in Redis that stages check when they start and
+at their own safe points (transcript windows, diarization steps, LLM slot
+waits), so that cancellation frees workers that are already busy.
+"""
+
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+import botocore.exceptions
+import redis
+import structlog
+from celery import chord
+from celery.canvas import Signature
+from celery.result import AsyncResult
+
+from app.core.config import settings
+from app.services.cache import REDIS_CACHE, S3_CACHE, job_key
+from app.services.dag import PipelineDAG, Stage
+
+logger = structlog.get_logger("pipeline")
+
+# Stages of a job, the transcript and the diarization are computed in parallel
+PIPELINE = PipelineDAG(
+    [
+        Stage(
+            "transcribe",
+            "app.services.transcribe.tasks.transcribe",
+            params=("bytes_key", "job_id", "window_seconds"),
+            resources=("asr_model",),
+        ),
+        Stage(
+            "diarize",
+            "app.services.diarize.tasks.diarize",
+            params=("bytes_key", "job_id"),
+            resources=("diarization_model",),
+        ),
+        Stage(
+            "create_conversation",
+            "app.services.conversation.tasks.create_conversation",
+            inputs=("transcribe", "diarize"),
+            params=("job_id",),
+        ),
+        Stage(
+            "summarize_text",
+            "app.services.summarize.tasks.summarize_text",
+            inputs=("create_conversation",),
+            params=("job_id", "streaming"),
+            resources=("llm",),
+        ),
+        Stage(
+            "render_report",
+            "app.services.report.tasks.render_report",
+            inputs=("summarize_text",),
+            params=("job_id", "report_key"),
+            resources=("render_pool",),
+        ),
+    ]
+)
+STAGE_TASKS = {name: stage.task for name, stage in PIPELINE.stages.items()}
+
+# Errors worth retrying: the next attempt may succeed without any change
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    ConnectionError,
+    TimeoutError,
+    redis.exceptions.ConnectionError,
+    redis.exceptions.TimeoutError,
+    botocore.exceptions.HTTPClientError,
+)
+
+
+class JobCancelled(Exception):
+    """Raised inside a stage whose job was cancelled."""
+
+
+def retry_policy(
+    max_retries: int, errors: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS
+) -> Dict[str, Any]:
+    """
+    Celery task options retrying a stage on transient errors.
+
+    Args:
+        max_retries (int): Retries before the stage fails.
+        errors (Tuple[Type[BaseException], ...]): Exceptions that are retried.
+
+    Returns:
+        Dict[str, Any]: Keyword arguments of ``c_worker.task``.
+    """
+    return {
+        "autoretry_for": errors,
+        "max_retries": max_retries,
+        "retry_backoff": settings.RETRY_BACKOFF,
+        "retry_backoff_max": settings.RETRY_BACKOFF_MAX,
+        "retry_jitter": True,
+    }
+
+
+def is_streaming(duration: Optional[float]) -> bool:
+    """Whether a recording is long enough for the streaming pipeline mode."""
+    return (
+        settings.STREAMING_MIN_DURATION > 0
+        and duration is not None
+        and duration >= settings.STREAMING_MIN_DURATION
+    )
+
+
+def stage_output(job_id: str, stage: str) -> Optional[str]:
+    """
+    Cache key of the output of a completed stage.
+
+    Returns None if the stage never completed or its output has expired.
+    """
+    key = REDIS_CACHE.cache.get(job_key(job_id, "stage", stage))
+    if key is None:
+        return None
+    key = key.decode()
+    return key if REDIS_CACHE.cache.exists(key) else None
+
+
+def stage_outputs(job_id: str) -> Dict[str, str]:
+    """Output keys of every completed stage of a job."""
+    outputs = {}
+    for stage in STAGE_TASKS:
+        key = stage_output(job_id, stage)
+        if key is not None:
+            outputs[stage] = key
+    return outputs
+
+
+def record_stage(job_id: str, stage: str, output_key: str) -> None:
+    """Checkpoint the output of a completed stage."""
+    REDIS_CACHE.cache.set(
+        job_key(job_id, "stage", stage), output_key, ex=settings.JOB_ARTIFACT_TTL
+    )
+
+
+def cancel_job(job_id: str) -> None:
+    """Flag a job as cancelled for the stages that are running or pending."""
+    REDIS_CACHE.cache.set(job_key(job_id, "cancelled"), 1, ex=settings.JOB_ARTIFACT_TTL)
+
+
+def is_cancelled(job_id: Optional[str]) -> bool:
+    """Whether a job was cancelled."""
+    return bool(job_id) and bool(REDIS_CACHE.cache.exists(job_key(job_id, "cancelled")))
+
+
+def raise_if_cancelled(job_id: Optional[str]) -> None:
+    """
+    Interrupt the running stage if its job was cancelled.
+
+    Raises:
+        JobCancelled: If the job was cancelled.
+    """
+    if is_cancelled(job_id):
+        raise JobCancelled(f"Job {job_id} was cancelled")
+
+
+def purge_job_artifacts(job_id: str, s3_keys: Iterable[str] = ()) -> int:
+    """
+    Delete the intermediate artifacts of a job from Redis and S3.
+
+    The cancellation flag and the event stream are kept until they expire,
+    so that late stages and clients still see that the job was cancelled.
+
+    Args:
+        job_id (str): Job to clean up.
+        s3_keys (Iterable[str]): S3 objects of the job, e.g. audio and
+            report. Stage profiles are deleted too.
+
+    Returns:
+        int: Number of Redis keys deleted.
+    """
+    keep = {job_key(job_id, "cancelled"), job_key(job_id, "events")}
+    keys = list(stage_outputs(job_id).values())
+    keys.extend(
+        key.decode()
+        for key in REDIS_CACHE.cache.scan_iter(match=job_key(job_id, "*"), count=500)
+    )
+    keys = [key for key in dict.fromkeys(keys) if key not in keep]
+    # Profiles of the stages that ran, listed in Redis by the workers
+    profiles = REDIS_CACHE.cache.lrange(job_key(job_id, "profiles"), 0, -1)
+    s3_keys = [*s3_keys, *(key.decode() for key in profiles)]
+    deleted = int(REDIS_CACHE.cache.delete(*keys)) if keys else 0
+    for key in s3_keys:
+        S3_CACHE.delete(key)
+    return deleted
+
+
+def checkpointed(func: Callable[..., str]) -> Callable[..., str]:
+    """
+    Make a stage idempotent per job, and stop it if the job was cancelled.
+
+    A call with a ``job_id`` keyword argument returns the checkpointed output
+    of the stage if there is one, and checkpoints the output otherwise. The
+    stage name is the function name.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> str:
+        job_id = kwargs.get("job_id")
+        if not job_id:
+            return func(*args, **kwargs)
+        raise_if_cancelled(job_id)
+        stage = func.__name__
+        output_key = stage_output(job_id, stage)
+        if output_key is not None:
+            logger.info("stage_skipped", job_id=job_id, stage=stage)
+            return output_key
+        output_key = func(*args, **kwargs)
+        if is_cancelled(job_id):
+            # Cancelled while running, the artifacts were already cleaned up
+            REDIS_CACHE.delete(output_key)
+            raise JobCancelled(f"Job {job_id} was cancelled")
+        record_stage(job_id, stage, output_key)
+        return output_key
+
+    return wrapper
+
+
+def build_pipeline(
+    job_id: str,
+    bytes_key: str,
+    report_key: str,
+    streaming: bool = False,
+    completed: Optional[Dict[str, str]] = None,
+) -> Signature:
+    """
+    Build the canvas of a job, skipping the stages with a checkpoint.
+
+    Args:
+        job_id (str): Job to run.
+        bytes_key (str): S3 key of the audio.
+        report_key (str): S3 key of the PDF report.
+        streaming (bool): Whether to transcribe and summarize in windows.
+        completed (Optional[Dict[str, str]]): Output keys of completed stages,
+            see ``stage_outputs``.
+
+    Returns:
+        Signature: Canvas to dispatch.
+
+    Raises:
+        ValueError: If every stage already completed.
+    """
+    sink = "render_report" if settings.REPORT_PRERENDER else "summarize_text"
+    params = {
+        "job_id": job_id,
+        "bytes_key": bytes_key,
+        "report_key": report_key,
+        "streaming": streaming,
+        "window_seconds": settings.STREAMING_WINDOW_SECONDS if streaming else None,
+    }
+    return PIPELINE.compile(sink, params, completed)
+
+
+def canvas_task_ids(canvas: Any) -> List[str]:
+    """Ids of every task of a frozen canvas."""
+    if isinstance(canvas, (list, tuple)):
+        # Chord headers unpickled from the scheduler queue are plain lists
+        return [task_id for task in canvas for task_id in canvas_task_ids(task)]
+    if isinstance(canvas, chord):
+        return canvas_task_ids(canvas.tasks) + canvas_task_ids(canvas.body)
+    tasks = getattr(canvas, "tasks", None)
+    if tasks is not None:
+        return [task_id for task in tasks for task_id in canvas_task_ids(task)]
+    return [canvas.id]
+
+
+def freeze_pipeline(job_id: str, canvas: Signature) -> AsyncResult:
+    """
+    Assign the task ids of a canvas and record them, so it can be revoked.
+
+    Args:
+        job_id (str): Job of the canvas.
+        canvas (Signature): Canvas built by ``build_pipeline``.
+
+    Returns:
+        AsyncResult: Result of the last stage.
+    """
+    result = canvas.freeze()
+    REDIS_CACHE.put(
+        job_key(job_id, "tasks"),
+        canvas_task_ids(canvas),
+        expire=settings.JOB_ARTIFACT_TTL,
+    )
+    return result
+
+
+def dispatch(job_id: str, canvas: Signature) -> AsyncResult:
+    """Send the canvas of a job right away, see ``freeze_pipeline``."""
+    freeze_pipeline(job_id, canvas)
+    return canvas.apply_async()
+
+
+def job_task_ids(job_id: str) -> List[str]:
+    """Ids of the tasks of the last dispatch of a job."""
+    return REDIS_CACHE.get(job_key(job_id, "tasks")) or []
@@ -0,0 +1,271 @@
+"""
+Opt-in profiling of pipeline stages.
+
+A stage is profiled when its job was submitted with ``profile=true`` or when
+the worker lists the stage in ``PROFILE_STAGES``. While the task runs, a
+background thread samples its call stack and ``tracemalloc`` traces its
+allocations. When it ends, two reports are uploaded to S3 under the job
+prefix and listed in the job status: the sampled stacks in folded format
+(input of flamegraph.pl, speedscope or inferno) and a text report of the
+hottest functions and the memory peak.
+"""
+
+import asyncio
+import linecache
+import os
+import posixpath
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import structlog
+from celery.signals import task_postrun, task_prerun
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.models.job import Job
+from app.services.cache import REDIS_CACHE, S3_CACHE, job_key
+from app.services.job_tracking import stage_name
+
+logger = structlog.get_logger("profiling")
+
+MB = 1024 * 1024
+# Rows of the text report per section
+REPORT_TOP = 30
+
+
+def enable_job_profiling(job_id: str) -> None:
+    """Profile every stage of a job, in every worker."""
+    REDIS_CACHE.put(job_key(job_id, "profile"), True, expire=settings.JOB_ARTIFACT_TTL)
+
+
+def is_profiled(job_id: Optional[str], stage: str) -> bool:
+    """Whether a stage of a job is profiled, by job flag or worker setting."""
+    stages = {s.strip() for s in settings.PROFILE_STAGES.split(",") if s.strip()}
+    if stage in stages or "all" in stages:
+        return True
+    return bool(job_id) and bool(REDIS_CACHE.get(job_key(job_id, "profile")))
+
+
+def profile_keys(job_id: str) -> List[str]:
+    """S3 keys of the profiling reports of a job."""
+    keys = REDIS_CACHE.cache.lrange(job_key(job_id, "profiles"), 0, -1)
+    return [key.decode() for key in keys]
+
+
+def profile_urls(job_id: str) -> Dict[str, str]:
+    """Presigned URLs of the profiling reports of a job, by file name."""
+    return {
+        posixpath.basename(key): S3_CACHE.get_presigned_url(key)
+        for key in profile_keys(job_id)
+    }
+
+
+def frame_label(code: Any) -> str:
+    """Name of a function in a stack, with its file and first line."""
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class StackSampler:
+    """Samples the call stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        """
+        Args:
+            thread_id (int): Thread to sample, see ``threading.get_ident``.
+            interval (float): Seconds between samples.
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the number of samples of each stack."""
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+    def _run(self) -> None:
+        labels: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.counts[tuple(reversed(stack))] += 1
+
+
+def folded_stacks(counts: Counter) -> str:
+    """Samples in folded format, one ``caller;...;callee count`` line per stack."""
+    return "".join(f"{';'.join(stack)} {n}\n" for stack, n in counts.most_common())
+
+
+def text_report(
+    stage: str,
+    task_id: str,
+    seconds: float,
+    interval: float,
+    counts: Counter,
+    peak: Optional[int],
+    snapshot: Optional[tracemalloc.Snapshot],
+) -> str:
+    """Hottest functions by own and total samples, and the memory peak."""
+    total = sum(counts.values()) or 1
+    own: Counter = Counter()
+    cumulative: Counter = Counter()
+    for stack, n in counts.items():
+        own[stack[-1]] += n
+        for label in set(stack):
+            cumulative[label] += n
+
+    lines = [
+        f"stage {stage}, task {task_id}",
+        f"wall time {seconds:.2f} s, {sum(counts.values())} samples every "
+        f"{interval * 1000:.0f} ms",
+    ]
+    for title, counter in (("own time", own), ("total time", cumulative)):
+        lines += ["", f"Top functions by {title}:"]
+        lines += [
+            f"{100 * n / total:6.1f}%  {label}"
+            for label, n in counter.most_common(REPORT_TOP)
+        ]
+    if peak is not None:
+        lines += ["", f"Peak traced memory {peak / MB:.1f} MB"]
+    if snapshot is not None:
+        lines += ["", "Largest allocations still alive at the end:"]
+        for stat in snapshot.statistics("lineno")[:REPORT_TOP]:
+            frame = stat.traceback[0]
+            source = linecache.getline(frame.filename, frame.lineno).strip()
+            lines.append(
+                f"{stat.size / MB:8.1f} MB  {os.path.basename(frame.filename)}:"
+                f"{frame.lineno}  {source}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+class TaskProfile:
+    """Sampler and allocation tracing of one running task."""
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.sampler = StackSampler(
+            threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL
+        )
+        self.traced = settings.PROFILE_TRACE_MEMORY
+        self.started_tracing = False
+        self.started = time.perf_counter()
+
+    def start(self) -> None:
+        if self.traced:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self.started_tracing = True
+        self.sampler.start()
+        self.started = time.perf_counter()
+
+    def stop(self, task_id: str) -> Dict[str, str]:
+        """Stop profiling and return the report contents by file extension."""
+        seconds = time.perf_counter() - self.started
+        counts = self.sampler.stop()
+        peak = snapshot = None
+        if self.traced:
+            peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            if self.started_tracing:
+                tracemalloc.stop()
+        interval = self.sampler.interval
+        return {
+            "folded": folded_stacks(counts),
+            "txt": text_report(
+                self.stage, task_id, seconds, interval, counts, peak, snapshot
+            ),
+        }
+
+
+# Profiles of the tasks running in this process
+_profiles: Dict[str, TaskProfile] = {}
+
+
+async def _job_prefix(job_id: str) -> str:
+    """S3 prefix of a job, the directory of its audio."""
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(select(Job.audio_key).where(Job.id == job_id))
+            audio_key = result.scalar_one_or_none()
+    finally:
+        await engine.dispose()
+    return posixpath.dirname(audio_key) if audio_key else f"jobs/{job_id}"
+
+
+def upload_reports(
+    job_id: str, stage: str, task_id: str, reports: Dict[str, str]
+) -> List[str]:
+    """Store the reports of a task in S3 and list them for the job status."""
+    prefix = asyncio.run(_job_prefix(job_id))
+    keys = []
+    for extension, content in reports.items():
+        key = f"{prefix}/profiles/{stage}-{task_id}.{extension}"
+        S3_CACHE.save(content.encode(), key)
+        keys.append(key)
+    list_key = job_key(job_id, "profiles")
+    pipe = REDIS_CACHE.cache.pipeline()
+    pipe.rpush(list_key, *keys)
+    pipe.expire(list_key, settings.JOB_ARTIFACT_TTL)
+    pipe.execute()
+    return keys
+
+
+@task_prerun.connect
+def on_task_prerun(
+    task_id: str, task: Any, kwargs: Optional[Dict[str, Any]] = None, **_: Any
+) -> None:
+    job_id = (kwargs or {}).get("job_id")
+    stage = stage_name(task)
+    try:
+        if not job_id or not is_profiled(job_id, stage):
+            return
+        profile = TaskProfile(stage)
+        profile.start()
+        _profiles[task_id] = profile
+    except Exception as e:
+        logger.warning("profiling_start_failed", task_id=task_id, error=str(e))
+
+
+@task_postrun.connect
+def on_task_postrun(
+    task_id: str, kwargs: Optional[Dict[str, Any]] = None, **_: Any
+) -> None:
+    profile = _profiles.pop(task_id, None)
+    if profile is None:
+        return
+    job_id = (kwargs or {}).get("job_id")
+    # Profiling must never fail the task
+    try:
+        reports = profile.stop(task_id)
+        keys = upload_reports(job_id, profile.stage, task_id, reports)
+        logger.info("task_profiled", job_id=job_id, stage=profile.stage, keys=keys)
+    except Exception as e:
+        logger.warning("profiling_failed", job_id=job_id, task_id=task_id, error=str(e))
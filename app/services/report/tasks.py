@@ -0,0 +1,41 @@
+from typing import Optional
+from app.core.config import settings
+from app.services.celery_worker import c_worker
+from app.services.cache import REDIS_CACHE, S3_CACHE, job_key
+from app.services.pipeline import TRANSIENT_ERRORS, checkpointed, retry_policy
+from app.services.summarize.render_pool import RENDER_POOL, RenderQueueFull
+
+# A render that hit RENDER_TIMEOUT would time out again, it is not retried
+RENDER_ERRORS = tuple(e for e in TRANSIENT_ERRORS if e is not TimeoutError) + (
+    RenderQueueFull,
+)
+
+
+@c_worker.task(**retry_policy(settings.STAGE_MAX_RETRIES, RENDER_ERRORS))
+@checkpointed
+def render_report(
+    result_key: str, job_id: str, report_key: str, backend: Optional[str] = None
+) -> str:
+    """
+    Celery task rendering the PDF report of a job right after summarization.
+
+    The PDF is stored at the job report key and the summarization result key
+    is passed through unchanged, so that this stage can end the pipeline.
+
+    Args:
+        result_key (str): Cache key of the summarization result.
+        job_id (str): Job of the report.
+        report_key (str): S3 key of the PDF report.
+        backend (Optional[str]): PDF backend, defaults to PDF_BACKEND.
+
+    Returns:
+        str: The summarization result key.
+    """
+    result = REDIS_CACHE.load(result_key)
+    pdf_bytes = RENDER_POOL.render(result, backend)
+    S3_CACHE.save(pdf_bytes, report_key)
+    # Lets the export endpoint serve the stored PDF instead of rendering again
+    REDIS_CACHE.put(
+        job_key(job_id, "report"), result_key, expire=settings.JOB_ARTIFACT_TTL
+    )
+    return result_key
@@ -0,0 +1,311 @@
+"""
+Shortest-job-first admission of jobs, with aging and per-user fair share.
+
+Transcription and diarization occupy a worker for a time proportional to the
+audio, so a single long recording dispatched first blocks every short one
+behind it. Jobs are instead queued in a Redis sorted set scored by
+
+    submitted_at + SJF_DURATION_WEIGHT * audio_duration
+
+and only ``SCHEDULER_MAX_ACTIVE_JOBS`` of them run their audio stages at a
+time. Short jobs overtake long ones, but a long job never waits more than
+``SJF_DURATION_WEIGHT * audio_duration`` seconds longer than it would in
+arrival order. Every later stage is published with a broker priority derived
+from the same delay, so short jobs also go first through conversation,
+summarization and report stages, and a waiting job ages towards the front.
+
+So that a user submitting many jobs cannot push everyone else back, the
+arrival time is the start tag of start-time fair queueing: each user has a
+virtual clock that advances by ``audio_duration / share_weight`` per job, and
+a job starts at the later of its submission and its user's clock. The jobs
+of a user who floods the queue are spread out in time, while an occasional
+user's job keeps its real arrival time and goes between them. Users are
+also limited in how many jobs they have pending or running at once, see
+``app.api.summarize``.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+import structlog
+from celery.canvas import Signature
+from celery.result import AsyncResult
+from celery.signals import before_task_publish
+
+from app.core.config import settings
+from app.services.cache import REDIS_CACHE, job_key
+from app.services.metrics import JOB_ADMISSION_WAIT_SECONDS
+from app.services.pipeline import freeze_pipeline
+
+logger = structlog.get_logger("job-scheduler")
+
+# Broker priorities of the Redis transport, 0 is served first
+MAX_PRIORITY = 9
+
+# KEYS: queue, running
+# ARGV: limit, now, lease expiry
+_ADMIT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[2])
+local free = tonumber(ARGV[1]) - redis.call('ZCARD', KEYS[2])
+local admitted = {}
+while free > 0 do
+    local head = redis.call('ZPOPMIN', KEYS[1])
+    if #head == 0 then
+        break
+    end
+    redis.call('ZADD', KEYS[2], ARGV[3], head[1])
+    table.insert(admitted, head[1])
+    free = free - 1
+end
+return admitted
+"""
+
+# KEYS: queue, user clock
+# ARGV: job id, now, SJF delay, virtual cost
+_ENQUEUE_SCRIPT = """
+local now = tonumber(ARGV[2])
+local start = math.max(now, tonumber(redis.call('GET', KEYS[2]) or '0'))
+local finish = start + tonumber(ARGV[4])
+redis.call('SET', KEYS[2], tostring(finish), 'EX', math.ceil(finish - now) + 1)
+local score = start + tonumber(ARGV[3])
+redis.call('ZADD', KEYS[1], score, ARGV[1])
+return tostring(score)
+"""
+
+# Share of a user without a configured weight
+DEFAULT_SHARE_WEIGHT = 1.0
+
+
+def remaining_delay(duration: float, waited: float) -> float:
+    """Seconds a job still yields to shorter ones, see the module docstring."""
+    return max(0.0, settings.SJF_DURATION_WEIGHT * duration - waited)
+
+
+def stage_priority(duration: float, waited: float = 0.0) -> int:
+    """
+    Broker priority of a stage of a job, 0 (first) to 9 (last).
+
+    The remaining delay is bucketed on a log scale: a 5-minute meeting gets
+    priority 1, a 4-hour recording 5, and both reach 0 as they wait.
+
+    Args:
+        duration (float): Seconds of audio of the job.
+        waited (float): Seconds since the job was submitted.
+
+    Returns:
+        int: Celery task priority.
+    """
+    delay = remaining_delay(duration, waited)
+    return min(MAX_PRIORITY, int(math.log2(1 + delay / 60)))
+
+
+class JobScheduler:
+    """Redis-backed admission queue ordered by duration-weighted fair arrival."""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        limit: Optional[int] = None,
+        lease: Optional[int] = None,
+        namespace: str = "jobs:scheduler",
+    ) -> None:
+        """
+        Args:
+            client (redis.Redis): Redis connection.
+            limit (Optional[int]): Jobs allowed in their audio stages at once,
+                0 dispatches every job on submission.
+            lease (Optional[int]): Seconds after which an admitted job that
+                never reported back gives its slot up.
+            namespace (str): Prefix of the scheduler keys.
+        """
+        self.client = client
+        self.limit = settings.SCHEDULER_MAX_ACTIVE_JOBS if limit is None else limit
+        self.lease = lease or settings.SCHEDULER_LEASE_SECONDS
+        self.queue_key = f"{namespace}:queue"
+        self.running_key = f"{namespace}:running"
+        self.clock_prefix = f"{namespace}:clock"
+        self._admit = self.client.register_script(_ADMIT_SCRIPT)
+        self._enqueue = self.client.register_script(_ENQUEUE_SCRIPT)
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for admission."""
+        return int(self.client.zcard(self.queue_key))
+
+    def retry_after(self) -> int:
+        """
+        Seconds a client should wait before submitting again.
+
+        Estimated from the number of jobs ahead per admission slot, at
+        ``ADMISSION_RETRY_AFTER_PER_JOB`` seconds each.
+        """
+        per_slot = math.ceil((self.queue_depth() + 1) / max(1, self.limit))
+        return min(
+            settings.ADMISSION_RETRY_AFTER_MAX,
+            per_slot * settings.ADMISSION_RETRY_AFTER_PER_JOB,
+        )
+
+    def submit(
+        self,
+        job_id: str,
+        canvas: Signature,
+        duration: float,
+        user_id: Optional[int] = None,
+        weight: Optional[float] = None,
+    ) -> AsyncResult:
+        """
+        Queue the canvas of a job and dispatch it once admitted.
+
+        Args:
+            job_id (str): Job of the canvas.
+            canvas (Signature): Canvas built by ``build_pipeline``.
+            duration (float): Seconds of audio of the job.
+            user_id (Optional[int]): Owner of the job, whose share it uses.
+                Jobs without an owner are only ordered shortest first.
+            weight (Optional[float]): Share of the owner, a user with weight 2
+                gets twice the audio time of a user with weight 1.
+
+        Returns:
+            AsyncResult: Result of the last stage, valid before dispatch.
+        """
+        info = schedule_info(job_id)
+        new = info is None
+        if new:
+            info = {"duration": duration, "submitted_at": time.time()}
+        result = freeze_pipeline(job_id, canvas)
+        if not self.limit:
+            if new:
+                self._save_info(job_id, info)
+            canvas.apply_async()
+            return result
+
+        REDIS_CACHE.put(
+            job_key(job_id, "canvas"), canvas, expire=settings.JOB_ARTIFACT_TTL
+        )
+        if "score" in info:
+            # A resubmitted job keeps its place, it already waited
+            self.client.zadd(self.queue_key, {job_id: info["score"]})
+            self.release()
+            return result
+
+        delay = settings.SJF_DURATION_WEIGHT * duration
+        if user_id is None:
+            info["score"] = info["submitted_at"] + delay
+            self.client.zadd(self.queue_key, {job_id: info["score"]})
+        else:
+            info["score"] = float(
+                self._enqueue(
+                    keys=[self.queue_key, f"{self.clock_prefix}:{user_id}"],
+                    args=[
+                        job_id,
+                        info["submitted_at"],
+                        delay,
+                        duration / (weight or DEFAULT_SHARE_WEIGHT),
+                    ],
+                )
+            )
+        self._save_info(job_id, info)
+        self.release()
+        return result
+
+    def release(self) -> List[str]:
+        """
+        Dispatch queued jobs while admission slots are free.
+
+        Returns:
+            List[str]: Ids of the dispatched jobs.
+        """
+        if not self.limit:
+            return []
+        dispatched: List[str] = []
+        while True:
+            now = time.time()
+            admitted = self._admit(
+                keys=[self.queue_key, self.running_key],
+                args=[self.limit, now, now + self.lease],
+            )
+            if not admitted:
+                return dispatched
+            for raw in admitted:
+                job_id = raw.decode()
+                canvas = REDIS_CACHE.get(job_key(job_id, "canvas"))
+                if canvas is None:
+                    # Cancelled or expired while queued
+                    self.client.zrem(self.running_key, job_id)
+                    continue
+                canvas.apply_async()
+                REDIS_CACHE.delete(job_key(job_id, "canvas"))
+                info = schedule_info(job_id) or {}
+                waited = now - info.get("submitted_at", now)
+                JOB_ADMISSION_WAIT_SECONDS.labels(
+                    priority=str(stage_priority(info.get("duration", 0.0)))
+                ).observe(waited)
+                logger.info(
+                    "job_admitted",
+                    job_id=job_id,
+                    waited_s=round(waited, 1),
+                    duration=info.get("duration"),
+                )
+                dispatched.append(job_id)
+
+    def finish(self, job_id: str) -> None:
+        """Free the slot of a job whose audio stages are over."""
+        if self.limit and self.client.zrem(self.running_key, job_id):
+            self.release()
+
+    @staticmethod
+    def _save_info(job_id: str, info: Dict[str, float]) -> None:
+        REDIS_CACHE.put(
+            job_key(job_id, "schedule"), info, expire=settings.JOB_ARTIFACT_TTL
+        )
+
+    def discard(self, job_id: str) -> None:
+        """Remove a job from the queue and free its slot, e.g. on cancellation."""
+        self.client.zrem(self.queue_key, job_id)
+        self.finish(job_id)
+
+
+async def release_periodically(scheduler: JobScheduler, interval: float) -> None:
+    """
+    Call ``scheduler.release`` every ``interval`` seconds, until cancelled.
+
+    Slots are otherwise only released when a job is submitted or finishes,
+    so the queue would stall once every admitted job had died without
+    reporting back and its lease had expired.
+
+    Args:
+        scheduler (JobScheduler): Scheduler whose queue is released.
+        interval (float): Seconds between two releases.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(scheduler.release)
+        except Exception as e:
+            logger.warning("scheduler_release_failed", error=repr(e))
+
+
+def schedule_info(job_id: str) -> Optional[Dict[str, float]]:
+    """Audio duration and submission time of a job, if it was scheduled."""
+    return REDIS_CACHE.get(job_key(job_id, "schedule"))
+
+
+@before_task_publish.connect
+def on_before_task_publish(
+    body: Any = None, properties: Optional[Dict[str, Any]] = None, **_: Any
+) -> None:
+    # Priority is computed when each stage is published, so jobs age
+    kwargs = body[1] if isinstance(body, tuple) else (body or {}).get("kwargs", {})
+    job_id = (kwargs or {}).get("job_id")
+    if not job_id or properties is None:
+        return
+    info = schedule_info(job_id)
+    if info is not None:
+        properties["priority"] = stage_priority(
+            info["duration"], time.time() - info["submitted_at"]
+        )
+
+
+SCHEDULER = JobScheduler(REDIS_CACHE.cache)
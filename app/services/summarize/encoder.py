@@ -0,0 +1,252 @@
+"""
+Compact, token-budgeted transcript encoding for LLM prompts.
+
+Turns are rendered as ``[<seconds>] [S1]: text`` lines with short speaker
+aliases and coarse timestamps, adjacent short turns are merged into a single
+line, turns longer than the budget are split at sentence, word or token
+boundaries, and the lines are packed into chunks that fit a tiktoken budget.
+The encoder keeps enough bookkeeping to map aliases in the model output back
+to the original speaker labels.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+import tiktoken
+
+from app.core.config import settings
+from app.schemas.langchain import ExtractedItem, Turn
+
+# Aliases are bracketed so that "S3" in "backups to S3" is not a speaker
+ALIAS_PATTERN = re.compile(r"\[S\d+\]")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(name: str) -> Optional[Any]:
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # Encoding files are fetched on first use; fall back to an estimate
+        # rather than failing the whole job when they are unavailable.
+        return None
+
+
+def count_tokens(text: str, encoding_name: Optional[str] = None) -> int:
+    """
+    Count the tokens of a text with tiktoken.
+
+    Args:
+        text (str): Text to measure.
+        encoding_name (Optional[str]): tiktoken encoding, defaults to settings.
+
+    Returns:
+        int: Number of tokens (estimated as chars / 4 if the encoding is missing).
+    """
+    encoding = _get_encoding(encoding_name or settings.PROMPT_TOKEN_ENCODING)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def decode_aliases(text: str, aliases: Dict[str, str]) -> str:
+    """Replace the speaker aliases ([S1], ...) the encoder emitted by the real labels."""
+    if not aliases:
+        return text
+    return ALIAS_PATTERN.sub(lambda m: aliases.get(m.group(0), m.group(0)), text)
+
+
+@dataclass
+class EncodedLine:
+    """A rendered prompt line and the original time span it covers."""
+
+    start: float
+    end: float
+    label: int  # coarse timestamp shown to the model
+    text: str
+    tokens: int
+
+
+@dataclass
+class EncodedTranscript:
+    """Prompt chunks plus the mappings needed to decode the model output."""
+
+    chunks: List[str]
+    lines: List[EncodedLine]
+    aliases: Dict[str, str] = field(default_factory=dict)  # [alias] -> speaker
+    tokens: int = 0
+
+    def decode_text(self, text: str) -> str:
+        """Replace speaker aliases in a model-generated text by the real labels."""
+        return decode_aliases(text, self.aliases)
+
+    def encode_text(self, text: str) -> str:
+        """Replace real speaker labels in a text by their aliases."""
+        if not self.aliases:
+            return text
+        labels = {speaker: alias for alias, speaker in self.aliases.items()}
+        pattern = "|".join(re.escape(label) for label in sorted(labels, key=len)[::-1])
+        return re.sub(rf"\b({pattern})\b", lambda m: labels[m.group(0)], text)
+
+    def decode_items(self, items: List[Any]) -> List[ExtractedItem]:
+        """Decode speaker aliases in the text of extracted items."""
+        return [ExtractedItem(text=self.decode_text(item.text)) for item in items]
+
+
+class TranscriptEncoder:
+    """Encodes conversation turns into compact prompt chunks."""
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        time_resolution: Optional[int] = None,
+        merge_max_tokens: Optional[int] = None,
+        encoding_name: Optional[str] = None,
+    ) -> None:
+        self.token_budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+        self.time_resolution = max(
+            time_resolution or settings.PROMPT_TIME_RESOLUTION, 1
+        )
+        self.merge_max_tokens = (
+            settings.PROMPT_MERGE_MAX_TOKENS
+            if merge_max_tokens is None
+            else merge_max_tokens
+        )
+        self.encoding_name = encoding_name or settings.PROMPT_TOKEN_ENCODING
+
+    def _coarse(self, seconds: float) -> int:
+        return int(seconds // self.time_resolution) * self.time_resolution
+
+    def _units(self, text: str, budget: int) -> Iterator[str]:
+        """Sentences of a text, or words and token slices of the longer ones."""
+        for sentence in SENTENCE_END.split(text):
+            if count_tokens(sentence, self.encoding_name) <= budget:
+                yield sentence
+                continue
+            for word in sentence.split():
+                if count_tokens(word, self.encoding_name) <= budget:
+                    yield word
+                    continue
+                encoding = _get_encoding(self.encoding_name)
+                if encoding is None:
+                    # Token counts are estimated as chars / 4
+                    for i in range(0, len(word), 4 * budget):
+                        yield word[i : i + 4 * budget]
+                    continue
+                ids = encoding.encode(word, disallowed_special=())
+                for i in range(0, len(ids), budget):
+                    yield encoding.decode(ids[i : i + budget])
+
+    def _split(self, text: str, budget: int) -> List[str]:
+        """
+        Split a text into pieces of at most ``budget`` tokens.
+
+        Args:
+            text (str): Whitespace-normalised text of a turn.
+            budget (int): Maximum tokens of a piece.
+
+        Returns:
+            List[str]: Pieces cut at sentence boundaries when possible, then at
+            word and token boundaries.
+        """
+        pieces: List[str] = []
+        current: List[str] = []
+        used = 0
+        for unit in self._units(text, budget):
+            # The joining space costs at most one token
+            tokens = count_tokens(unit, self.encoding_name) + 1
+            if current and used + tokens > budget:
+                pieces.append(" ".join(current))
+                current, used = [], 0
+            current.append(unit)
+            used += tokens
+        if current:
+            pieces.append(" ".join(current))
+        return pieces
+
+    def _turn_lines(self, turn: Turn, alias: str, text: str) -> List[EncodedLine]:
+        """Render a turn as one line, or as several if it exceeds the budget."""
+        label = self._coarse(turn.start)
+        rendered = f"[{label}] {alias}: {text}"
+        tokens = count_tokens(rendered, self.encoding_name)
+        if tokens < self.token_budget:
+            return [EncodedLine(turn.start, turn.end, label, rendered, tokens)]
+
+        # Room left by the prefix and the newline, with a margin for later labels
+        prefix = count_tokens(f"[{label}] {alias}: ", self.encoding_name) + 2
+        pieces = self._split(text, max(self.token_budget - prefix, 1))
+        lines = []
+        offset = 0
+        # Pieces share the time span of the turn in proportion to their length
+        duration = (turn.end - turn.start) / len(text)
+        for piece in pieces:
+            start = turn.start + offset * duration
+            offset += len(piece) + 1
+            label = self._coarse(start)
+            rendered = f"[{label}] {alias}: {piece}"
+            lines.append(
+                EncodedLine(
+                    start=start,
+                    end=min(turn.start + offset * duration, turn.end),
+                    label=label,
+                    text=rendered,
+                    tokens=count_tokens(rendered, self.encoding_name),
+                )
+            )
+        return lines
+
+    def encode(self, turns: List[Turn]) -> EncodedTranscript:
+        """
+        Encode turns into chunks that each fit the token budget.
+
+        Args:
+            turns (List[Turn]): Conversation turns.
+
+        Returns:
+            EncodedTranscript: Chunks and decoding information.
+        """
+        speakers: Dict[str, str] = {}
+        lines: List[EncodedLine] = []
+        for turn in turns:
+            text = " ".join(turn.text.split())
+            if not text:
+                continue
+            alias = speakers.setdefault(str(turn.speaker), f"[S{len(speakers) + 1}]")
+            piece = f"{alias}: {text}"
+            piece_tokens = count_tokens(piece, self.encoding_name)
+
+            prev = lines[-1] if lines else None
+            if (
+                prev is not None
+                and piece_tokens < self.merge_max_tokens
+                and prev.tokens + piece_tokens <= 4 * self.merge_max_tokens
+                and prev.tokens + piece_tokens < self.token_budget
+                and turn.start - prev.end <= self.time_resolution
+            ):
+                prev.text = f"{prev.text} | {piece}"
+                prev.end = max(prev.end, turn.end)
+                prev.tokens += piece_tokens + 1
+                continue
+
+            lines.extend(self._turn_lines(turn, alias, text))
+
+        chunks: List[str] = []
+        buffer: List[str] = []
+        used = 0
+        for line in lines:
+            if buffer and used + line.tokens > self.token_budget:
+                chunks.append("\n".join(buffer))
+                buffer, used = [], 0
+            buffer.append(line.text)
+            used += line.tokens + 1
+        if buffer or not chunks:
+            chunks.append("\n".join(buffer))
+
+        return EncodedTranscript(
+            chunks=chunks,
+            lines=lines,
+            aliases={alias: speaker for speaker, alias in speakers.items()},
+            tokens=sum(line.tokens + 1 for line in lines),
+        )
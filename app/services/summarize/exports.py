@@ -0,0 +1,157 @@
+"""
+Lightweight report exports rendered straight from a stored result.
+
+Markdown, JSON and HTML exports never go through a PDF renderer, so
+integrations that only need the structured data get it in milliseconds.
+Rendered exports are cached per job together with their ETag.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.services.cache import RedisCache, job_key
+from app.services.summarize.report import HTMLReportRenderer
+
+# Media type of each export format
+EXPORT_MEDIA_TYPES = {
+    "md": "text/markdown; charset=utf-8",
+    "json": "application/json",
+    "html": "text/html; charset=utf-8",
+    "pdf": "application/pdf",
+}
+
+
+def result_to_dict(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a summarization result to JSON-serializable data."""
+
+    def convert(value: Any) -> Any:
+        if isinstance(value, BaseModel):
+            return value.model_dump()
+        if isinstance(value, (list, tuple)):
+            return [convert(v) for v in value]
+        if isinstance(value, dict):
+            return {k: convert(v) for k, v in value.items()}
+        return value
+
+    return convert(result)
+
+
+def render_json(result: Dict[str, Any]) -> bytes:
+    """Render a result as JSON."""
+    return json.dumps(result_to_dict(result), ensure_ascii=False).encode("utf-8")
+
+
+def _markdown_items(items: List[Any], empty_message: str) -> List[str]:
+    if not items:
+        return [f"_{empty_message}_"]
+    return [f"- {item.text} [{item.start:.2f}-{item.end:.2f}]" for item in items]
+
+
+def render_markdown(result: Dict[str, Any]) -> bytes:
+    """Render a result as Markdown."""
+    lines = [
+        "# Conversation Summary Report",
+        "",
+        f"**Status:** {result.get('status', 'unknown')}",
+        "",
+        "## Executive Summary",
+        "",
+        result.get("summary", ""),
+        "",
+        "## Key Topics Discussed",
+        "",
+        *_markdown_items(result.get("topics", []), "No topics identified"),
+        "",
+        "## Decisions Made",
+        "",
+        *_markdown_items(result.get("decisions", []), "No decisions recorded"),
+        "",
+        "## Action Items",
+        "",
+        *_markdown_items(result.get("actions", []), "No action items identified"),
+        "",
+        "## Full Transcript",
+        "",
+    ]
+    turns = result.get("turns", [])
+    if turns:
+        lines.extend(
+            f"- **[{t.start:.2f}-{t.end:.2f}] {t.speaker}:** {t.text}" for t in turns
+        )
+    else:
+        lines.append("_No transcript recorded_")
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+class ReportExporter:
+    """Renders and caches the exports of finished jobs."""
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        pdf_renderer: Callable[[Dict[str, Any]], bytes],
+        ttl: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            cache (RedisCache): Cache holding rendered exports.
+            pdf_renderer (Callable): Renders a result to PDF bytes.
+            ttl (Optional[int]): Seconds a rendered export is kept.
+        """
+        self.cache = cache
+        self.ttl = settings.JOB_ARTIFACT_TTL if ttl is None else ttl
+        html_renderer = HTMLReportRenderer()
+        self.renderers: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+            "md": render_markdown,
+            "json": render_json,
+            "html": lambda result: html_renderer.render(result).encode("utf-8"),
+            "pdf": pdf_renderer,
+        }
+
+    def cached(
+        self, job_id: str, fmt: str, result_key: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached export of a job, if it was rendered from this result.
+
+        Args:
+            job_id (str): Job of the export.
+            fmt (str): Export format.
+            result_key (str): Cache key of the summarization result.
+
+        Returns:
+            Optional[Dict[str, Any]]: ``{"etag", "body", "result_key"}`` or None.
+        """
+        entry = self.cache.get(job_key(job_id, "export", fmt))
+        if entry is None or entry["result_key"] != result_key:
+            return None
+        return entry
+
+    def render(
+        self, job_id: str, fmt: str, result_key: str, result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Render an export and cache it for the job.
+
+        Args:
+            job_id (str): Job of the export.
+            fmt (str): Export format, a key of ``EXPORT_MEDIA_TYPES``.
+            result_key (str): Cache key of the summarization result.
+            result (Dict[str, Any]): The summarization result.
+
+        Returns:
+            Dict[str, Any]: ``{"etag", "body", "result_key"}``.
+        """
+        body = self.renderers[fmt](result)
+        entry = {
+            "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            "body": body,
+            "result_key": result_key,
+        }
+        self.cache.put(job_key(job_id, "export", fmt), entry, expire=self.ttl)
+        return entry
@@ -0,0 +1,261 @@
+"""
+Distributed concurrency governor for calls to the shared Ollama backend.
+
+Workers take a ticket in a Redis sorted set and only call the model once
+their ticket reaches the head of the queue and one of the
+``LLM_MAX_INFLIGHT`` slots is free. Tickets are ordered by arrival (FIFO) or
+by priority then arrival, and slots are leases that expire, so a crashed
+worker cannot hold a slot forever.
+"""
+
+import contextlib
+import time
+import uuid
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import redis
+import structlog
+
+from app.core.config import settings
+from app.services.metrics import (
+    LLM_GENERATION_SECONDS,
+    LLM_QUEUE_WAIT_SECONDS,
+    LLM_TOKENS_PER_SECOND,
+)
+
+logger = structlog.get_logger("llm-governor")
+
+# KEYS: queue, holders, heartbeats
+# ARGV: ticket, limit, now, lease, stale
+_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+local stale = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[3] - ARGV[5])
+for _, member in ipairs(stale) do
+    redis.call('ZREM', KEYS[1], member)
+    redis.call('ZREM', KEYS[3], member)
+end
+redis.call('ZADD', KEYS[3], ARGV[3], ARGV[1])
+local free = tonumber(ARGV[2]) - redis.call('ZCARD', KEYS[2])
+if free <= 0 then
+    return 0
+end
+local rank = redis.call('ZRANK', KEYS[1], ARGV[1])
+if not rank then
+    return -1
+end
+if rank < free then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('ZREM', KEYS[3], ARGV[1])
+    redis.call('ZADD', KEYS[2], ARGV[3] + ARGV[4], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+def split_response(response: Any) -> Tuple[Any, Any]:
+    """
+    Separate the parsed output of a model from the chat message it came from.
+
+    Structured models are bound with ``include_raw=True`` so that the usage
+    reported by Ollama is not lost in parsing. Other responses are their own
+    message.
+
+    Args:
+        response (Any): Output of ``model.invoke``.
+
+    Returns:
+        Tuple[Any, Any]: The parsed output and the raw message.
+
+    Raises:
+        Exception: The parsing error of a structured response.
+    """
+    if isinstance(response, dict) and {"raw", "parsed"} <= response.keys():
+        if response.get("parsing_error") is not None:
+            raise response["parsing_error"]
+        return response["parsed"], response["raw"]
+    return response, response
+
+
+def output_rate(message: Any, generation: float) -> Tuple[Optional[int], float]:
+    """
+    Output tokens of a chat message and the rate they were generated at.
+
+    Tokens are Ollama's ``eval_count``, timed by its ``eval_duration`` when
+    reported, or else by the duration of the whole call.
+
+    Args:
+        message (Any): Chat message returned by the model.
+        generation (float): Seconds the call took.
+
+    Returns:
+        Tuple[Optional[int], float]: Output tokens, None if the model did not
+        report them, and tokens per second.
+    """
+    tokens = (getattr(message, "usage_metadata", None) or {}).get("output_tokens")
+    if not tokens:
+        return tokens, 0.0
+    metadata = getattr(message, "response_metadata", None) or {}
+    seconds = metadata.get("eval_duration", 0) / 1e9 or generation
+    return tokens, tokens / seconds if seconds > 0 else 0.0
+
+
+class LLMGovernor:
+    """Redis-backed semaphore with FIFO or priority ordering."""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        limit: Optional[int] = None,
+        order: Optional[str] = None,
+        lease: Optional[int] = None,
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.2,
+        namespace: str = "llm:governor",
+    ) -> None:
+        self.client = client
+        self.limit = limit or settings.LLM_MAX_INFLIGHT
+        self.order = order or settings.LLM_QUEUE_ORDER
+        self.lease = lease or settings.LLM_LEASE_SECONDS
+        self.timeout = timeout or settings.LLM_ACQUIRE_TIMEOUT
+        self.poll_interval = poll_interval
+        self.queue_key = f"{namespace}:queue"
+        self.holders_key = f"{namespace}:holders"
+        self.heartbeats_key = f"{namespace}:heartbeats"
+        self._acquire = self.client.register_script(_ACQUIRE_SCRIPT)
+
+    def _score(self, priority: int) -> float:
+        now_ms = time.time() * 1000
+        if self.order == "priority":
+            # Lower priority values are served first, FIFO within a priority.
+            return priority * 1e13 + now_ms
+        return now_ms
+
+    def queue_depth(self) -> int:
+        """Number of LLM calls waiting for a slot."""
+        return int(self.client.zcard(self.queue_key))
+
+    def in_flight(self) -> int:
+        """Number of LLM calls currently holding a slot."""
+        self.client.zremrangebyscore(self.holders_key, "-inf", time.time())
+        return int(self.client.zcard(self.holders_key))
+
+    @contextlib.contextmanager
+    def slot(
+        self, priority: int = 0, abort_check: Optional[Callable[[], None]] = None
+    ) -> Iterator[float]:
+        """
+        Wait for a free slot and hold it for the duration of the block.
+
+        Args:
+            priority (int): Lower values are served first in priority mode.
+            abort_check (Optional[Callable[[], None]]): Called while waiting,
+                raises to give up the wait (e.g. when the job was cancelled).
+
+        Yields:
+            float: Seconds spent waiting in the queue.
+        """
+        ticket = str(uuid.uuid4())
+        queued_at = time.monotonic()
+        self.client.zadd(self.queue_key, {ticket: self._score(priority)})
+        try:
+            while True:
+                acquired = self._acquire(
+                    keys=[self.queue_key, self.holders_key, self.heartbeats_key],
+                    args=[
+                        ticket,
+                        self.limit,
+                        time.time(),
+                        self.lease,
+                        10 * self.poll_interval + 5,
+                    ],
+                )
+                if acquired == 1:
+                    break
+                if acquired == -1:
+                    # Our ticket was evicted as stale, e.g. after a long GC pause.
+                    self.client.zadd(self.queue_key, {ticket: self._score(priority)})
+                if abort_check is not None:
+                    abort_check()
+                if time.monotonic() - queued_at > self.timeout:
+                    raise TimeoutError(
+                        f"No LLM slot freed up within {self.timeout} seconds"
+                    )
+                time.sleep(self.poll_interval)
+        except BaseException:
+            self.client.zrem(self.queue_key, ticket)
+            self.client.zrem(self.heartbeats_key, ticket)
+            raise
+
+        try:
+            yield time.monotonic() - queued_at
+        finally:
+            self.client.zrem(self.holders_key, ticket)
+
+    def invoke(
+        self,
+        model: Any,
+        messages: List[Any],
+        priority: int = 0,
+        abort_check: Optional[Callable[[], None]] = None,
+    ) -> Any:
+        """
+        Call a model once a slot is available and log wait vs generation time.
+
+        Args:
+            model (Any): Runnable to invoke.
+            messages (List[Any]): Prompt messages.
+            priority (int): Scheduling priority of the call.
+            abort_check (Optional[Callable[[], None]]): Raises to give up
+                waiting for a slot.
+
+        Returns:
+            Any: The model response, parsed for structured models.
+        """
+        with self.slot(priority, abort_check) as queue_wait:
+            started = time.monotonic()
+            response, message = split_response(model.invoke(messages))
+            generation = time.monotonic() - started
+        LLM_QUEUE_WAIT_SECONDS.observe(queue_wait)
+        LLM_GENERATION_SECONDS.observe(generation)
+        tokens, rate = output_rate(message, generation)
+        if rate:
+            LLM_TOKENS_PER_SECOND.observe(rate)
+        logger.info(
+            "llm_call",
+            queue_wait_s=round(queue_wait, 3),
+            generation_s=round(generation, 3),
+            priority=priority,
+            output_tokens=tokens,
+        )
+        return response
+
+    def wrap(
+        self,
+        model: Any,
+        priority: int = 0,
+        abort_check: Optional[Callable[[], None]] = None,
+    ) -> "GovernedModel":
+        """Return a runnable-like wrapper that calls ``model`` through the governor."""
+        return GovernedModel(self, model, priority, abort_check)
+
+
+class GovernedModel:
+    """Exposes ``invoke`` so a governed model can be used wherever a runnable is."""
+
+    def __init__(
+        self,
+        governor: LLMGovernor,
+        model: Any,
+        priority: int = 0,
+        abort_check: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.governor = governor
+        self.model = model
+        self.priority = priority
+        self.abort_check = abort_check
+
+    def invoke(self, messages: List[Any]) -> Any:
+        return self.governor.invoke(
+            self.model, messages, self.priority, self.abort_check
+        )
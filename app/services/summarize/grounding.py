@@ -0,0 +1,126 @@
+"""
+Deterministic timestamp grounding of extracted items.
+
+Instead of asking the LLM for start/end times, every extracted topic,
+decision and action is matched against the conversation turns with a BM25
+index over unigrams and bigrams, and its timestamps are taken from the
+best-matching passage.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from app.schemas.langchain import ExtractedItem, ItemFormatter, Turn
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_STOPWORDS = frozenset("""
+    a an and are as at be been but by can could did do does for from had has have
+    he her his i if in into is it its me my no not of on or our she so that the
+    their them then there these they this to too us was we were what when which
+    who will with would you your
+    """.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words without stopwords, followed by their bigrams."""
+    words = [
+        w for w in _WORD_RE.findall(text.lower()) if len(w) > 1 and w not in _STOPWORDS
+    ]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class TranscriptGrounder:
+    """BM25 index over conversation turns used to time-stamp extracted items."""
+
+    def __init__(
+        self,
+        turns: Sequence[Turn],
+        k1: float = 1.5,
+        b: float = 0.75,
+        expand_ratio: float = 0.5,
+        max_window: int = 5,
+    ) -> None:
+        """
+        Args:
+            turns (Sequence[Turn]): Conversation turns to index.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 length normalization.
+            expand_ratio (float): Neighbouring turns scoring at least this
+                fraction of the best turn are included in the span.
+            max_window (int): Maximum number of turns in a grounded span.
+        """
+        self.turns = list(turns)
+        self.k1 = k1
+        self.b = b
+        self.expand_ratio = expand_ratio
+        self.max_window = max_window
+
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._lengths: List[int] = []
+        for idx, turn in enumerate(self.turns):
+            terms = Counter(tokenize(turn.text))
+            self._lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings[term].append((idx, tf))
+        n = len(self.turns)
+        self._avg_length = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self._postings.items()
+        }
+
+    def scores(self, text: str) -> Dict[int, float]:
+        """BM25 score of every turn sharing at least one term with ``text``."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(text)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for idx, tf in self._postings[term]:
+                norm = (
+                    1 - self.b + self.b * self._lengths[idx] / (self._avg_length or 1)
+                )
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return scores
+
+    def locate(self, text: str) -> Tuple[float, float]:
+        """
+        Find the time span of the passage that best matches ``text``.
+
+        Args:
+            text (str): Extracted item text.
+
+        Returns:
+            Tuple[float, float]: Start and end time in seconds. Items matching
+            no turn span the whole conversation.
+        """
+        if not self.turns:
+            return 0.0, 0.0
+        scores = self.scores(text)
+        if not scores:
+            return self.turns[0].start, self.turns[-1].end
+
+        best = max(scores, key=lambda idx: (scores[idx], -idx))
+        threshold = scores[best] * self.expand_ratio
+        lo = hi = best
+        while hi - lo + 1 < self.max_window:
+            left = scores.get(lo - 1, 0.0) if lo > 0 else 0.0
+            right = scores.get(hi + 1, 0.0) if hi + 1 < len(self.turns) else 0.0
+            if max(left, right) < threshold:
+                break
+            if left >= right:
+                lo -= 1
+            else:
+                hi += 1
+        return self.turns[lo].start, self.turns[hi].end
+
+    def ground(self, items: Sequence[ExtractedItem]) -> List[ItemFormatter]:
+        """Attach grounded timestamps to extracted items."""
+        grounded = []
+        for item in items:
+            start, end = self.locate(item.text)
+            grounded.append(ItemFormatter(text=item.text, start=start, end=end))
+        return grounded
@@ -0,0 +1,107 @@
+"""
+Persistent cache for structured LLM responses.
+
+Responses are keyed by a hash of the normalized messages, the summarization
+prompt, the model name and the output schema version, and stored in Redis
+with a TTL. Each chunk of a map-reduce summarization is cached on its own,
+so re-running a job only calls the model for the chunks that changed.
+"""
+
+import hashlib
+import json
+from typing import Any, List, Optional, Type, TypeVar
+
+import structlog
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.schemas.langchain import SCHEMA_VERSION
+from app.services.cache import RedisCache
+from app.services.metrics import record_cache
+from app.services.summarize.prompts import SUMMARIZATION_PROMPT
+
+logger = structlog.get_logger("llm-cache")
+
+_M = TypeVar("_M", bound=BaseModel)
+
+
+def _normalize_message(message: Any) -> List[str]:
+    if isinstance(message, tuple):
+        role, content = message
+    else:  # langchain BaseMessage
+        role, content = message.type, message.content
+    return [str(role), " ".join(str(content).split())]
+
+
+class LLMResponseCache:
+    """Cache in front of a structured-output chat model."""
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        model_name: str,
+        ttl: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self.cache = cache
+        self.model_name = model_name
+        self.ttl = settings.LLM_CACHE_TTL if ttl is None else ttl
+        self.enabled = settings.LLM_CACHE_ENABLED if enabled is None else enabled
+
+    def make_key(self, messages: List[Any], schema: Type[BaseModel]) -> str:
+        """
+        Compute the cache key of an LLM call.
+
+        Args:
+            messages (List[Any]): Prompt messages, as tuples or langchain messages.
+            schema (Type[BaseModel]): Structured output schema.
+
+        Returns:
+            str: Redis key of the cached response.
+        """
+        material = json.dumps(
+            {
+                "messages": [_normalize_message(m) for m in messages],
+                "prompt": SUMMARIZATION_PROMPT,
+                "model": self.model_name,
+                "schema": f"{schema.__name__}:{SCHEMA_VERSION}",
+            },
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        return f"llm:{digest}"
+
+    def invoke(self, model: Any, messages: List[Any], schema: Type[_M]) -> _M:
+        """
+        Return the cached response for these messages or call the model.
+
+        Args:
+            model (Any): Runnable returning an instance of ``schema``.
+            messages (List[Any]): Prompt messages.
+            schema (Type[_M]): Structured output schema.
+
+        Returns:
+            _M: The structured response.
+        """
+        if not self.enabled:
+            return model.invoke(messages)
+
+        key = self.make_key(messages, schema)
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            logger.warning("llm_cache_unavailable", error=str(e))
+            cached = None
+        if cached is not None:
+            logger.info("llm_cache_hit", key=key, model=self.model_name)
+            record_cache("llm", hit=True)
+            return schema.model_validate(cached)
+
+        logger.info("llm_cache_miss", key=key, model=self.model_name)
+        record_cache("llm", hit=False)
+        response = model.invoke(messages)
+        try:
+            self.cache.put(key, response.model_dump(), expire=self.ttl)
+        except Exception as e:
+            logger.warning("llm_cache_unavailable", error=str(e))
+        return response
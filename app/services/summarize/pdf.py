@@ -0,0 +1,346 @@
+"""
+Native PDF backend for very large reports.
+
+WeasyPrint lays out the whole HTML document before writing a single page,
+which takes minutes and gigabytes on multi-hour transcripts. This backend
+draws the same sections directly on a reportlab canvas, page by page, and
+is selected automatically above ``PDF_NATIVE_MIN_TURNS`` turns. Text is
+set in an embedded Unicode TrueType font, reportlab's standard fonts only
+cover Latin-1.
+"""
+
+import io
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import structlog
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import registerFont, stringWidth
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen.canvas import Canvas
+
+from app.core.config import settings
+from app.services.summarize.report import DEFAULT_COLORS
+
+logger = structlog.get_logger("pdf")
+
+PDF_BACKENDS = ("weasyprint", "reportlab")
+
+# Fallback fonts, Latin-1 only, when the TrueType fonts cannot be loaded
+FONT = "Helvetica"
+BOLD = "Helvetica-Bold"
+MARGIN = 40
+TEXT_SIZE = 9
+TITLE_SIZE = 18
+HEADING_SIZE = 13
+LEADING = 1.35
+
+TEXT_COLOR = HexColor("#000000")
+HEADING_COLOR = HexColor("#2c3e50")
+ACCENT_COLOR = HexColor("#3498db")
+MUTED_COLOR = HexColor("#7f8c8d")
+
+# A run of text drawn with a single font and color
+Fragment = Tuple[str, str, Any]
+
+
+def select_pdf_backend(n_turns: int, backend: Optional[str] = None) -> str:
+    """
+    Choose the PDF backend of a report.
+
+    Args:
+        n_turns (int): Number of transcript turns in the report.
+        backend (Optional[str]): ``auto``, ``weasyprint`` or ``reportlab``,
+            defaults to the PDF_BACKEND setting.
+
+    Returns:
+        str: ``weasyprint`` or ``reportlab``.
+    """
+    backend = (backend or settings.PDF_BACKEND).lower()
+    if backend == "auto":
+        if n_turns >= settings.PDF_NATIVE_MIN_TURNS:
+            return "reportlab"
+        return "weasyprint"
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    return backend
+
+
+@lru_cache(maxsize=None)
+def report_fonts() -> Tuple[str, str]:
+    """
+    Register the TrueType fonts of the reports, on first use.
+
+    Returns:
+        Tuple[str, str]: Regular and bold font names, Helvetica if the
+        PDF_FONT_PATH or PDF_BOLD_FONT_PATH fonts cannot be loaded.
+    """
+    try:
+        registerFont(TTFont("ReportSans", settings.PDF_FONT_PATH))
+        registerFont(TTFont("ReportSans-Bold", settings.PDF_BOLD_FONT_PATH))
+    except Exception as e:
+        logger.warning("pdf_fonts_unavailable", error=str(e))
+        return FONT, BOLD
+    return "ReportSans", "ReportSans-Bold"
+
+
+class _PageWriter:
+    """Flows lines of styled fragments down the pages of a canvas."""
+
+    def __init__(self, canvas: Canvas, pagesize: Tuple[float, float]) -> None:
+        self.canvas = canvas
+        self.width, self.height = pagesize
+        self.text_width = self.width - 2 * MARGIN
+        self.y = self.height - MARGIN
+
+    def ensure(self, height: float) -> None:
+        """Start a new page if ``height`` does not fit on the current one."""
+        if self.y - height < MARGIN:
+            self.canvas.showPage()
+            self.y = self.height - MARGIN
+
+    def space(self, height: float) -> None:
+        self.y -= height
+
+    def rule(self, color: Any, width: float = 2) -> None:
+        self.canvas.setStrokeColor(color)
+        self.canvas.setLineWidth(width)
+        self.canvas.line(MARGIN, self.y, self.width - MARGIN, self.y)
+
+    def line(
+        self, fragments: Sequence[Fragment], size: float, x: float = MARGIN
+    ) -> None:
+        """Draw one already-wrapped line of fragments."""
+        leading = size * LEADING
+        self.ensure(leading)
+        self.y -= leading
+        # One text object per line, font and color only change between runs
+        text_object = self.canvas.beginText(x, self.y)
+        for text, font, color in fragments:
+            text_object.setFont(font, size)
+            text_object.setFillColor(color)
+            text_object.textOut(text)
+        self.canvas.drawText(text_object)
+
+    def paragraph(
+        self,
+        fragments: Sequence[Fragment],
+        size: float = TEXT_SIZE,
+        indent: float = 0,
+    ) -> None:
+        """Wrap fragments to the text width and draw them."""
+        x = MARGIN + indent
+        for line in wrap(fragments, size, self.text_width - indent):
+            self.line(line, size, x)
+
+
+@lru_cache(maxsize=65536)
+def word_width(word: str, font: str) -> float:
+    """Width of a word at font size 1, transcripts reuse a small vocabulary."""
+    return stringWidth(word, font, 1)
+
+
+def split_word(word: str, font: str, size: float, width: float) -> List[str]:
+    """Cut a word wider than a line (URL, identifier, ...) into pieces that fit."""
+    pieces: List[str] = []
+    start, used = 0, 0.0
+    for idx, char in enumerate(word):
+        char_width = word_width(char, font) * size
+        if idx > start and used + char_width > width:
+            pieces.append(word[start:idx])
+            start, used = idx, 0.0
+        used += char_width
+    pieces.append(word[start:])
+    return pieces
+
+
+def wrap(
+    fragments: Sequence[Fragment], size: float, width: float
+) -> List[List[Fragment]]:
+    """
+    Greedy word wrap of styled fragments.
+
+    Words wider than a line are broken across lines.
+
+    Args:
+        fragments (Sequence[Fragment]): ``(text, font, color)`` runs.
+        size (float): Font size.
+        width (float): Available line width.
+
+    Returns:
+        List[List[Fragment]]: Fragments of each line.
+    """
+    lines: List[List[Fragment]] = [[]]
+    used = 0.0
+    for text, font, color in fragments:
+        space = word_width(" ", font) * size
+        run: List[str] = []
+        for word in text.split(" "):
+            token_width = word_width(word, font) * size
+            pieces = [word]
+            if token_width > width:
+                pieces = split_word(word, font, size, width)
+            for piece in pieces:
+                if len(pieces) > 1:
+                    token_width = word_width(piece, font) * size
+                if used and run and used + token_width > width:
+                    lines[-1].append((" ".join(run) + " ", font, color))
+                    lines.append([])
+                    run, used = [], 0.0
+                elif used and not run and used + token_width > width:
+                    lines.append([])
+                    used = 0.0
+                run.append(piece)
+                used += token_width + space
+        lines[-1].append((" ".join(run), font, color))
+        used -= space
+    return lines
+
+
+class ReportLabPDFRenderer:
+    """Renders summarization results to PDF with reportlab."""
+
+    def __init__(
+        self,
+        colors: Sequence[str] = DEFAULT_COLORS,
+        pagesize: Tuple[float, float] = A4,
+    ) -> None:
+        """
+        Args:
+            colors (Sequence[str]): Palette cycled through for the speakers.
+            pagesize (Tuple[float, float]): Page size in points.
+        """
+        self.colors = [HexColor(color) for color in colors]
+        self.pagesize = pagesize
+        self.font, self.bold = report_fonts()
+
+    def render(self, result: Dict[str, Any], timestamp: Optional[str] = None) -> bytes:
+        """
+        Render a full report.
+
+        Args:
+            result (Dict[str, Any]): Summarization result.
+            timestamp (Optional[str]): Generation time shown in the report,
+                defaults to now.
+
+        Returns:
+            bytes: The PDF document.
+        """
+        buffer = io.BytesIO()
+        canvas = Canvas(buffer, pagesize=self.pagesize, pageCompression=1)
+        canvas.setTitle("Conversation Summary Report")
+        writer = _PageWriter(canvas, self.pagesize)
+
+        turns = result.get("turns", [])
+        speakers = dict.fromkeys(turn.speaker for turn in turns)
+        palette = {
+            s: self.colors[idx % len(self.colors)] for idx, s in enumerate(speakers)
+        }
+
+        writer.line(
+            [("Conversation Summary Report", self.bold, HEADING_COLOR)], TITLE_SIZE
+        )
+        writer.space(6)
+        writer.rule(ACCENT_COLOR)
+        writer.space(6)
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        status = str(result.get("status", "unknown"))
+        writer.paragraph(
+            [("Generated: ", self.bold, TEXT_COLOR), (timestamp, self.font, TEXT_COLOR)]
+        )
+        writer.paragraph(
+            [("Status: ", self.bold, TEXT_COLOR), (status, self.font, TEXT_COLOR)]
+        )
+
+        self._heading(writer, "Executive Summary")
+        writer.paragraph(self._summary(result.get("summary", ""), palette))
+        self._items(
+            writer,
+            "Key Topics Discussed",
+            result.get("topics", []),
+            "No topics identified",
+        )
+        self._items(
+            writer,
+            "Decisions Made",
+            result.get("decisions", []),
+            "No decisions recorded",
+        )
+        self._items(
+            writer,
+            "Action Items",
+            result.get("actions", []),
+            "No action items identified",
+        )
+
+        self._heading(writer, "Full Transcript")
+        if turns:
+            self._turns(writer, turns, palette)
+        else:
+            writer.paragraph([("No transcript recorded", self.font, TEXT_COLOR)])
+
+        writer.space(24)
+        writer.paragraph(
+            [
+                (
+                    "This report was generated by the Summarization Agent",
+                    self.font,
+                    MUTED_COLOR,
+                )
+            ]
+        )
+        canvas.save()
+        return buffer.getvalue()
+
+    def _heading(self, writer: _PageWriter, title: str) -> None:
+        # Keep a heading on the same page as the first line below it
+        writer.ensure(HEADING_SIZE * LEADING + 12 + TEXT_SIZE * LEADING)
+        writer.space(12)
+        writer.line([(title, self.bold, HEADING_COLOR)], HEADING_SIZE)
+        writer.space(2)
+
+    def _items(
+        self, writer: _PageWriter, title: str, items: List[Any], empty_message: str
+    ) -> None:
+        self._heading(writer, title)
+        if not items:
+            writer.paragraph([(empty_message, self.font, TEXT_COLOR)])
+            return
+        for item in items:
+            writer.paragraph(
+                [
+                    (f"• {item.text} - ", self.font, TEXT_COLOR),
+                    (f"[{item.start:.2f}-{item.end:.2f}]", self.bold, TEXT_COLOR),
+                ],
+                indent=10,
+            )
+
+    def _turns(
+        self, writer: _PageWriter, turns: Iterable[Any], palette: Dict[str, Any]
+    ) -> None:
+        for turn in turns:
+            writer.paragraph(
+                [
+                    (f"[{turn.start:.2f}-{turn.end:.2f}] - ", self.bold, TEXT_COLOR),
+                    (turn.speaker, self.bold, palette.get(turn.speaker, TEXT_COLOR)),
+                    (f" : {turn.text}", self.font, TEXT_COLOR),
+                ],
+                indent=10,
+            )
+
+    def _summary(self, summary: str, palette: Dict[str, Any]) -> List[Fragment]:
+        """Split the summary into fragments with colored speaker mentions."""
+        fragments: List[Fragment] = []
+        for word in summary.split(" "):
+            speaker = word.strip(".,;:!?()")
+            if speaker in palette:
+                head, _, tail = word.partition(speaker)
+                if head:
+                    fragments.append((head, self.font, TEXT_COLOR))
+                fragments.append((speaker, self.bold, palette[speaker]))
+                fragments.append((tail + " ", self.font, TEXT_COLOR))
+            else:
+                fragments.append((word + " ", self.font, TEXT_COLOR))
+        return fragments
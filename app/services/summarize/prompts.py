@@ -20,7 +20,54 @@ You are an assistant tasked with analyzing a meeting conversation. Carefully rea
 
 **Instructions for formatting:**  
 - Present your results in a structured way, with each section clearly labeled.  
-- Always try to provide timestamps for phrases, decisions, or action items using the tool where applicable.  
 - Be precise and avoid summarizing irrelevant details.  
-- For each item extracted, if possible extract the timing along with it for referencing.
+- Phrase each topic, decision and action item with the words used in the conversation so it can be traced back to it.
+"""
+
+TRANSCRIPT_FORMAT = """
+The transcript below is compacted: each line is `[<start seconds>] <speaker>: <text>`, speakers are aliased as [S1], [S2], ... and short consecutive turns are joined with ` | `.
+Refer to speakers by their alias, brackets included.
+"""
+
+REDUCE_PROMPT = """
+You are an assistant consolidating the partial analyses of a long meeting. Each part below was extracted from a consecutive segment of the same conversation.
+
+Merge them into a single result:
+- Write one executive summary covering the whole meeting.
+- Deduplicate topics, decisions and action items that appear in several parts.
+- Keep speaker aliases ([S1], [S2], ...) exactly as they appear in the parts.
+"""
+
+SECTION_PROMPT_HEADER = """
+You are an assistant tasked with analyzing a meeting conversation. Carefully read the conversation and extract only the information requested below, focusing on actionable insights, key outcomes, and clarity:
+"""
+
+SECTION_INSTRUCTIONS = {
+    "summary": """
+**Executive Summary**  
+   - Provide a concise but comprehensive summary of the conversation.  
+   - Highlight major points, important context, and outcomes.  
+   - Emphasize actionable insights and decisions.
+""",
+    "topics": """
+**Main Topics Discussed**  
+   - Identify 3-5 main topics or discussion threads.  
+   - Use clear, descriptive phrases for each topic.
+""",
+    "decisions": """
+**Key Decisions Made**  
+   - List all decisions that were agreed upon during the conversation.  
+   - Include relevant details such as responsible parties, context, or constraints.  
+""",
+    "actions": """
+**Action Items / Next Steps**  
+   - Clearly specify all tasks or follow-up actions.  
+   - Include the responsible person or team, and any deadlines if mentioned.  
+""",
+}
+
+SECTION_PROMPT_FOOTER = """
+**Instructions for formatting:**  
+- Be precise and avoid summarizing irrelevant details.  
+- Phrase each item with the words used in the conversation so it can be traced back to it.
 """
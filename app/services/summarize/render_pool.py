@@ -0,0 +1,194 @@
+"""
+Process pool for PDF report rendering.
+
+PDF rendering is CPU bound and, with WeasyPrint, starts cold: fonts are
+loaded and the stylesheet parsed on every call. Reports are rendered instead
+by long-lived worker processes that warm these caches once at start-up. The
+pool bounds the number of queued renders and enforces a timeout per render.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, Optional
+
+import structlog
+
+from app.core.config import settings
+from app.services.metrics import REPORT_RENDER_SECONDS
+
+logger = structlog.get_logger("render-pool")
+
+# Per-process document generator, created by warm_worker()
+_GENERATOR: Any = None
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when the render queue is at capacity."""
+
+
+def warm_worker() -> None:
+    """Create the document generator of this process and warm its caches."""
+    global _GENERATOR
+    if _GENERATOR is not None:
+        return
+    # Imported here so the API process does not load WeasyPrint itself
+    from app.services.summarize.utils import DocumentGenerator
+
+    _GENERATOR = DocumentGenerator()
+    try:
+        _GENERATOR.warm_up()
+    except Exception as e:
+        logger.warning("render_warm_up_failed", error=str(e))
+
+
+@contextlib.contextmanager
+def render_deadline(timeout: Optional[float]) -> Iterator[None]:
+    """
+    Abort the enclosed render with ``TimeoutError`` after ``timeout`` seconds,
+    so that a runaway layout frees its worker. Only active on the main thread.
+    """
+    if not timeout or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum: int, frame: Any) -> None:
+        raise TimeoutError(f"Report rendering exceeded {timeout} seconds")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def render_pdf(
+    result: Dict[str, Any],
+    backend: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> bytes:
+    """
+    Render a report to PDF with the warm generator of the current process.
+
+    Args:
+        result (Dict[str, Any]): Summarization result.
+        backend (Optional[str]): PDF backend, defaults to the PDF_BACKEND setting.
+        timeout (Optional[float]): Seconds before the render is aborted.
+
+    Returns:
+        bytes: The PDF document.
+    """
+    warm_worker()
+    with render_deadline(timeout):
+        return _GENERATOR.generate_pdf(result, backend)
+
+
+class ReportRenderPool:
+    """Bounded pool of warm report-rendering processes."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            workers (Optional[int]): Number of rendering processes.
+            max_queue (Optional[int]): Renders allowed to wait for a process.
+            timeout (Optional[float]): Seconds a single render may take.
+        """
+        self.workers = workers or settings.RENDER_POOL_WORKERS
+        self.max_queue = (
+            settings.RENDER_POOL_MAX_QUEUE if max_queue is None else max_queue
+        )
+        self.timeout = timeout or settings.RENDER_TIMEOUT
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Processes are started lazily and live as long as the pool
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_worker,
+                )
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, result: Dict[str, Any], backend: Optional[str] = None) -> Future:
+        """
+        Queue a render.
+
+        Args:
+            result (Dict[str, Any]): Summarization result.
+            backend (Optional[str]): PDF backend, defaults to PDF_BACKEND.
+
+        Returns:
+            Future: Resolves to the PDF bytes.
+
+        Raises:
+            RenderQueueFull: If ``workers + max_queue`` renders are pending.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise RenderQueueFull("Too many reports are being rendered")
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(render_pdf, result, backend, self.timeout)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory), start a fresh pool
+                logger.warning("render_pool_broken")
+                self._reset(executor)
+                future = self._get_executor().submit(
+                    render_pdf, result, backend, self.timeout
+                )
+        except BaseException:
+            self._slots.release()
+            raise
+        submitted = time.monotonic()
+
+        def done(future: Future) -> None:
+            self._slots.release()
+            if not future.cancelled() and future.exception() is None:
+                REPORT_RENDER_SECONDS.observe(time.monotonic() - submitted)
+
+        future.add_done_callback(done)
+        return future
+
+    def render(self, result: Dict[str, Any], backend: Optional[str] = None) -> bytes:
+        """Render a report, blocking until it is done."""
+        # The worker enforces the timeout itself, the margin covers queueing
+        return self.submit(result, backend).result(timeout=2 * self.timeout)
+
+    async def render_async(
+        self, result: Dict[str, Any], backend: Optional[str] = None
+    ) -> bytes:
+        """Render a report without blocking the event loop."""
+        future = asyncio.wrap_future(self.submit(result, backend))
+        return await asyncio.wait_for(future, timeout=2 * self.timeout)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+RENDER_POOL = ReportRenderPool()
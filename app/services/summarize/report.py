@@ -0,0 +1,219 @@
+"""
+HTML rendering of summarization reports.
+
+The page layout and stylesheet are compiled once at import time. A report is
+produced as a stream of string fragments joined at the end, so rendering
+time and memory grow linearly with the transcript. All model and transcript
+text is HTML-escaped.
+"""
+
+import html
+import re
+from datetime import datetime
+from string import Template
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_COLORS = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+)
+
+REPORT_CSS = """
+body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+h1 { color: #2c3e50; text-align: center; border-bottom: 3px solid #3498db; padding-bottom: 10px; }
+h2 { color: #2c3e50; border-left: 4px solid #3498db; padding-left: 10px; }
+.metadata { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin-bottom: 20px; }
+.summary-section { margin-bottom: 30px; }
+ul { padding-left: 20px; }
+li { margin-bottom: 5px; }
+table { width: 100%; border-collapse: collapse; margin-top: 10px; }
+th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+th { background-color: #f2f2f2; font-weight: bold; }
+.timestamp { font-family: monospace; }
+.speaker { font-weight: bold; }
+.footer { margin-top: 50px; text-align: center; font-style: italic; color: #7f8c8d; }
+"""
+
+# Everything up to the transcript, which is streamed in between
+_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Conversation Summary Report</title>
+<style>$css</style>
+</head>
+<body>
+<h1>Conversation Summary Report</h1>
+<div class="metadata">
+<p><strong>Generated:</strong> $timestamp</p>
+<p><strong>Status:</strong> $status</p>
+</div>
+<div class="summary-section">
+<h2>Executive Summary</h2>
+<p>$summary</p>
+</div>
+<div class="summary-section">
+<h2>Key Topics Discussed</h2>
+$topics
+</div>
+<div class="summary-section">
+<h2>Decisions Made</h2>
+$decisions
+</div>
+<div class="summary-section">
+<h2>Action Items</h2>
+$actions
+</div>
+<div class="summary-section">
+<h2>Full Transcript</h2>
+""")
+
+_TAIL = """</div>
+<div class="footer">
+<p>This report was generated by the Summarization Agent</p>
+</div>
+</body>
+</html>
+"""
+
+_ITEM = Template(
+    '<li>$text - [<b class="timestamp">$start</b>-<b class="timestamp">$end</b>]</li>'
+)
+_TURN = Template(
+    '<li>[<b class="timestamp">$start</b>-<b class="timestamp">$end</b>] - '
+    '<span class="speaker spk-$color">$speaker</span> : $text</li>\n'
+)
+
+
+class HTMLReportRenderer:
+    """Renders summarization results to HTML for the PDF backends."""
+
+    def __init__(self, colors: Sequence[str] = DEFAULT_COLORS) -> None:
+        """
+        Args:
+            colors (Sequence[str]): Palette cycled through for the speakers.
+        """
+        self.colors = tuple(colors)
+        # One CSS class per palette entry instead of an inline style per turn
+        self.css = REPORT_CSS + "".join(
+            f".spk-{idx} {{ color: {color}; }}\n"
+            for idx, color in enumerate(self.colors)
+        )
+
+    def speaker_classes(self, turns: Sequence[Any]) -> Dict[str, int]:
+        """Map every speaker, in order of appearance, to a palette index."""
+        speakers = dict.fromkeys(turn.speaker for turn in turns)
+        return {s: idx % len(self.colors) for idx, s in enumerate(speakers)}
+
+    def render(
+        self,
+        result: Dict[str, Any],
+        timestamp: Optional[str] = None,
+        inline_css: bool = True,
+    ) -> str:
+        """
+        Render a full report.
+
+        Args:
+            result (Dict[str, Any]): Summarization result.
+            timestamp (Optional[str]): Generation time shown in the report,
+                defaults to now.
+            inline_css (bool): Embed the stylesheet, disable when the PDF
+                renderer is given the pre-parsed ``css`` instead.
+
+        Returns:
+            str: The HTML document.
+        """
+        return "".join(self.iter_html(result, timestamp, inline_css))
+
+    def iter_html(
+        self,
+        result: Dict[str, Any],
+        timestamp: Optional[str] = None,
+        inline_css: bool = True,
+    ) -> Iterator[str]:
+        """
+        Yield the report as HTML fragments.
+
+        Args:
+            result (Dict[str, Any]): Summarization result.
+            timestamp (Optional[str]): Generation time shown in the report.
+            inline_css (bool): Embed the stylesheet in the document.
+
+        Yields:
+            str: Consecutive fragments of the HTML document.
+        """
+        turns = result.get("turns", [])
+        classes = self.speaker_classes(turns)
+        yield _HEAD.substitute(
+            css=self.css if inline_css else "",
+            timestamp=timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            status=html.escape(str(result.get("status", "unknown"))),
+            summary=self.format_summary(result.get("summary", ""), classes),
+            topics=self.format_items(result.get("topics", []), "No topics identified"),
+            decisions=self.format_items(
+                result.get("decisions", []), "No decisions recorded"
+            ),
+            actions=self.format_items(
+                result.get("actions", []), "No action items identified"
+            ),
+        )
+        if turns:
+            yield "<ul>\n"
+            yield from self.iter_turns(turns, classes)
+            yield "</ul>\n"
+        else:
+            yield "<p>No transcript recorded</p>\n"
+        yield _TAIL
+
+    def iter_turns(
+        self, turns: Iterable[Any], classes: Dict[str, int]
+    ) -> Iterator[str]:
+        """Yield one ``<li>`` per conversation turn."""
+        escape = html.escape
+        substitute = _TURN.substitute
+        for turn in turns:
+            yield substitute(
+                start=f"{turn.start:.2f}",
+                end=f"{turn.end:.2f}",
+                color=classes.get(turn.speaker, 0),
+                speaker=escape(turn.speaker),
+                text=escape(turn.text),
+            )
+
+    def format_items(self, items: List[Any], empty_message: str) -> str:
+        """Format extracted items as an HTML list."""
+        if not items:
+            return f"<p>{empty_message}</p>"
+        rows = "".join(
+            _ITEM.substitute(
+                text=html.escape(item.text),
+                start=f"{item.start:.2f}",
+                end=f"{item.end:.2f}",
+            )
+            for item in items
+        )
+        return f"<ul>{rows}</ul>"
+
+    def format_summary(self, summary: str, classes: Dict[str, int]) -> str:
+        """Escape the summary and highlight the speaker mentions."""
+        text = html.escape(summary)
+        if not classes:
+            return text
+        escaped = {html.escape(s): idx for s, idx in classes.items()}
+        pattern = "|".join(re.escape(s) for s in sorted(escaped, key=len)[::-1])
+        return re.sub(
+            rf"\b({pattern})\b",
+            lambda m: (
+                f'<span class="speaker spk-{escaped[m.group(0)]}">{m.group(0)}</span>'
+            ),
+            text,
+        )
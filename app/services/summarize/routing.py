@@ -0,0 +1,86 @@
+"""
+Size-aware routing of summarization jobs between Ollama models.
+
+Short meetings with few speakers go to a small, fast model and long ones to
+a larger model. Under queue pressure the tier limits are relaxed so more
+jobs fit the cheaper tiers and the backlog drains faster.
+"""
+
+import json
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class ModelTier(BaseModel):
+    """An Ollama model and the largest meetings it should handle."""
+
+    model: str = Field(..., description="Ollama model name")
+    max_tokens: Optional[int] = Field(
+        None, description="Largest encoded transcript, None for no limit"
+    )
+    max_speakers: Optional[int] = Field(
+        None, description="Largest number of speakers, None for no limit"
+    )
+
+
+def parse_model_tiers(spec: str) -> List[ModelTier]:
+    """
+    Parse the tier setting, a JSON list ordered from the smallest model.
+
+    Args:
+        spec (str): e.g. ``[{"model": "qwen3:0.6b", "max_tokens": 3000},
+            {"model": "qwen3:1.7b"}]``. Empty means a single MODEL_NAME tier.
+
+    Returns:
+        List[ModelTier]: Configured tiers.
+    """
+    if not spec.strip():
+        return [ModelTier(model=settings.MODEL_NAME)]
+    tiers = [ModelTier.model_validate(tier) for tier in json.loads(spec)]
+    if not tiers:
+        raise ValueError("LLM_MODEL_TIERS must define at least one model")
+    return tiers
+
+
+class ModelRouter:
+    """Chooses the model tier of a summarization job."""
+
+    def __init__(
+        self,
+        tiers: Optional[List[ModelTier]] = None,
+        pressure_threshold: Optional[int] = None,
+        pressure_factor: Optional[float] = None,
+    ) -> None:
+        self.tiers = tiers or parse_model_tiers(settings.LLM_MODEL_TIERS)
+        self.pressure_threshold = (
+            settings.LLM_ROUTING_PRESSURE_THRESHOLD
+            if pressure_threshold is None
+            else pressure_threshold
+        )
+        self.pressure_factor = pressure_factor or settings.LLM_ROUTING_PRESSURE_FACTOR
+
+    def select(self, tokens: int, speakers: int, queue_depth: int = 0) -> str:
+        """
+        Pick the smallest tier able to handle the meeting.
+
+        Args:
+            tokens (int): Encoded transcript size in tokens.
+            speakers (int): Number of distinct speakers.
+            queue_depth (int): LLM calls currently waiting for a slot.
+
+        Returns:
+            str: Name of the Ollama model to use.
+        """
+        factor = 1.0
+        if self.pressure_threshold and queue_depth >= self.pressure_threshold:
+            factor = self.pressure_factor
+        for tier in self.tiers:
+            if tier.max_tokens is not None and tokens > tier.max_tokens * factor:
+                continue
+            if tier.max_speakers is not None and speakers > tier.max_speakers * factor:
+                continue
+            return tier.model
+        return self.tiers[-1].model
@@ -1,50 +1,410 @@
-from typing import Any, Dict, List
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Type
+import re
+import time
+import httpx
+import requests
+import structlog
+from celery import current_task
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_ollama import ChatOllama
 from langgraph.graph import StateGraph, START, END
-from app.services.cache import REDIS_CACHE
+from app.services.cache import REDIS_CACHE, job_key
+from app.services.conversation.tasks import map_chunks
+from app.services.events import JOB_EVENTS
+from app.services.job_tracking import job_status
+from app.services.scheduler import schedule_info, stage_priority
 from app.services.celery_worker import c_worker
+from app.services.pipeline import (
+    TRANSIENT_ERRORS,
+    JobCancelled,
+    checkpointed,
+    is_cancelled,
+    raise_if_cancelled,
+    retry_policy,
+)
 from app.core.config import settings
 from app.services.summarize.utils import pull_model
-from app.services.summarize.prompts import SUMMARIZATION_PROMPT
-from app.schemas.langchain import SummarizationState, SummarizationResponseFormatter
+from app.services.summarize.prompts import (
+    REDUCE_PROMPT,
+    SECTION_INSTRUCTIONS,
+    SECTION_PROMPT_FOOTER,
+    SECTION_PROMPT_HEADER,
+    SUMMARIZATION_PROMPT,
+    TRANSCRIPT_FORMAT,
+)
+from app.services.summarize.encoder import TranscriptEncoder, decode_aliases
+from app.services.summarize.llm_cache import LLMResponseCache
+from app.services.summarize.governor import LLMGovernor
+from app.services.summarize.grounding import TranscriptGrounder
+from app.services.summarize.routing import ModelRouter
+from app.schemas.langchain import (
+    SECTIONS,
+    ExtractedItem,
+    SummarizationState,
+    SummarizationResponseFormatter,
+    section_schema,
+)
 
-pull_model(settings.MODEL_NAME, settings.OLLAMA_URL)
+logger = structlog.get_logger("summarize")
 
-LLM = ChatOllama(model=settings.MODEL_NAME, base_url=settings.OLLAMA_URL)
-SUMMARIZATION_MODEL = LLM.with_structured_output(SummarizationResponseFormatter)
+ENCODER = TranscriptEncoder()
+GOVERNOR = LLMGovernor(REDIS_CACHE.cache)
+ROUTER = ModelRouter()
+# Ollama unreachable or too slow to answer, the next attempt may succeed.
+# Model pulls go through requests, whose errors are not builtin ones.
+LLM_ERRORS = TRANSIENT_ERRORS + (
+    httpx.TransportError,
+    requests.exceptions.RequestException,
+)
 
 
-def summarization_node(state: SummarizationState) -> Dict[str, Any]:
+@lru_cache(maxsize=None)
+def get_llm(model_name: str) -> ChatOllama:
     """
-    Analyze text and extract key information using semantic search.
+    Return the chat model of a tier, pulling it on first use in this process.
 
     Args:
-        state (SummarizationState): Current state containing conversation messages.
+        model_name (str): Ollama model name.
 
     Returns:
-        Dict[str, Any]: State updated with summary, topics, decisions, and actions.
-    """
-    summarization_result = SUMMARIZATION_MODEL.invoke(state["messages"])
-    return {
-        **state,
-        "summary": summarization_result.summary,
-        "topics": summarization_result.topics,
-        "decisions": summarization_result.decisions,
-        "actions": summarization_result.actions
-    }
+        ChatOllama: Model sharing a pooled keep-alive HTTP client.
+    """
+    pull_model(model_name, settings.OLLAMA_URL)
+    return ChatOllama(
+        model=model_name,
+        base_url=settings.OLLAMA_URL,
+        num_ctx=settings.LLM_NUM_CTX,
+        # One pooled HTTP client per model, reused across calls to Ollama
+        client_kwargs={
+            "timeout": settings.LLM_REQUEST_TIMEOUT,
+            "limits": httpx.Limits(
+                max_keepalive_connections=settings.LLM_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=300,
+            ),
+        },
+    )
+
+
+@lru_cache(maxsize=None)
+def get_structured_llm(model_name: str, schema: Type[Any]) -> Any:
+    """
+    Return the model of a tier bound to a structured output schema.
+
+    The raw message is kept next to the parsed output for the governor to
+    read the output tokens reported by Ollama, see ``split_response``.
+    """
+    return get_llm(model_name).with_structured_output(schema, include_raw=True)
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache(model_name: str) -> LLMResponseCache:
+    """Return the response cache of a model tier."""
+    return LLMResponseCache(REDIS_CACHE, model_name)
+
+
+class CancellationHandler(BaseCallbackHandler):
+    """
+    Aborts a generation at the next token once its job is cancelled.
+
+    ChatOllama streams every response, so raising from the token callback
+    closes the connection and Ollama stops generating for the job.
+    """
+
+    raise_error = True
+
+    def __init__(self, job_id: str) -> None:
+        self.job_id = job_id
+        self.checked = time.monotonic()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        now = time.monotonic()
+        if now - self.checked >= settings.CANCEL_POLL_SECONDS:
+            self.checked = now
+            raise_if_cancelled(self.job_id)
+
+
+def cancellable(runnable: Any, job_id: Optional[str]) -> Any:
+    """Bind a model to its job, so that its generations stop on cancellation."""
+    if not job_id:
+        return runnable
+    return runnable.with_config(callbacks=[CancellationHandler(job_id)])
+
+
+def job_priority(job_id: Optional[str]) -> int:
+    """
+    LLM priority of a job, the broker priority its stages are published with.
+
+    Args:
+        job_id (Optional[str]): Job the calls belong to.
+
+    Returns:
+        int: 0 (first) to 9 (last), 0 for jobs that were not scheduled.
+    """
+    info = schedule_info(job_id) if job_id else None
+    if info is None:
+        return 0
+    return stage_priority(info["duration"], time.time() - info["submitted_at"])
+
+
+def governed(
+    runnable: Any, job_id: Optional[str], priority: Optional[int] = None
+) -> Any:
+    """Route a model through the governor, giving up the wait on cancellation."""
+    if priority is None:
+        priority = job_priority(job_id)
+    return GOVERNOR.wrap(runnable, priority, partial(raise_if_cancelled, job_id))
+
+
+def parse_section_groups(spec: str) -> List[List[str]]:
+    """
+    Parse the section grouping setting, e.g. ``"summary;topics,decisions,actions"``.
+
+    Args:
+        spec (str): Groups separated by ``;``, sections within a group by ``,``.
+
+    Returns:
+        List[List[str]]: One list of sections per parallel branch.
+    """
+    groups = [
+        [name.strip() for name in group.split(",") if name.strip()]
+        for group in spec.split(";")
+    ]
+    groups = [group for group in groups if group]
+    names = [name for group in groups for name in group]
+    if sorted(names) != sorted(SECTIONS):
+        raise ValueError(
+            f"SUMMARIZATION_SECTION_GROUPS must list each of {SECTIONS} once, got {spec!r}"
+        )
+    return groups
+
+
+def chunk_messages(chunk: str) -> List[Any]:
+    """Build the prompt for one encoded transcript chunk."""
+    return [
+        ("system", SUMMARIZATION_PROMPT),
+        ("human", f"{TRANSCRIPT_FORMAT}\n{chunk}"),
+    ]
+
+
+def format_partials(partials: List[SummarizationResponseFormatter]) -> str:
+    """Render the partial results of several chunks for the reduce stage."""
+
+    def format_items(items: List[Any]) -> str:
+        return "\n".join(f"- {i.text}" for i in items)
+
+    parts = []
+    for idx, part in enumerate(partials, start=1):
+        parts.append(
+            f"## Part {idx}\n"
+            f"Summary: {part.summary}\n"
+            f"Topics:\n{format_items(part.topics)}\n"
+            f"Decisions:\n{format_items(part.decisions)}\n"
+            f"Actions:\n{format_items(part.actions)}"
+        )
+    return "\n\n".join(parts)
+
+
+def map_partial_text(
+    part: SummarizationResponseFormatter, fn: Callable[[str], str]
+) -> SummarizationResponseFormatter:
+    """Apply a text transformation (alias encoding/decoding) to a partial result."""
+
+    def items(values: List[Any]) -> List[ExtractedItem]:
+        return [ExtractedItem(text=fn(item.text)) for item in values]
+
+    return SummarizationResponseFormatter(
+        summary=fn(part.summary),
+        topics=items(part.topics),
+        decisions=items(part.decisions),
+        actions=items(part.actions),
+    )
+
+
+def section_messages(sections: List[str], context: str, reduce: bool) -> List[Any]:
+    """Build the prompt extracting some sections from a transcript or partials."""
+    instructions = "".join(SECTION_INSTRUCTIONS[name] for name in sections)
+    if reduce:
+        system = (
+            f"{REDUCE_PROMPT}\nOnly produce the following sections:\n{instructions}"
+        )
+        return [("system", system), ("human", context)]
+    system = f"{SECTION_PROMPT_HEADER}{instructions}{SECTION_PROMPT_FOOTER}"
+    return [("system", system), ("human", f"{TRANSCRIPT_FORMAT}\n{context}")]
+
+
+def map_node(state: SummarizationState) -> Dict[str, Any]:
+    """
+    Prepare the context the section branches extract from.
+
+    A transcript that fits the token budget is handed over as is; longer ones
+    are summarized chunk by chunk and the branches reduce the partial results.
+    Partial results computed while the audio was still being transcribed
+    (streaming mode) are reduced directly.
+
+    Args:
+        state (SummarizationState): Current state containing the encoded chunks.
+
+    Returns:
+        Dict[str, Any]: State updated with the context and the reduce flag.
+    """
+    if state.get("partials"):
+        return {"context": format_partials(state["partials"]), "reduce": True}
+    chunks = state["chunks"]
+    if len(chunks) == 1:
+        return {"context": chunks[0], "reduce": False}
+    schema = SummarizationResponseFormatter
+    job_id = state.get("job_id")
+    model = governed(
+        cancellable(get_structured_llm(state["model"], schema), job_id),
+        job_id,
+        state.get("priority", 0),
+    )
+    cache = get_llm_cache(state["model"])
+    partials = [cache.invoke(model, chunk_messages(c), schema) for c in chunks]
+    return {"context": format_partials(partials), "reduce": True}
+
+
+def strip_thinking(text: str) -> str:
+    """Drop the ``<think>`` blocks reasoning models emit before the answer."""
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    return text.split("<think>")[0]
+
+
+class SummaryStreamer:
+    """
+    Runnable-like model streaming the summary section token by token.
+
+    The growing summary is published to the job event stream every
+    SUMMARY_STREAM_MIN_CHARS characters, so clients see text long before
+    the whole generation is over. The response has the shape of a structured
+    model bound with ``include_raw=True``.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        job_id: Optional[str],
+        aliases: Dict[str, str],
+        schema: Any,
+    ) -> None:
+        self.llm = llm
+        self.job_id = job_id
+        self.aliases = aliases
+        self.schema = schema
+
+    def invoke(self, messages: List[Any]) -> Dict[str, Any]:
+        text = ""
+        published = 0
+        message = None
+        for chunk in self.llm.stream(messages):
+            # The last chunk carries the usage reported by Ollama
+            message = chunk if message is None else message + chunk
+            text += chunk.content
+            visible = strip_thinking(text)
+            if len(visible) - published >= settings.SUMMARY_STREAM_MIN_CHARS:
+                JOB_EVENTS.publish(
+                    self.job_id,
+                    "summary_partial",
+                    text=decode_aliases(visible, self.aliases),
+                )
+                published = len(visible)
+        return {
+            "raw": message,
+            "parsed": self.schema(summary=strip_thinking(text).strip()),
+            "parsing_error": None,
+        }
+
+
+def make_section_node(sections: List[str]) -> Callable[[SummarizationState], Dict]:
+    """
+    Create a graph node extracting a group of sections with its own retries.
+
+    When the summary is a group of its own it is streamed as plain text
+    instead of generated as structured output. Transient LLM errors are
+    raised for the task to retry, sections are only recorded as failed on
+    other errors or on the last attempt of the task.
+
+    Args:
+        sections (List[str]): Sections produced by this branch.
+
+    Returns:
+        Callable: Node returning the extracted sections, or recording them as
+        failed once all attempts are exhausted.
+
+    Raises:
+        JobCancelled: If the job was cancelled.
+        LLM_ERRORS: On a transient error while the task has retries left.
+    """
+    schema = section_schema(sections)
+    streamed = sections == ["summary"]
+
+    def section_node(state: SummarizationState) -> Dict[str, Any]:
+        messages = section_messages(sections, state["context"], state["reduce"])
+        model_name = state["model"]
+        job_id = state.get("job_id")
+        if streamed:
+            runnable = SummaryStreamer(
+                cancellable(get_llm(model_name), job_id),
+                job_id,
+                state.get("aliases", {}),
+                schema,
+            )
+        else:
+            runnable = cancellable(get_structured_llm(model_name, schema), job_id)
+        model = governed(runnable, job_id, state.get("priority", 0))
+        cache = get_llm_cache(model_name)
+        for attempt in range(1, settings.SECTION_MAX_ATTEMPTS + 1):
+            try:
+                result = cache.invoke(model, messages, schema)
+                return {name: getattr(result, name) for name in sections}
+            except JobCancelled:
+                raise
+            except LLM_ERRORS as e:
+                if not state.get("last_attempt", True):
+                    # Ollama is down or overloaded, the whole task backs off
+                    raise
+                logger.warning(
+                    "section_failed", sections=sections, attempt=attempt, error=str(e)
+                )
+            except Exception as e:
+                logger.warning(
+                    "section_failed", sections=sections, attempt=attempt, error=str(e)
+                )
+        return {"failed_sections": sections}
+
+    return section_node
+
+
+def join_node(state: SummarizationState) -> Dict[str, Any]:
+    """Wait for every section branch before leaving the graph."""
+    return {}
 
 
 def create_graph() -> StateGraph:
     """
     Create the summarization workflow graph.
 
+    Each section group from SUMMARIZATION_SECTION_GROUPS runs as a parallel
+    branch between the map and join nodes.
+
     Returns:
         StateGraph: Compiled state graph for the summarization workflow.
     """
     workflow = StateGraph(SummarizationState)
-    workflow.add_node("summarize", summarization_node)
-    workflow.add_edge(START, "summarize")
-    workflow.add_edge("summarize", END)
+    workflow.add_node("map", map_node)
+    workflow.add_node("join", join_node)
+    workflow.add_edge(START, "map")
+
+    branches = []
+    for sections in parse_section_groups(settings.SUMMARIZATION_SECTION_GROUPS):
+        name = "_".join(sections)
+        workflow.add_node(name, make_section_node(sections))
+        workflow.add_edge("map", name)
+        branches.append(name)
+
+    workflow.add_edge(branches, "join")
+    workflow.add_edge("join", END)
     return workflow.compile()
 
 
@@ -60,36 +420,242 @@ except Exception as e:
     print("Please ensure you have graphviz installed on your system.")
 
 
-@c_worker.task
-def summarize_text(conversation_key: str) -> str:
+def is_last_attempt() -> bool:
+    """Whether the running task has no retry left, True outside of a worker."""
+    task = current_task
+    if not task or task.request.called_directly:
+        return True
+    return task.request.retries >= (task.max_retries or 0)
+
+
+def job_model(job_id: Optional[str], tokens: int, speakers: int) -> str:
+    """
+    Route a job to a model tier once, so that window summaries and the final
+    reduce of a streaming job use the same model (and share cache entries).
+    """
+    model_name = ROUTER.select(tokens, speakers, GOVERNOR.queue_depth())
+    if not job_id:
+        return model_name
+    key = job_key(job_id, "model")
+    REDIS_CACHE.cache.set(key, model_name, nx=True, ex=settings.JOB_ARTIFACT_TTL)
+    return REDIS_CACHE.cache.get(key).decode()
+
+
+def map_window(job_id: str, window: int, diarization: Any) -> None:
+    """
+    Summarize one transcript window and store its partial results under the job.
+
+    Args:
+        job_id (str): Job the window belongs to.
+        window (int): Window index.
+        diarization (Any): Diarization annotation of the whole recording.
+    """
+    segments = REDIS_CACHE.load(job_key(job_id, "asr", str(window)))
+    conversation = map_chunks(segments, diarization, use_word_timestamps=True)
+    encoded = ENCODER.encode(conversation.turns)
+    windows = REDIS_CACHE.get(job_key(job_id, "windows")) or 1
+    model_name = job_model(job_id, encoded.tokens * windows, len(encoded.aliases))
+
+    schema = SummarizationResponseFormatter
+    model = governed(
+        cancellable(get_structured_llm(model_name, schema), job_id), job_id
+    )
+    cache = get_llm_cache(model_name)
+    partials = [
+        # Partials are stored with real speaker labels: aliases are per window
+        map_partial_text(
+            cache.invoke(model, chunk_messages(chunk), schema), encoded.decode_text
+        )
+        for chunk in encoded.chunks
+        if chunk
+    ]
+    REDIS_CACHE.put(
+        job_key(job_id, "partial", str(window)),
+        partials,
+        expire=settings.JOB_ARTIFACT_TTL,
+    )
+    for part in partials:
+        JOB_EVENTS.publish(job_id, "window_summary", window=window, text=part.summary)
+
+
+@c_worker.task(bind=True, max_retries=None)
+def summarize_window(
+    self: Any, job_id: str, window: int, deadline: Optional[float] = None
+) -> None:
+    """
+    Map-stage summarization of a transcript window in streaming mode.
+
+    Runs while later audio is still being transcribed, as soon as the
+    diarization of the recording is available. Waiting for it stops at the
+    deadline or once the job is over; ``summarize_text`` then summarizes
+    the missing window itself.
+
+    Args:
+        job_id (str): Job the window belongs to.
+        window (int): Window index.
+        deadline (Optional[float]): Epoch time after which the diarization
+            is no longer waited for.
+    """
+    if is_cancelled(job_id):
+        return
+    if REDIS_CACHE.cache.exists(job_key(job_id, "partial", str(window))):
+        return
+    diarization = REDIS_CACHE.get(job_key(job_id, "diarization"))
+    if diarization is None:
+        if deadline is not None and time.time() >= deadline:
+            logger.warning("window_summary_expired", job_id=job_id, window=window)
+            return
+        if job_status(job_id) in ("failed", "cancelled"):
+            return
+        raise self.retry(countdown=settings.STREAMING_POLL_SECONDS)
+    map_window(job_id, window, diarization)
+
+
+def collect_window_partials(job_id: str) -> Optional[List[Any]]:
+    """
+    Gather the partial results of every window of a streaming job.
+
+    Waits up to STREAMING_PARTIAL_WAIT for windows still being summarized,
+    then summarizes the missing ones inline.
+
+    Args:
+        job_id (str): Job to collect.
+
+    Returns:
+        Optional[List[Any]]: Partial results in window order, or None if the
+        job was not transcribed in windows.
+    """
+    windows = REDIS_CACHE.get(job_key(job_id, "windows"))
+    if not windows:
+        return None
+    keys = [job_key(job_id, "partial", str(idx)) for idx in range(windows)]
+    deadline = time.monotonic() + settings.STREAMING_PARTIAL_WAIT
+    while time.monotonic() < deadline:
+        if REDIS_CACHE.cache.exists(*keys) == len(keys):
+            break
+        time.sleep(settings.STREAMING_POLL_SECONDS)
+
+    partials: List[Any] = []
+    for idx, key in enumerate(keys):
+        window_partials = REDIS_CACHE.get(key)
+        if window_partials is None:
+            logger.warning("window_summary_missing", job_id=job_id, window=idx)
+            diarization = REDIS_CACHE.load(job_key(job_id, "diarization"))
+            map_window(job_id, idx, diarization)
+            window_partials = REDIS_CACHE.load(key)
+        partials.extend(window_partials)
+    return partials
+
+
+@c_worker.task(**retry_policy(settings.LLM_MAX_RETRIES, LLM_ERRORS))
+@checkpointed
+def summarize_text(
+    conversation_key: str,
+    job_id: Optional[str] = None,
+    priority: Optional[int] = None,
+    streaming: bool = False,
+) -> str:
     """
     Perform advanced text summarization with semantic search capabilities.
 
+    Partial results are published to the job event stream as each branch of
+    the graph completes. In streaming mode only the reduce runs here, over
+    the window summaries computed during transcription. Transient LLM errors
+    are retried from the stored conversation, never from the audio.
+
     Args:
         conversation_key (str): Cache key of the conversation data.
+        job_id (Optional[str]): Job whose event stream receives partial results.
+        priority (Optional[int]): LLM scheduling priority, lower values are
+            served first. Defaults to the priority of the job's stages.
+        streaming (bool): Whether the job was transcribed and mapped in windows.
 
     Returns:
         key (str): Cache key containing summarization result.
     """
     conversation = REDIS_CACHE.load(conversation_key)
 
-    def to_langchain_messages(turns: List[Any]) -> List[Any]:
-        messages = [("system", SUMMARIZATION_PROMPT)]
-        for t in turns:
-            messages.append(("human", f"[{t.start:.1f}-{t.end:.1f}] {t.speaker}: {t.text}"))
-        return messages
+    encoded = ENCODER.encode(conversation.turns)
+    # Timestamps come from the transcript itself rather than from the LLM
+    grounder = TranscriptGrounder(conversation.turns)
 
-    messages = to_langchain_messages(conversation.turns)
-    final_state = app.invoke({"messages": messages})
+    def ground(items: List[Any]) -> List[Any]:
+        return grounder.ground(encoded.decode_items(items))
+
+    model_name = job_model(job_id, encoded.tokens, len(encoded.aliases))
+    partials = collect_window_partials(job_id) if streaming and job_id else None
+    # Pull the model before the parallel branches need it
+    get_llm(model_name)
+    logger.info(
+        "model_routed",
+        job_id=job_id,
+        model=model_name,
+        tokens=encoded.tokens,
+        speakers=len(encoded.aliases),
+    )
+
+    JOB_EVENTS.publish(
+        job_id, "summarization_started", chunks=len(encoded.chunks), model=model_name
+    )
+    inputs = {
+        "messages": [],
+        "job_id": job_id,
+        "model": model_name,
+        "chunks": encoded.chunks,
+        "aliases": encoded.aliases,
+        "partials": [map_partial_text(p, encoded.encode_text) for p in partials or []],
+        "priority": job_priority(job_id) if priority is None else priority,
+        "failed_sections": [],
+        # Sections degrade to failed on transient errors only when the task
+        # cannot be retried anymore
+        "last_attempt": is_last_attempt(),
+    }
+    try:
+        final_state: Dict[str, Any] = {}
+        for mode, chunk in app.stream(inputs, stream_mode=["updates", "values"]):
+            if mode == "values":
+                final_state = chunk
+                continue
+            for update in chunk.values():
+                publish_update(job_id, update or {}, encoded.decode_text, ground)
+    except Exception as e:
+        # Final failures are published to the event stream by job tracking
+        if is_cancelled(job_id):
+            raise JobCancelled(f"Job {job_id} was cancelled") from e
+        raise
+    failed_sections = final_state.get("failed_sections", [])
 
     result = {
         "turns": conversation.turns,
-        "summary": final_state.get("summary", "Summary generation failed"),
-        "topics": final_state.get("topics", []),
-        "decisions": final_state.get("decisions", []),
-        "actions": final_state.get("actions", []),
-        "status": "success"
+        "summary": encoded.decode_text(
+            final_state.get("summary", "Summary generation failed")
+        ),
+        "topics": ground(final_state.get("topics", [])),
+        "decisions": ground(final_state.get("decisions", [])),
+        "actions": ground(final_state.get("actions", [])),
+        "status": "partial" if failed_sections else "success",
+        "failed_sections": failed_sections,
+        "model": model_name,
     }
 
     key: str = REDIS_CACHE.save(result)
+    JOB_EVENTS.publish(job_id, "done", status=result["status"], result_key=key)
     return key
+
+
+def publish_update(
+    job_id: Optional[str],
+    update: Dict[str, Any],
+    decode: Callable[[str], str],
+    ground: Callable[[List[Any]], List[Any]],
+) -> None:
+    """Publish the sections produced by one graph node to the job event stream."""
+    if not job_id:
+        return
+    if "summary" in update:
+        JOB_EVENTS.publish(job_id, "summary", text=decode(update["summary"]))
+    for section in ("topics", "decisions", "actions"):
+        for item in ground(update.get(section, [])):
+            JOB_EVENTS.publish(job_id, "item", section=section, **item.model_dump())
+    for section in update.get("failed_sections", []):
+        JOB_EVENTS.publish(job_id, "section_failed", section=section)
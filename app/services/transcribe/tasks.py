@@ -1,20 +1,94 @@
 import whisper
-import librosa
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
 from app.core.config import settings
 from app.services.celery_worker import c_worker
-from app.services.cache import REDIS_CACHE, S3_CACHE
-import io
+from app.services.audio import decode_audio
+from app.services.cache import REDIS_CACHE, S3_CACHE, job_key
+from app.services.pipeline import checkpointed, raise_if_cancelled, retry_policy
+from app.services.transcribe.windows import (
+    shift_segments,
+    transcribe_whole,
+    window_bounds,
+)
 
 model = whisper.load_model(settings.WHISPER_SIZE)
 
-@c_worker.task
-def transcribe(bytes_key: str, use_word_timestamps: bool=True) -> str:
-    """Transcribe audio and returns text segments"""
+
+def transcribe_windows(
+    waveform: np.ndarray, job_id: str, window_seconds: float, use_word_timestamps: bool
+) -> List[Dict[str, Any]]:
+    """
+    Transcribe audio window by window, handing each finished window over to
+    map-stage summarization while the next one is transcribed.
+
+    Args:
+        waveform (np.ndarray): Mono audio samples at SAMPLE_RATE.
+        job_id (str): Job the windows belong to.
+        window_seconds (float): Target window length.
+        use_word_timestamps (bool): Whether to produce word-level timestamps.
+
+    Returns:
+        List[Dict[str, Any]]: Segments of the whole recording.
+    """
+    sr = int(settings.SAMPLE_RATE)
+    bounds = window_bounds(waveform, sr, window_seconds)
+    REDIS_CACHE.put(
+        job_key(job_id, "windows"), len(bounds), expire=settings.JOB_ARTIFACT_TTL
+    )
+
+    # Window summaries stop waiting for the diarization past this time
+    deadline = time.time() + settings.STREAMING_WAIT_FACTOR * len(waveform) / sr
+    segments: List[Dict[str, Any]] = []
+    prompt: Optional[str] = None
+    for idx, (start, end) in enumerate(bounds):
+        # Window boundaries are where a cancelled job stops transcribing
+        raise_if_cancelled(job_id)
+        window_key = job_key(job_id, "asr", str(idx))
+        # Windows transcribed by a previous attempt are not transcribed again
+        window_segments = REDIS_CACHE.get(window_key)
+        if window_segments is None:
+            asr_result = model.transcribe(
+                waveform[start:end],
+                word_timestamps=use_word_timestamps,
+                initial_prompt=prompt,  # keeps wording consistent across windows
+            )
+            window_segments = shift_segments(asr_result["segments"], start / sr)
+            REDIS_CACHE.put(window_key, window_segments, expire=settings.JOB_ARTIFACT_TTL)
+            c_worker.send_task(
+                "app.services.summarize.tasks.summarize_window",
+                kwargs={"job_id": job_id, "window": idx, "deadline": deadline},
+            )
+        segments.extend(window_segments)
+        if window_segments:
+            prompt = window_segments[-1]["text"]
+    return segments
+
+
+@c_worker.task(**retry_policy(settings.STAGE_MAX_RETRIES))
+@checkpointed
+def transcribe(
+    bytes_key: str,
+    use_word_timestamps: bool=True,
+    job_id: Optional[str] = None,
+    window_seconds: Optional[float] = None,
+) -> str:
+    """
+    Transcribe audio and returns text segments.
+
+    With a ``window_seconds``, the audio is transcribed in windows that are
+    summarized as soon as they are done (streaming pipeline mode). With a
+    ``job_id``, the output is checkpointed and reused by later attempts.
+    """
     
     bytes = S3_CACHE.load(bytes_key)
-    buffer = io.BytesIO(bytes)
-
-    waveform, _ = librosa.load(buffer, mono=True, sr=int(settings.SAMPLE_RATE), dtype="float32")
-    asr_result = model.transcribe(waveform, word_timestamps=use_word_timestamps)
-    key = REDIS_CACHE.save(asr_result["segments"])
-    return key
\ No newline at end of file
+    waveform = decode_audio(bytes, int(settings.SAMPLE_RATE))
+    if job_id and window_seconds:
+        segments = transcribe_windows(waveform, job_id, window_seconds, use_word_timestamps)
+    else:
+        segments = transcribe_whole(
+            model, waveform, job_id, word_timestamps=use_word_timestamps
+        )
+    key = REDIS_CACHE.save(segments)
+    return key
@@ -0,0 +1,87 @@
+"""
+Windowing of long recordings for streaming transcription.
+
+Windows end at the quietest frame near their target length, so that words
+are not cut in half, and the segments transcribed in a window are shifted
+back to the timeline of the whole recording. Recordings too short for
+windows are transcribed in one call, checked for cancellation around it.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.pipeline import raise_if_cancelled
+
+
+def window_bounds(
+    waveform: np.ndarray, sr: int, window_seconds: float, search_seconds: float = 5.0
+) -> List[Tuple[int, int]]:
+    """
+    Split a waveform into windows, cutting at the quietest point near each boundary.
+
+    Args:
+        waveform (np.ndarray): Mono audio samples.
+        sr (int): Sample rate.
+        window_seconds (float): Target window length.
+        search_seconds (float): How far before the boundary to look for silence.
+
+    Returns:
+        List[Tuple[int, int]]: Start and end sample of each window.
+    """
+    size = int(window_seconds * sr)
+    search = min(int(search_seconds * sr), size // 2)
+    frame = max(sr // 10, 1)
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    while len(waveform) - start > size:
+        lo = start + size - search
+        region = waveform[lo : start + size]
+        frames = region[: len(region) // frame * frame].reshape(-1, frame)
+        cut = start + size
+        if len(frames):
+            cut = lo + int(np.argmin((frames**2).mean(axis=1))) * frame + frame // 2
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, len(waveform)))
+    return bounds
+
+
+def shift_segments(
+    segments: List[Dict[str, Any]], offset: float
+) -> List[Dict[str, Any]]:
+    """Shift segment and word timestamps of a window to the whole recording."""
+    for segment in segments:
+        segment["start"] += offset
+        segment["end"] += offset
+        for word in segment.get("words", []):
+            word["start"] += offset
+            word["end"] += offset
+    return segments
+
+
+def transcribe_whole(
+    model: Any, waveform: np.ndarray, job_id: Optional[str], **options: Any
+) -> List[Dict[str, Any]]:
+    """
+    Transcribe a recording in one call, unless its job was cancelled.
+
+    The ASR call itself cannot be interrupted, so the job is checked before
+    it starts and again before its segments are handed over.
+
+    Args:
+        model (Any): Whisper model.
+        waveform (np.ndarray): Mono audio samples.
+        job_id (Optional[str]): Job of the recording.
+        **options (Any): Options of ``model.transcribe``.
+
+    Returns:
+        List[Dict[str, Any]]: Segments of the recording.
+
+    Raises:
+        JobCancelled: If the job was cancelled before or during the ASR.
+    """
+    raise_if_cancelled(job_id)
+    segments = model.transcribe(waveform, **options)["segments"]
+    raise_if_cancelled(job_id)
+    return segments
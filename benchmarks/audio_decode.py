@@ -0,0 +1,186 @@
+"""
+Real-time factors of audio decoding, per format and resampling quality.
+
+Usage:
+    python -m benchmarks.audio_decode --seconds 600
+    python -m benchmarks.audio_decode --cases wav-16k-mono,m4a-44k-stereo --qualities HQ,LQ
+
+Encodes a synthetic recording in each case (format, sample rate, channels),
+then decodes it to the mono ``SAMPLE_RATE`` waveform the models take, with
+``librosa.load`` (the previous decoding of ``transcribe``) and with
+``decode_audio`` at each soxr quality. The real-time factor is the decoding
+time divided by the audio duration, lower is faster. M4A needs ffmpeg, and
+is skipped without it.
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import soundfile
+
+# Case name: format, sample rate, channels
+CASES = {
+    "wav-16k-mono": ("WAV", 16000, 1),
+    "wav-44k-stereo": ("WAV", 44100, 2),
+    "flac-16k-mono": ("FLAC", 16000, 1),
+    "flac-48k-stereo": ("FLAC", 48000, 2),
+    "mp3-44k-stereo": ("MP3", 44100, 2),
+    "ogg-48k-mono": ("OGG", 48000, 1),
+    "m4a-44k-stereo": ("M4A", 44100, 2),
+}
+SUBTYPES = {"WAV": "PCM_16", "FLAC": "PCM_16", "MP3": "MPEG_LAYER_III", "OGG": "VORBIS"}
+
+
+def make_recording(seconds: float, sr: int, channels: int, seed: int = 0) -> np.ndarray:
+    """Background noise with a tone that changes pitch every few seconds."""
+    rng = np.random.default_rng(seed)
+    samples = np.empty((int(seconds * sr), channels), dtype=np.float32)
+    block = 10 * sr
+    for start in range(0, len(samples), block):
+        end = min(start + block, len(samples))
+        t = np.arange(start, end, dtype=np.float32) / sr
+        voice = 0.2 * np.sin(2 * np.pi * rng.uniform(100, 300) * t)
+        for channel in range(channels):
+            samples[start:end, channel] = voice + rng.normal(0, 0.01, end - start)
+    return samples
+
+
+def encode(samples: np.ndarray, sr: int, fmt: str) -> Optional[bytes]:
+    """File of the samples in a format, None if no encoder is available."""
+    if fmt == "M4A":
+        if shutil.which("ffmpeg") is None:
+            return None
+        with tempfile.TemporaryDirectory() as workdir:
+            wav, m4a = os.path.join(workdir, "in.wav"), os.path.join(workdir, "out.m4a")
+            soundfile.write(wav, samples, sr, subtype="PCM_16")
+            subprocess.run(
+                ["ffmpeg", "-loglevel", "error", "-i", wav, "-c:a", "aac", m4a],
+                check=True,
+            )
+            with open(m4a, "rb") as f:
+                return f.read()
+    buffer = io.BytesIO()
+    try:
+        with soundfile.SoundFile(
+            buffer, "w", sr, samples.shape[1], SUBTYPES[fmt], format=fmt
+        ) as f:
+            # libsndfile's Vorbis encoder crashes on large single writes
+            for start in range(0, len(samples), 1 << 16):
+                f.write(samples[start : start + (1 << 16)])
+    except (soundfile.LibsndfileError, ValueError):
+        return None
+    return buffer.getvalue()
+
+
+def make_decoders(
+    sr: int, qualities: List[str]
+) -> Dict[str, Callable[[bytes], np.ndarray]]:
+    """Previous decoding of ``transcribe``, then ``decode_audio`` per quality."""
+    import librosa
+
+    from app.services.audio import decode_audio
+
+    def previous(audio: bytes) -> np.ndarray:
+        return librosa.load(io.BytesIO(audio), mono=True, sr=sr, dtype="float32")[0]
+
+    decoders: Dict[str, Callable[[bytes], np.ndarray]] = {"librosa.load": previous}
+    for quality in qualities:
+        decoders[f"decode_audio {quality}"] = (
+            lambda audio, quality=quality: decode_audio(audio, sr, quality)
+        )
+    return decoders
+
+
+def measure(
+    decode: Callable[[bytes], np.ndarray], audio: bytes, repeat: int
+) -> Optional[float]:
+    """Best decoding seconds over ``repeat`` runs, None if decoding fails."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        try:
+            decode(audio)
+        except Exception:
+            return None
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Decode every case with every decoder and print the real-time factors."""
+    from app.core.config import settings
+
+    sr = int(settings.SAMPLE_RATE or 16000)
+    decoders = make_decoders(sr, args.qualities)
+    # Warm-up: lazy imports and first-call initialisation are not decoding
+    warm_up = encode(make_recording(1.0, 44100, 2), 44100, "WAV")
+    for decode in decoders.values():
+        decode(warm_up)
+
+    print(f"{'case':<18}{'decoder':<20}{'seconds':>10}{'RTF':>10}{'speed-up':>10}")
+    results = []
+    for name in args.cases:
+        fmt, rate, channels = CASES[name]
+        audio = encode(make_recording(args.seconds, rate, channels), rate, fmt)
+        if audio is None:
+            print(f"{name:<18}skipped, no {fmt} encoder", file=sys.stderr)
+            continue
+        baseline = None
+        for decoder, decode in decoders.items():
+            seconds = measure(decode, audio, args.repeat)
+            rtf = None if seconds is None else seconds / args.seconds
+            results.append(
+                {"case": name, "decoder": decoder, "seconds": seconds, "rtf": rtf}
+            )
+            if seconds is None:
+                print(f"{name:<18}{decoder:<20}{'fails':>10}")
+                continue
+            # Speed-up over the first decoder that could decode the case
+            baseline = baseline or seconds
+            print(
+                f"{name:<18}{decoder:<20}{seconds:>10.3f}{rtf:>10.5f}"
+                f"{f'{baseline / seconds:.1f}x':>10}"
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--seconds", type=float, default=600, help="duration of the recordings"
+    )
+    parser.add_argument(
+        "--cases",
+        type=lambda value: value.split(","),
+        default=list(CASES),
+        help=f"comma-separated cases among {', '.join(CASES)}",
+    )
+    parser.add_argument(
+        "--qualities",
+        type=lambda value: [quality.upper() for quality in value.split(",")],
+        default=["HQ", "MQ", "LQ"],
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
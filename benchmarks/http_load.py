@@ -0,0 +1,452 @@
+"""
+HTTP load test of one API replica, with local stand-ins for its backends.
+
+Usage:
+    python -m benchmarks.http_load --users 50 --seconds 120
+    python -m benchmarks.http_load --users 200 --upload-durations 60,600 --output load.json
+
+Starts the FastAPI app in a single uvicorn process, like one pod of
+``manifests/web-deployment.yaml``, against fakeredis (broker, caches,
+result backend), moto (S3) and SQLite. No Celery worker runs: a stand-in
+marks each job done ``--job-seconds`` after upload, with a synthetic
+result, so that polling and exports see finished jobs.
+
+Each virtual user signs up and logs in, then repeatedly uploads a WAV of
+one of ``--upload-durations``, polls the job status until it is done and,
+for ``--export-share`` of the jobs, exports the PDF. Throughput and latency
+percentiles are reported per endpoint, along with the event loop lag of
+the server, i.e. how late a timer scheduled every 50 ms fires, which grows
+when requests block the loop.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.pipeline_e2e import make_audio, start_services
+
+LAG_INTERVAL = 0.05
+
+
+# --- Server process ------------------------------------------------------------
+
+
+async def monitor_lag(samples: List[float]) -> None:
+    """Record how late a periodic timer fires on the running event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_INTERVAL
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+def serve(
+    port: int, redis_port: int, workdir: str, lag_path: str, log_path: str
+) -> None:
+    """Run the app in this process until SIGINT, then write the loop lag."""
+    log = open(log_path, "a")
+    os.dup2(log.fileno(), sys.stdout.fileno())
+    os.dup2(log.fileno(), sys.stderr.fileno())
+    mock = start_services(workdir, redis_port)
+    import uvicorn
+
+    from main import app
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    samples: List[float] = []
+
+    async def run() -> None:
+        monitor = asyncio.create_task(monitor_lag(samples))
+        try:
+            await server.serve()
+        finally:
+            monitor.cancel()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.stop()
+        with open(lag_path, "w") as f:
+            json.dump(samples, f)
+
+
+# --- Stand-in worker --------------------------------------------------------------
+
+
+def make_result(duration: float) -> Dict[str, Any]:
+    """Summarization result of a meeting, one turn per 6 seconds of audio."""
+    from app.schemas.langchain import ItemFormatter, Turn
+
+    turns = [
+        Turn(
+            start=idx * 6.0,
+            end=idx * 6.0 + 5.0,
+            speaker=f"SPEAKER_{idx % 4:02d}",
+            text="we should ship the release after the QA sign-off",
+        )
+        for idx in range(max(1, int(duration / 6)))
+    ]
+    items = [ItemFormatter(text="Release plan", start=0.0, end=10.0)]
+    return {
+        "status": "success",
+        "summary": "SPEAKER_00 proposed the release plan, SPEAKER_01 agreed.",
+        "topics": items,
+        "decisions": items,
+        "actions": items,
+        "turns": turns,
+        "failed_sections": [],
+    }
+
+
+class StubWorker:
+    """Completes jobs as a Celery worker would, after a fixed delay."""
+
+    def __init__(self, job_seconds: float) -> None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlalchemy.pool import NullPool
+
+        from app.core.config import settings
+
+        self.job_seconds = job_seconds
+        # Used from two event loops, to create the tables and during the test
+        self.engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+        self.pending: List[asyncio.Task] = []
+
+    async def create_tables(self) -> None:
+        from app.db.base import Base
+
+        import app.models.job  # noqa: F401
+        import app.models.user  # noqa: F401
+
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    def submitted(self, job_id: str, duration: float) -> None:
+        self.pending.append(asyncio.create_task(self.complete(job_id, duration)))
+
+    async def complete(self, job_id: str, duration: float) -> None:
+        from sqlalchemy import update
+        from sqlalchemy.future import select
+
+        from app.models.job import Job
+        from app.services.cache import REDIS_CACHE
+        from app.services.celery_worker import c_worker
+        from app.services.scheduler import SCHEDULER
+
+        await asyncio.sleep(self.job_seconds)
+        async with self.engine.begin() as conn:
+            task_id = (
+                await conn.execute(select(Job.task_id).filter(Job.id == job_id))
+            ).scalar_one()
+
+        def store() -> None:
+            key = REDIS_CACHE.save(make_result(duration))
+            c_worker.backend.store_result(task_id, key, "SUCCESS")
+            SCHEDULER.finish(job_id)
+
+        await asyncio.to_thread(store)
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                update(Job).filter(Job.id == job_id).values(status="done")
+            )
+
+    async def close(self) -> None:
+        for task in self.pending:
+            task.cancel()
+        await asyncio.gather(*self.pending, return_exceptions=True)
+        await self.engine.dispose()
+
+
+# --- Load generator ---------------------------------------------------------------
+
+
+class Recorder:
+    """Latency and status of each request, per endpoint."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs: Any
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            response, status = None, type(e).__name__
+        if self.recording:
+            self.latencies[name].append(time.perf_counter() - started)
+            self.statuses[name][status] += 1
+        return response
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    worker: StubWorker,
+    uploads: Dict[int, bytes],
+    args: argparse.Namespace,
+    deadline: float,
+    rng: random.Random,
+) -> None:
+    credentials = {"username": f"load-{uuid.uuid4().hex[:12]}", "password": "load-test"}
+    await recorder.request(client, "signup", "POST", "/auth/signup", json=credentials)
+    response = await recorder.request(
+        client, "login", "POST", "/auth/login", json=credentials
+    )
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    while time.monotonic() < deadline:
+        duration = rng.choice(args.upload_durations)
+        response = await recorder.request(
+            client,
+            f"query ({duration}s)",
+            "POST",
+            "/summarize/query",
+            headers=headers,
+            files={"file": ("meeting.wav", uploads[duration], "audio/wav")},
+        )
+        if response is None or response.status_code != 200:
+            # Over the per-user limit or failed, back off as a client would
+            await asyncio.sleep(args.poll_interval)
+            continue
+        job_id = response.json()["id"]
+        worker.submitted(job_id, duration)
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(args.poll_interval)
+            response = await recorder.request(
+                client,
+                "job status",
+                "GET",
+                f"/summarize/jobs/{job_id}",
+                headers=headers,
+            )
+            if response is None or response.status_code != 200:
+                break
+            if response.json()["status"] not in ("pending", "running"):
+                break
+        if rng.random() < args.export_share and time.monotonic() < deadline:
+            await recorder.request(
+                client,
+                "export_pdf",
+                "GET",
+                "/summarize/export_pdf",
+                params={"job_id": job_id},
+                headers=headers,
+            )
+        await asyncio.sleep(rng.uniform(0, args.think_time))
+
+
+async def wait_until_up(client: httpx.AsyncClient, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("The server did not start, see --server-log")
+
+
+async def run_load(
+    base_url: str, worker: StubWorker, args: argparse.Namespace
+) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    uploads = {d: make_audio(d, []) for d in args.upload_durations}
+    recorder = Recorder()
+    limits = httpx.Limits(
+        max_connections=args.users, max_keepalive_connections=args.users
+    )
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=timeout
+    ) as client:
+        await wait_until_up(client)
+        recorder.recording = True
+        started = time.monotonic()
+        deadline = started + args.seconds
+        # Users arrive over the ramp-up, rather than all signing up at once
+        users = []
+        for idx in range(args.users):
+            users.append(
+                asyncio.create_task(
+                    virtual_user(
+                        client,
+                        recorder,
+                        worker,
+                        uploads,
+                        args,
+                        deadline,
+                        random.Random(rng.random()),
+                    )
+                )
+            )
+            await asyncio.sleep(args.ramp_up / args.users)
+        await asyncio.gather(*users)
+        elapsed = time.monotonic() - started
+    await worker.close()
+    return {"elapsed": elapsed, "recorder": recorder}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[int(q) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float, lag: List[float]) -> Dict[str, Any]:
+    endpoints = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        endpoints[name] = {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "statuses": dict(recorder.statuses[name]),
+        }
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "endpoints": endpoints,
+        "event_loop_lag_ms": {
+            "p50": round(percentile(lag, 50) * 1000, 1),
+            "p99": round(percentile(lag, 99) * 1000, 1),
+            "max": round(max(lag, default=0.0) * 1000, 1),
+        },
+    }
+
+
+def print_summary(results: Dict[str, Any]) -> None:
+    print(
+        f"{'endpoint':<20}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses"
+    )
+    for name, entry in results["endpoints"].items():
+        statuses = " ".join(
+            f"{code}:{n}" for code, n in sorted(entry["statuses"].items())
+        )
+        print(
+            f"{name:<20}{entry['requests']:>9}{entry['rps']:>8.1f}{entry['p50_ms']:>9.1f}"
+            f"{entry['p95_ms']:>9.1f}{entry['p99_ms']:>9.1f}  {statuses}"
+        )
+    lag = results["event_loop_lag_ms"]
+    print(
+        f"{results['requests']} requests in {results['elapsed_s']} s, "
+        f"{results['rps']} req/s; event loop lag p50 {lag['p50']} ms, "
+        f"p99 {lag['p99']} ms, max {lag['max']} ms"
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--users", type=int, default=20, help="concurrent virtual users"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=60, help="duration of the test"
+    )
+    parser.add_argument(
+        "--ramp-up", type=float, default=10, help="seconds to start every user"
+    )
+    parser.add_argument(
+        "--upload-durations",
+        type=parse_ints,
+        default=[60, 600, 1800],
+        help="comma-separated seconds of audio of the uploads",
+    )
+    parser.add_argument(
+        "--job-seconds", type=float, default=5, help="stand-in processing time"
+    )
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--export-share", type=float, default=0.5)
+    parser.add_argument(
+        "--think-time", type=float, default=2.0, help="max pause between jobs"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0, help="request timeout")
+    parser.add_argument(
+        "--pdf-backend", help="PDF_BACKEND of the server, e.g. reportlab"
+    )
+    parser.add_argument("--server-log", default=os.devnull)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.pdf_backend:
+        # Also read by the render processes the server spawns
+        os.environ["PDF_BACKEND"] = args.pdf_backend
+
+    with tempfile.TemporaryDirectory() as workdir:
+        mock = start_services(workdir)
+        from app.core.config import settings
+
+        lag_path = os.path.join(workdir, "lag.json")
+        port = free_port()
+        worker = StubWorker(args.job_seconds)
+        asyncio.run(worker.create_tables())
+        server = multiprocessing.get_context("spawn").Process(
+            target=serve,
+            args=(port, settings.REDIS_PORT, workdir, lag_path, args.server_log),
+        )
+        server.start()
+        try:
+            outcome = asyncio.run(run_load(f"http://127.0.0.1:{port}", worker, args))
+        finally:
+            # Stops uvicorn like Ctrl+C, the server then writes the loop lag
+            os.kill(server.pid, signal.SIGINT)
+            server.join(timeout=30)
+            mock.stop()
+        with open(lag_path) as f:
+            lag = json.load(f)
+
+    results = summarize(outcome["recorder"], outcome["elapsed"], lag)
+    results["settings"] = {
+        "users": args.users,
+        "upload_durations": args.upload_durations,
+        "USER_MAX_ACTIVE_JOBS": settings.USER_MAX_ACTIVE_JOBS,
+        "RENDER_POOL_WORKERS": settings.RENDER_POOL_WORKERS,
+    }
+    print_summary(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
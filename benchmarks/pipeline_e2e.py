@@ -0,0 +1,562 @@
+"""
+Offline end-to-end benchmark of the summarization pipeline.
+
+Usage:
+    python -m benchmarks.pipeline_e2e --durations 60,600,3600 --output bench.json
+    python -m benchmarks.pipeline_e2e --output new.json --baseline bench.json
+
+Runs the whole chain (upload, transcription, diarization, conversation,
+summarization and, with ``--report``, the PDF) with Celery in eager mode
+against local stand-ins: a fakeredis server, moto for S3, a Whisper and a
+pyannote pipeline replaying a recorded transcript and diarization, and a
+stub LLM. Audio and transcripts are synthetic, meetings can last from 1
+minute to 10 hours (36000 s). The stand-ins answer instantly, so the
+timings are those of the pipeline code itself: decoding, caching,
+serialization, conversation building, prompt encoding and orchestration.
+
+Per-stage wall time and peak traced memory (tracemalloc, which slows
+Python code down; ``--no-memory`` for timings only) are written as JSON.
+With a baseline file from another commit, the ratio of each stage time to
+the baseline is printed.
+"""
+
+import argparse
+import asyncio
+import bisect
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile
+
+MB = 1024 * 1024
+SAMPLE_RATE = 16000
+MAX_DURATION = 10 * 3600
+WORDS = (
+    "we should ship the release after the QA sign-off and review the budget "
+    "for the roadmap customer feedback says the migration plan is late so "
+    "the owner will follow up next sprint on the risks and the deadline"
+).split()
+
+
+# --- Synthetic meetings ---------------------------------------------------
+
+
+def make_script(
+    duration: float, speakers: int, seed: int
+) -> Tuple[List[Dict[str, Any]], List[Tuple[float, float, str]]]:
+    """Whisper segments and diarization turns of a synthetic meeting."""
+    rng = random.Random(seed)
+    segments: List[Dict[str, Any]] = []
+    turns: List[Tuple[float, float, str]] = []
+    speaker = 0
+    now = 0.5
+    while now < duration - 1:
+        if rng.random() < 0.3:
+            speaker = rng.randrange(speakers)
+        length = min(rng.uniform(2.0, 8.0), duration - now)
+        n_words = max(1, int(length * 2.5))
+        step = length / n_words
+        words = [
+            {
+                "word": " " + rng.choice(WORDS),
+                "start": now + idx * step,
+                "end": now + (idx + 0.8) * step,
+                "probability": 0.9,
+            }
+            for idx in range(n_words)
+        ]
+        segments.append(
+            {
+                "id": len(segments),
+                "start": now,
+                "end": now + length,
+                "text": "".join(word["word"] for word in words),
+                "words": words,
+            }
+        )
+        turns.append((now, now + length, f"SPEAKER_{speaker:02d}"))
+        now += length + rng.uniform(0.1, 1.0)
+    return segments, turns
+
+
+def make_audio(
+    duration: float, turns: List[Tuple[float, float, str]], sr: int = SAMPLE_RATE
+) -> bytes:
+    """16-bit mono WAV with background noise and one tone per speaker turn."""
+    rng = np.random.default_rng(0)
+    total = int(duration * sr)
+    block = 60 * sr
+    buffer = io.BytesIO()
+    with soundfile.SoundFile(
+        buffer, "w", samplerate=sr, channels=1, format="WAV", subtype="PCM_16"
+    ) as wav:
+        turn = 0
+        for start in range(0, total, block):
+            end = min(start + block, total)
+            chunk = rng.normal(0.0, 0.005, end - start).astype(np.float32)
+            while turn < len(turns) and turns[turn][1] * sr < start:
+                turn += 1
+            idx = turn
+            while idx < len(turns) and turns[idx][0] * sr < end:
+                lo = max(int(turns[idx][0] * sr), start)
+                hi = min(int(turns[idx][1] * sr), end)
+                freq = 120 + 40 * int(turns[idx][2].rsplit("_", 1)[-1])
+                t = np.arange(lo, hi, dtype=np.float32) / sr
+                chunk[lo - start : hi - start] += 0.1 * np.sin(2 * np.pi * freq * t)
+                idx += 1
+            wav.write(chunk)
+    return buffer.getvalue()
+
+
+# --- Stand-ins of the models -----------------------------------------------
+
+
+class ReplayASR:
+    """Whisper model replaying the recorded segments of the audio it is given."""
+
+    def __init__(self) -> None:
+        self.segments: List[Dict[str, Any]] = []
+        self.starts: List[float] = []
+        self.cursor = 0.0
+
+    def load(self, segments: List[Dict[str, Any]]) -> None:
+        self.segments = segments
+        self.starts = [segment["start"] for segment in segments]
+        self.cursor = 0.0
+
+    def transcribe(self, audio: np.ndarray, **_: Any) -> Dict[str, Any]:
+        # Windows of a recording are transcribed in order
+        start, end = self.cursor, self.cursor + len(audio) / SAMPLE_RATE
+        self.cursor = end
+        lo = bisect.bisect_left(self.starts, start)
+        hi = bisect.bisect_left(self.starts, end)
+        segments = [
+            {
+                **segment,
+                "start": segment["start"] - start,
+                "end": segment["end"] - start,
+                "words": [
+                    {**word, "start": word["start"] - start, "end": word["end"] - start}
+                    for word in segment["words"]
+                ],
+            }
+            for segment in self.segments[lo:hi]
+        ]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+class ReplayDiarization:
+    """pyannote pipeline replaying the recorded speaker turns."""
+
+    def __init__(self) -> None:
+        self.turns: List[Tuple[float, float, str]] = []
+
+    def to(self, device: Any) -> "ReplayDiarization":
+        return self
+
+    def __call__(self, audio: Any, hook: Any = None) -> Any:
+        from pyannote.core import Annotation, Segment
+
+        if hook is not None:
+            hook("segmentation", None)
+        annotation = Annotation()
+        for start, end, speaker in self.turns:
+            annotation[Segment(start, end)] = speaker
+        return annotation
+
+
+ASR = ReplayASR()
+DIARIZATION = ReplayDiarization()
+
+
+def structured_response(schema: Any, words: int) -> Any:
+    """Instance of a structured output schema filled with synthetic text."""
+    text = " ".join(WORDS[idx % len(WORDS)] for idx in range(words))
+    values: Dict[str, Any] = {}
+    for name, field in schema.model_fields.items():
+        if field.annotation is str:
+            values[name] = text
+        else:
+            values[name] = [{"text": f"{name} {idx}: {text[:60]}"} for idx in range(3)]
+    return schema.model_validate(values)
+
+
+def make_chat_model(response_words: int) -> Any:
+    """LLM answering every prompt instantly with a synthetic response."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+    from langchain_core.runnables import RunnableLambda
+
+    class StubChatModel(BaseChatModel):
+        words: int = 120
+
+        @property
+        def _llm_type(self) -> str:
+            return "stub"
+
+        def _text(self) -> str:
+            return " ".join(WORDS[idx % len(WORDS)] for idx in range(self.words))
+
+        def _generate(
+            self, messages: Any, stop: Any = None, run_manager: Any = None, **_: Any
+        ) -> Any:
+            message = AIMessage(content=self._text())
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        def _stream(
+            self, messages: Any, stop: Any = None, run_manager: Any = None, **_: Any
+        ) -> Iterator[Any]:
+            for word in self._text().split(" "):
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+                if run_manager is not None:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+
+        def with_structured_output(self, schema: Any, **_: Any) -> Any:
+            return RunnableLambda(lambda _: structured_response(schema, self.words))
+
+    return StubChatModel(words=response_words)
+
+
+# --- Stand-ins of the services ----------------------------------------------
+
+
+def start_services(workdir: str, redis_port: Optional[int] = None) -> Any:
+    """
+    Start fakeredis and moto and point the settings at them.
+
+    Must run before the services are imported, they read the settings at
+    import. Creates the bucket, as the API and worker startup would.
+
+    Args:
+        workdir (str): Directory of the SQLite database.
+        redis_port (Optional[int]): Port of a fakeredis server started by
+            another process, a new one is started by default.
+
+    Returns:
+        Any: The moto mock, to stop.
+    """
+    import fakeredis
+    from moto import mock_aws
+
+    from app.core.config import settings
+
+    if redis_port is None:
+        server = fakeredis.TcpFakeServer(("127.0.0.1", 0))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        redis_port = server.server_address[1]
+    overrides = {
+        "REDIS_HOST": "127.0.0.1",
+        "REDIS_PORT": redis_port,
+        "REDIS_BROKER_DB": 0,
+        "REDIS_CACHE_DB": 1,
+        "S3_BUCKET": "benchmark",
+        "S3_REGION": "us-east-1",
+        "S3_ENDPOINT_PROTOCOL": "http",
+        "S3_ENDPOINT_HOST": "s3.benchmark.local",
+        "S3_ENDPOINT_PORT": 9000,
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "DB_ENGINE": "sqlite",
+        "DB_NAME": os.path.join(workdir, "benchmark.sqlite3"),
+        "WORKER_METRICS_PORT": 0,
+    }
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    # Model settings only name the models, which are replaced
+    for key, value in {
+        "SAMPLE_RATE": SAMPLE_RATE,
+        "WHISPER_SIZE": "replay",
+        "DIARIZATION_MODEL": "replay",
+        "HF_TOKEN": "",
+        "MODEL_NAME": "stub",
+        "OLLAMA_URL": "http://127.0.0.1:1",
+    }.items():
+        if getattr(settings, key, None) is None:
+            setattr(settings, key, value)
+    os.environ["MOTO_S3_CUSTOM_ENDPOINTS"] = "http://s3.benchmark.local:9000"
+
+    whisper = types.ModuleType("whisper")
+    whisper.load_model = lambda *_, **__: ASR  # type: ignore[attr-defined]
+    pyannote_audio = types.ModuleType("pyannote.audio")
+    pyannote_audio.Pipeline = types.SimpleNamespace(  # type: ignore[attr-defined]
+        from_pretrained=lambda *_, **__: DIARIZATION
+    )
+    sys.modules["whisper"] = whisper
+    sys.modules["pyannote.audio"] = pyannote_audio
+
+    mock = mock_aws()
+    mock.start()
+    from app.services.cache import S3_CACHE
+
+    S3_CACHE.ensure_bucket()
+    return mock
+
+
+# --- Measurements --------------------------------------------------------------
+
+
+class StageProbe:
+    """Wall time and peak traced memory of each stage, from Celery signals."""
+
+    def __init__(self, memory: bool) -> None:
+        self.memory = memory
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._running: Dict[str, Tuple[str, float, int]] = {}
+
+    def reset(self) -> None:
+        self.stages = {}
+
+    def start(self, key: str, stage: str) -> None:
+        traced = 0
+        if self.memory:
+            traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._running[key] = (stage, time.perf_counter(), traced)
+
+    def stop(self, key: str) -> None:
+        if key not in self._running:
+            return
+        stage, started, traced = self._running.pop(key)
+        entry = self.stages.setdefault(
+            stage, {"seconds": 0.0, "calls": 0, "peak_mb": 0.0}
+        )
+        entry["seconds"] += time.perf_counter() - started
+        entry["calls"] += 1
+        if self.memory:
+            peak = (tracemalloc.get_traced_memory()[1] - traced) / MB
+            entry["peak_mb"] = max(entry["peak_mb"], peak)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Benchmark ---------------------------------------------------------------
+
+
+def run(args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    from celery.signals import task_postrun, task_prerun
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.core.config import settings
+    from app.db.base import Base
+    from app.models.job import Job
+    from app.services import celery_worker
+    from app.services.audio import probe_duration
+    from app.services.cache import S3_CACHE
+    from app.services.pipeline import build_pipeline, dispatch, is_streaming
+    from app.services.summarize import tasks as summarize_tasks
+
+    import app.models.user  # noqa: F401  registers the users table
+    import app.services.conversation.tasks  # noqa: F401
+    import app.services.diarize.tasks  # noqa: F401
+    import app.services.report.tasks  # noqa: F401
+    import app.services.transcribe.tasks  # noqa: F401
+
+    settings.REPORT_PRERENDER = args.report
+    settings.SCHEDULER_MAX_ACTIVE_JOBS = 0
+    worker = celery_worker.c_worker
+    worker.conf.task_always_eager = True
+    worker.conf.task_eager_propagates = True
+    llm = make_chat_model(args.llm_words)
+    summarize_tasks.get_llm = lambda model_name: llm
+    summarize_tasks.get_structured_llm.cache_clear()
+
+    # Window summaries are sent by transcription; they run once the
+    # diarization they need exists, as they would on other workers
+    deferred: List[Tuple[str, Dict[str, Any]]] = []
+    worker.send_task = lambda name, kwargs=None, **_: deferred.append(
+        (name, kwargs or {})
+    )
+    probe = StageProbe(args.memory)
+
+    @task_prerun.connect(weak=False)
+    def on_prerun(task_id: str, task: Any, **_: Any) -> None:
+        stage = task.name.rsplit(".", 1)[-1]
+        if stage == "create_conversation":
+            while deferred:
+                name, kwargs = deferred.pop(0)
+                worker.tasks[name].apply(kwargs=kwargs)
+        probe.start(task_id, stage)
+
+    @task_postrun.connect(weak=False)
+    def on_postrun(task_id: str, **_: Any) -> None:
+        probe.stop(task_id)
+
+    # One event loop per job, connections are not reused across loops
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+    async def create_tables() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def add_job(job_id: str, audio_duration: float) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(
+                Job.__table__.insert().values(
+                    id=job_id,
+                    user_id=1,
+                    status="pending",
+                    audio_duration=audio_duration,
+                )
+            )
+
+    asyncio.run(create_tables())
+    if args.memory:
+        tracemalloc.start()
+
+    def run_job(duration: int) -> Dict[str, Any]:
+        segments, turns = make_script(duration, args.speakers, seed=duration)
+        audio = make_audio(duration, turns)
+        ASR.load(segments)
+        DIARIZATION.turns = turns
+        probe.reset()
+        job_id = str(uuid.uuid4())
+
+        started = time.perf_counter()
+        probe.start("ingest", "ingest")
+        bytes_key = S3_CACHE.save(audio, f"benchmark/{job_id}/audio.wav")
+        audio_duration = probe_duration(audio)
+        probe.stop("ingest")
+        asyncio.run(add_job(job_id, audio_duration))
+        streaming = is_streaming(audio_duration)
+        canvas = build_pipeline(
+            job_id, bytes_key, f"benchmark/{job_id}/report.pdf", streaming
+        )
+        dispatch(job_id, canvas).get(disable_sync_subtasks=False)
+        total = time.perf_counter() - started
+
+        return {
+            "duration_s": duration,
+            "streaming": streaming,
+            "segments": len(segments),
+            "audio_mb": round(len(audio) / MB, 1),
+            "total_s": round(total, 3),
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+            "stages": {
+                name: {
+                    "seconds": round(entry["seconds"], 3),
+                    "calls": int(entry["calls"]),
+                    "peak_mb": round(entry["peak_mb"], 1) if args.memory else None,
+                }
+                for name, entry in probe.stages.items()
+            },
+        }
+
+    # Imports done on first use (librosa, scipy, tiktoken, ...) are not
+    # part of any meeting
+    run_job(60)
+    jobs = []
+    for duration in args.durations:
+        jobs.append(run_job(duration))
+        print(f"{duration:>7}s meeting: {jobs[-1]['total_s']:.2f}s", file=sys.stderr)
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "memory_traced": args.memory,
+        "settings": {
+            "STREAMING_MIN_DURATION": settings.STREAMING_MIN_DURATION,
+            "STREAMING_WINDOW_SECONDS": settings.STREAMING_WINDOW_SECONDS,
+            "PROMPT_TOKEN_BUDGET": settings.PROMPT_TOKEN_BUDGET,
+            "REPORT_PRERENDER": settings.REPORT_PRERENDER,
+        },
+        "jobs": jobs,
+    }
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    previous = {job["duration_s"]: job for job in (baseline or {}).get("jobs", [])}
+    print(f"{'meeting':>9} {'stage':<22}{'seconds':>10}{'peak MB':>10}{'vs base':>10}")
+    for job in results["jobs"]:
+        base = previous.get(job["duration_s"], {}).get("stages", {})
+        rows = list(job["stages"].items()) + [("total", {"seconds": job["total_s"]})]
+        for name, entry in rows:
+            before = (
+                previous.get(job["duration_s"], {}).get("total_s")
+                if name == "total"
+                else base.get(name, {}).get("seconds")
+            )
+            ratio = f"{entry['seconds'] / before:.2f}x" if before else "-"
+            peak = entry.get("peak_mb")
+            print(
+                f"{job['duration_s']:>8}s {name:<22}{entry['seconds']:>10.3f}"
+                f"{'-' if peak is None else f'{peak:.1f}':>10}{ratio:>10}"
+            )
+
+
+def parse_durations(value: str) -> List[int]:
+    durations = [int(item) for item in value.split(",") if item.strip()]
+    if not durations or not all(60 <= d <= MAX_DURATION for d in durations):
+        raise argparse.ArgumentTypeError(
+            f"durations must be between 60 and {MAX_DURATION} seconds"
+        )
+    return sorted(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--durations",
+        type=parse_durations,
+        default=[60, 600, 3600],
+        help="comma-separated meeting lengths in seconds, 60 to 36000",
+    )
+    parser.add_argument("--speakers", type=int, default=4)
+    parser.add_argument(
+        "--llm-words", type=int, default=120, help="words per LLM answer"
+    )
+    parser.add_argument(
+        "--report", action="store_true", help="render the PDF stage too"
+    )
+    parser.add_argument("--memory", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--output", default="pipeline_e2e.json")
+    parser.add_argument("--baseline", help="results of another commit to compare to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        mock = start_services(workdir)
+        try:
+            results = run(args, workdir)
+        finally:
+            mock.stop()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
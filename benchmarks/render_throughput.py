@@ -0,0 +1,79 @@
+"""
+Throughput of PDF report rendering, sequential versus the process pool.
+
+Usage:
+    python -m benchmarks.render_throughput --reports 16 --turns 2000 --workers 4
+
+Sequential rendering uses one warm DocumentGenerator in this process, the
+pooled run submits every report to a ReportRenderPool at once.
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+from app.schemas.langchain import ItemFormatter, Turn
+from app.services.summarize.render_pool import ReportRenderPool, render_pdf
+
+
+def make_result(n_turns: int) -> Dict[str, Any]:
+    turns = [
+        Turn(
+            start=i * 2.0,
+            end=i * 2.0 + 1.5,
+            speaker=f"SPEAKER_{i % 4:02d}",
+            text=f"turn {i}: we should ship the release after the QA sign-off",
+        )
+        for i in range(n_turns)
+    ]
+    items = [ItemFormatter(text="Release plan", start=0.0, end=10.0)]
+    return {
+        "status": "success",
+        "summary": "SPEAKER_00 proposed the release plan, SPEAKER_01 agreed.",
+        "topics": items,
+        "decisions": items,
+        "actions": items,
+        "turns": turns,
+    }
+
+
+def report(label: str, elapsed: float, n_reports: int) -> None:
+    print(f"{label:<12} {elapsed:8.2f} s  {n_reports / elapsed:8.2f} reports/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", default="weasyprint")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = [
+        make_result(args.turns) for _ in range(args.reports)
+    ]
+
+    # Warm-up render so both runs start with loaded fonts and stylesheet
+    render_pdf(results[0], args.backend)
+    started = time.perf_counter()
+    for result in results:
+        render_pdf(result, args.backend)
+    report("sequential", time.perf_counter() - started, args.reports)
+
+    pool = ReportRenderPool(workers=args.workers, max_queue=args.reports)
+    try:
+        # Start and warm the worker processes outside of the measurement
+        warm = [pool.submit(results[0], args.backend) for _ in range(args.workers)]
+        for future in warm:
+            future.result()
+        started = time.perf_counter()
+        futures = [pool.submit(result, args.backend) for result in results]
+        for future in futures:
+            future.result()
+        report(f"pool ({args.workers})", time.perf_counter() - started, args.reports)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Scaling of conversation mapping and report formatting with meeting length.
+
+Usage:
+    python -m benchmarks.scaling --words 1000,10000,100000,1000000 --speakers 2,10,50
+    python -m benchmarks.scaling --check --max-exponent 1.25
+
+Generates synthetic Whisper word streams and pyannote diarization
+annotations, then measures the time and the allocations (tracemalloc peak)
+of ``map_chunks``, ``merge_sentence`` and
+``DocumentGenerator._create_html_content`` for each number of words and
+speakers. The scaling exponent is fitted on a log-log scale: 1 is linear,
+2 quadratic. With ``--check`` the exit status is 1 when an exponent exceeds
+``--max-exponent``, so CI can catch a function regressing from near-linear
+complexity. The services the modules connect to at import are replaced by
+the stand-ins of ``benchmarks.pipeline_e2e``.
+"""
+
+import argparse
+import math
+import random
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from pyannote.core import Annotation, Segment
+
+from benchmarks.pipeline_e2e import start_services
+
+MB = 1024 * 1024
+WORDS = (
+    "we should ship the release after the QA sign-off and review the budget "
+    "for the roadmap customer feedback says the migration plan is late"
+).split()
+
+
+def make_meeting(
+    n_words: int, speakers: int, seed: int = 0
+) -> Tuple[List[Dict[str, Any]], Annotation]:
+    """
+    Whisper segments with word timestamps, and the diarization of a meeting.
+
+    Speakers change between segments, and a tenth of the turns overlap with
+    a short interjection of another speaker.
+    """
+    rng = random.Random(seed)
+    segments: List[Dict[str, Any]] = []
+    annotation = Annotation()
+    speaker = 0
+    now = 0.0
+    produced = 0
+    while produced < n_words:
+        n = min(rng.randint(5, 20), n_words - produced)
+        words = []
+        for _ in range(n):
+            length = rng.uniform(0.2, 0.6)
+            words.append(
+                {"word": " " + rng.choice(WORDS), "start": now, "end": now + length}
+            )
+            now += length + rng.uniform(0.0, 0.2)
+        segments.append(
+            {
+                "start": words[0]["start"],
+                "end": words[-1]["end"],
+                "text": "".join(word["word"] for word in words),
+                "words": words,
+            }
+        )
+        annotation[Segment(words[0]["start"], words[-1]["end"])] = (
+            f"SPEAKER_{speaker:02d}"
+        )
+        if speakers > 1 and rng.random() < 0.1:
+            other = (speaker + rng.randrange(1, speakers)) % speakers
+            start = rng.uniform(words[0]["start"], words[-1]["end"])
+            annotation[Segment(start, start + 1.0)] = f"SPEAKER_{other:02d}"
+        if rng.random() < 0.3:
+            speaker = rng.randrange(speakers)
+        produced += n
+        now += rng.uniform(0.2, 1.5)
+    return segments, annotation
+
+
+def make_cases(n_words: int, speakers: int) -> Dict[str, Callable[[], Any]]:
+    """Calls to measure, their inputs prepared outside of the measurement."""
+    from app.services.conversation.tasks import (
+        add_speaker_info_to_text,
+        get_word_with_timestamp,
+        map_chunks,
+        merge_sentence,
+    )
+    from app.services.summarize.utils import DocumentGenerator
+
+    segments, annotation = make_meeting(n_words, speakers)
+    spk_text = add_speaker_info_to_text(get_word_with_timestamp(segments), annotation)
+    turns = merge_sentence(spk_text).turns
+    result = {
+        "status": "success",
+        "summary": " ".join(f"SPEAKER_{idx:02d} agreed." for idx in range(speakers)),
+        "topics": [],
+        "decisions": [],
+        "actions": [],
+        "turns": turns,
+    }
+    generator = DocumentGenerator()
+    return {
+        "map_chunks": lambda: map_chunks(
+            segments, annotation, use_word_timestamps=True
+        ),
+        "merge_sentence": lambda: merge_sentence(spk_text),
+        "create_html_content": lambda: generator._create_html_content(result),
+    }
+
+
+def measure(call: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+    """Best seconds per call over ``repeat`` runs, and peak traced MB."""
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+    tracemalloc.start()
+    try:
+        call()
+        peak = tracemalloc.get_traced_memory()[1] / MB
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def exponent(sizes: Sequence[float], values: Sequence[float]) -> float:
+    """Slope of the least-squares line of log(value) against log(size)."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-12)) for value in values]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+
+
+def parse_ints(value: str) -> List[int]:
+    return sorted(int(item) for item in value.split(",") if item.strip())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--words", type=parse_ints, default=[1000, 10000, 100000, 1000000]
+    )
+    parser.add_argument("--speakers", type=parse_ints, default=[2, 10, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--check", action="store_true", help="exit 1 on a superlinear fit"
+    )
+    parser.add_argument("--max-exponent", type=float, default=1.25)
+    args = parser.parse_args()
+    if len(args.words) < 2:
+        parser.error("--words needs at least two sizes to fit the scaling")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        mock = start_services(workdir)
+        try:
+            failures = run(args)
+        finally:
+            mock.stop()
+    if failures:
+        print(f"Superlinear scaling: {', '.join(failures)}", file=sys.stderr)
+        if args.check:
+            sys.exit(1)
+
+
+def run(args: argparse.Namespace) -> List[str]:
+    """Print the measurements and fits, return the superlinear cases."""
+    print(f"{'function':<22}{'speakers':>9}{'words':>10}{'ms':>12}{'peak MB':>10}")
+    failures = []
+    for speakers in args.speakers:
+        timings: Dict[str, List[Tuple[float, float]]] = {}
+        for n_words in args.words:
+            for name, call in make_cases(n_words, speakers).items():
+                seconds, peak = measure(call, args.repeat)
+                timings.setdefault(name, []).append((seconds, peak))
+                print(
+                    f"{name:<22}{speakers:>9}{n_words:>10}"
+                    f"{seconds * 1000:>12.2f}{peak:>10.1f}"
+                )
+        for name, values in timings.items():
+            time_exp = exponent(args.words, [seconds for seconds, _ in values])
+            memory_exp = exponent(args.words, [peak for _, peak in values])
+            print(
+                f"{name:<22}{speakers:>9}{'fit':>10}"
+                f"{f'n^{time_exp:.2f}':>12}{f'n^{memory_exp:.2f}':>10}"
+            )
+            if max(time_exp, memory_exp) > args.max_exponent:
+                failures.append(f"{name} with {speakers} speakers")
+    return failures
+
+
+if __name__ == "__main__":
+    main()
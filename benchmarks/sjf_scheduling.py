@@ -0,0 +1,116 @@
+"""
+Latency of short meetings under mixed load, arrival order versus shortest
+job first with aging.
+
+Usage:
+    python -m benchmarks.sjf_scheduling --jobs 5000 --workers 2 --load 0.8
+
+Simulates the audio stage admission of the job scheduler: jobs arrive as a
+Poisson process, mostly short stand-ups with a few multi-hour recordings,
+and hold one of ``--workers`` slots for ``rtf * duration`` seconds. Jobs are
+admitted by ``arrival + weight * duration`` like ``JobScheduler``; a weight
+of 0 is arrival order.
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+from typing import List, Tuple
+
+
+def make_jobs(
+    n_jobs: int,
+    workers: int,
+    load: float,
+    rtf: float,
+    short: float,
+    long: float,
+    long_share: float,
+    seed: int,
+) -> List[Tuple[float, float]]:
+    """Arrival time and audio duration of each job."""
+    rng = random.Random(seed)
+    mean_service = rtf * (long_share * long + (1 - long_share) * short)
+    rate = load * workers / mean_service
+    jobs, now = [], 0.0
+    for _ in range(n_jobs):
+        now += rng.expovariate(rate)
+        jobs.append((now, long if rng.random() < long_share else short))
+    return jobs
+
+
+def simulate(
+    jobs: List[Tuple[float, float]], workers: int, weight: float, rtf: float
+) -> List[Tuple[float, float]]:
+    """Audio duration and latency (arrival to audio stages done) of each job."""
+    free_at = [0.0] * workers
+    queue: List[Tuple[float, float, float]] = []
+    latencies = []
+    idx = 0
+    while idx < len(jobs) or queue:
+        free = heapq.heappop(free_at)
+        if not queue and jobs[idx][0] > free:
+            free = jobs[idx][0]  # idle until the next arrival
+        while idx < len(jobs) and jobs[idx][0] <= free:
+            arrival, duration = jobs[idx]
+            heapq.heappush(queue, (arrival + weight * duration, arrival, duration))
+            idx += 1
+        _, arrival, duration = heapq.heappop(queue)
+        done = free + rtf * duration
+        latencies.append((duration, done - arrival))
+        heapq.heappush(free_at, done)
+    return latencies
+
+
+def percentile(values: List[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--load", type=float, default=0.8, help="target utilization")
+    parser.add_argument(
+        "--rtf", type=float, default=0.3, help="processing s per audio s"
+    )
+    parser.add_argument("--short", type=float, default=300, help="stand-up seconds")
+    parser.add_argument(
+        "--long", type=float, default=4 * 3600, help="long recording seconds"
+    )
+    parser.add_argument("--long-share", type=float, default=0.02)
+    parser.add_argument(
+        "--weight", type=float, default=0.25, help="SJF_DURATION_WEIGHT"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"{'policy':<14}{'short p50':>11}{'short p95':>11}"
+        f"{'long p50':>11}{'long max':>11}"
+    )
+    for load in sorted({0.3, 0.6, args.load}):
+        jobs = make_jobs(
+            args.jobs,
+            args.workers,
+            load,
+            args.rtf,
+            args.short,
+            args.long,
+            args.long_share,
+            args.seed,
+        )
+        for label, weight in (("fifo", 0.0), ("sjf+aging", args.weight)):
+            latencies = simulate(jobs, args.workers, weight, args.rtf)
+            short = [lat for duration, lat in latencies if duration == args.short]
+            long = [lat for duration, lat in latencies if duration == args.long]
+            print(
+                f"{label + f' @{load:.1f}':<14}"
+                f"{percentile(short, 50):>10.0f}s{percentile(short, 95):>10.0f}s"
+                f"{statistics.median(long):>10.0f}s{max(long):>10.0f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,16 @@ from app.api.health import router as health_router
 from app.core.config import settings
 from typing import AsyncGenerator
 from app.db.session import sessionmanager
+from app.services.cache import S3_CACHE
+from app.services.scheduler import SCHEDULER, release_periodically
+from app.services.summarize.render_pool import RENDER_POOL
 from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
+import asyncio
 import bcrypt
+import structlog
+
+logger = structlog.get_logger("main")
 
 # ref-issue: https://github.com/pyca/bcrypt/issues/684
 if not hasattr(bcrypt, "__about__"):
@@ -25,8 +33,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     Function that handles startup and shutdown events.
     To understand more, read https://fastapi.tiangolo.com/advanced/events/
+
+    The S3 bucket is checked here rather than at import. If S3 is not up
+    yet the API still starts, and ``/ready`` fails until it is.
     """
+    try:
+        await asyncio.wait_for(
+            run_in_threadpool(S3_CACHE.ensure_bucket),
+            timeout=settings.READINESS_TIMEOUT,
+        )
+    except Exception as e:
+        logger.warning("s3_unavailable_at_startup", error=repr(e))
+    # Dispatches the jobs queued behind workers that died with a slot
+    releases = asyncio.create_task(
+        release_periodically(SCHEDULER, settings.SCHEDULER_RELEASE_INTERVAL)
+    )
     yield
+    releases.cancel()
+    RENDER_POOL.shutdown()
     if sessionmanager._engine is not None:
         # Close the DB connection
         await sessionmanager.close()
@@ -39,6 +63,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_PREFIX}/openapi.json",
     docs_url=f"{settings.API_PREFIX}/docs",
     redoc_url=f"{settings.API_PREFIX}/redoc",
+    lifespan=lifespan,
 )
 
 # Set up CORS
@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterator
 
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
@@ -11,6 +11,7 @@ from app.db.session import AsyncSession, DatabaseSessionManager, get_db
 
 # DONT REMOVE
 from app.models.user import APIToken, User
+from app.services.celery_worker import c_worker
 from main import app
 
 import pytest
@@ -48,6 +49,16 @@ async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
 app.dependency_overrides[get_db] = override_get_db
 
 
+@pytest.fixture
+def memory_backend(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    # Freezing a chord reaches the result backend, keep it in memory
+    monkeypatch.setitem(c_worker.conf, "result_backend", "cache+memory://")
+    # The backend is created once per thread, from the configuration
+    monkeypatch.delattr(c_worker._local, "backend", raising=False)
+    yield
+    vars(c_worker._local).pop("backend", None)
+
+
 @pytest_asyncio.fixture
 async def async_client() -> AsyncGenerator[AsyncClient, None]:
     transport = ASGITransport(app=app)
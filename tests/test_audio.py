@@ -0,0 +1,86 @@
+import io
+import shutil
+import subprocess
+
+import librosa
+import numpy as np
+import pytest
+import soundfile
+
+from app.services.audio import RESAMPLE_QUALITIES, decode_audio
+
+
+def tone(seconds: float, sr: int, channels: int = 1) -> np.ndarray:
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    wave = 0.5 * np.sin(2 * np.pi * 440 * t).astype(np.float32)
+    return np.stack([wave] * channels, axis=1) if channels > 1 else wave
+
+
+def encode(
+    samples: np.ndarray, sr: int, fmt: str = "WAV", subtype: str = "FLOAT"
+) -> bytes:
+    buffer = io.BytesIO()
+    soundfile.write(buffer, samples, sr, format=fmt, subtype=subtype)
+    return buffer.getvalue()
+
+
+def test_audio_at_the_target_rate_is_not_resampled() -> None:
+    samples = tone(2.0, 16000)
+
+    waveform = decode_audio(encode(samples, 16000), 16000)
+
+    assert waveform.dtype == np.float32
+    np.testing.assert_array_equal(waveform, samples)
+
+
+@pytest.mark.parametrize("quality", RESAMPLE_QUALITIES)
+def test_resampled_audio_matches_librosa(quality: str) -> None:
+    audio = encode(tone(3.0, 44100, channels=2), 44100, "FLAC", "PCM_16")
+
+    waveform = decode_audio(audio, 16000, quality)
+
+    expected, _ = librosa.load(io.BytesIO(audio), sr=16000, mono=True)
+    assert waveform.dtype == np.float32
+    assert len(waveform) == len(expected)
+    # Filter transients at the edges differ between qualities
+    middle = slice(1600, -1600)
+    assert np.abs(waveform[middle] - expected[middle]).max() < 0.01
+
+
+def test_unknown_quality_is_refused() -> None:
+    with pytest.raises(ValueError):
+        decode_audio(encode(tone(0.5, 16000), 16000), 16000, "best")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_formats_libsndfile_cannot_read_are_decoded_by_ffmpeg(tmp_path) -> None:
+    wav, m4a = tmp_path / "tone.wav", tmp_path / "tone.m4a"
+    wav.write_bytes(encode(tone(2.0, 48000), 48000, subtype="PCM_16"))
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", str(wav), "-c:a", "aac", str(m4a)],
+        check=True,
+    )
+
+    waveform = decode_audio(m4a.read_bytes(), 16000)
+
+    # AAC pads the stream with a frame of priming samples
+    assert abs(len(waveform) - 32000) < 2048
+    assert np.abs(waveform).max() == pytest.approx(0.5, abs=0.05)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_ffmpeg_resamples_at_the_requested_quality(tmp_path) -> None:
+    wav, m4a = tmp_path / "tone.wav", tmp_path / "tone.m4a"
+    wav.write_bytes(encode(tone(2.0, 44100), 44100, subtype="PCM_16"))
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", str(wav), "-c:a", "aac", str(m4a)],
+        check=True,
+    )
+
+    quick = decode_audio(m4a.read_bytes(), 16000, "QQ")
+    accurate = decode_audio(m4a.read_bytes(), 16000, "VHQ")
+
+    assert len(quick) == len(accurate)
+    assert not np.array_equal(quick, accurate)
+    middle = slice(1600, -1600)
+    assert np.abs(quick[middle] - accurate[middle]).max() < 0.01
@@ -0,0 +1,52 @@
+import time
+
+from pyannote.core import Annotation, Segment
+
+from app.services.conversation.tasks import (
+    add_speaker_info_to_text,
+    get_word_with_timestamp,
+    map_chunks,
+)
+from benchmarks.scaling import exponent, make_meeting
+
+
+def test_speakers_match_cropped_annotation() -> None:
+    segments, annotation = make_meeting(2000, speakers=5, seed=3)
+    texts = get_word_with_timestamp(segments)
+
+    speakers = [spk for _, spk, _ in add_speaker_info_to_text(texts, annotation)]
+
+    expected, last = [], None
+    for seg, _ in texts:
+        last = annotation.crop(seg).argmax() or last
+        expected.append(last)
+    assert speakers == expected
+
+
+def test_speaker_ties_gaps_and_out_of_order_texts() -> None:
+    annotation = Annotation()
+    annotation[Segment(0.0, 2.0)] = "SPEAKER_01"
+    annotation[Segment(1.0, 3.0)] = "SPEAKER_00"
+    texts = [
+        (Segment(1.0, 2.0), "tie"),
+        (Segment(4.0, 5.0), "silence"),
+        (Segment(0.0, 0.5), "earlier"),
+    ]
+
+    speakers = [spk for _, spk, _ in add_speaker_info_to_text(texts, annotation)]
+
+    assert speakers == ["SPEAKER_00", "SPEAKER_00", "SPEAKER_01"]
+
+
+def test_map_chunks_scales_linearly() -> None:
+    sizes, seconds = [2000, 16000], []
+    for n_words in sizes:
+        segments, annotation = make_meeting(n_words, speakers=10)
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            map_chunks(segments, annotation, use_word_timestamps=True)
+            best = min(best, time.perf_counter() - started)
+        seconds.append(best)
+
+    assert exponent(sizes, seconds) < 1.5
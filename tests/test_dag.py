@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+from celery.canvas import _chain, chord
+
+from app.services.dag import PipelineDAG, Stage
+
+DAG = PipelineDAG(
+    [
+        Stage("decode", "tasks.decode", params=("bytes_key",)),
+        Stage("transcribe", "tasks.transcribe", inputs=("decode",), queue="gpu"),
+        Stage("diarize", "tasks.diarize", inputs=("decode",)),
+        Stage("conversation", "tasks.conversation", inputs=("transcribe", "diarize")),
+        Stage("summarize", "tasks.summarize", inputs=("conversation",)),
+    ]
+)
+
+
+def test_independent_stages_run_in_parallel_after_their_shared_input() -> None:
+    canvas = DAG.compile("summarize", {"bytes_key": "audio"})
+
+    assert isinstance(canvas, _chain)
+    decode, audio = canvas.tasks
+    assert decode.kwargs == {"bytes_key": "audio"}
+    assert isinstance(audio, chord)
+    assert [sig.task for sig in audio.tasks] == ["tasks.transcribe", "tasks.diarize"]
+    assert audio.tasks[0].options["queue"] == "gpu"
+    assert [sig.task for sig in audio.body.tasks] == [
+        "tasks.conversation",
+        "tasks.summarize",
+    ]
+
+
+def test_cached_stages_are_skipped() -> None:
+    completed = {"decode": "payload:a", "transcribe": "payload:t"}
+
+    canvas = DAG.compile("summarize", {}, completed)
+
+    # Both inputs of the conversation must be in the chord header
+    header = canvas.tasks
+    assert [sig.task for sig in header] == ["tasks.transcribe", "tasks.diarize"]
+    assert header[1].args == ("payload:a",)
+
+    completed.update(diarize="payload:d")
+    canvas = DAG.compile("summarize", {}, completed)
+    assert canvas.tasks[0].task == "tasks.conversation"
+    assert canvas.tasks[0].args == (["payload:t", "payload:d"],)
+
+    with pytest.raises(ValueError):
+        DAG.compile("summarize", {}, {**completed, "summarize": "payload:s"})
+
+
+def test_graph_that_is_not_series_parallel_is_rejected() -> None:
+    dag = PipelineDAG(
+        [
+            Stage("a", "tasks.a"),
+            Stage("b", "tasks.b", inputs=("a",)),
+            Stage("c", "tasks.c", inputs=("a", "b")),
+        ]
+    )
+
+    with pytest.raises(ValueError):
+        dag.compile("c", {})
+
+
+def test_critical_path_follows_the_input_finished_last() -> None:
+    start = datetime(2026, 1, 1)
+    timings = {
+        name: (start, start + timedelta(seconds=seconds))
+        for name, seconds in [
+            ("decode", 5),
+            ("transcribe", 300),
+            ("diarize", 120),
+            ("conversation", 310),
+            ("summarize", 400),
+            ("summarize_window", 500),
+        ]
+    }
+
+    assert DAG.critical_path(timings) == [
+        "decode",
+        "transcribe",
+        "conversation",
+        "summarize",
+    ]
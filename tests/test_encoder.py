@@ -0,0 +1,72 @@
+from app.schemas.langchain import ExtractedItem, Turn
+from app.services.summarize.encoder import TranscriptEncoder, count_tokens
+
+
+def make_turns(n: int) -> list[Turn]:
+    return [
+        Turn(
+            start=i * 4.0,
+            end=i * 4.0 + 3.5,
+            speaker=f"SPEAKER_{i % 3:02d}",
+            text="ok" if i % 4 == 0 else "we should ship the release after QA",
+        )
+        for i in range(n)
+    ]
+
+
+def test_encoder_uses_aliases_and_coarse_timestamps() -> None:
+    encoded = TranscriptEncoder(time_resolution=5).encode(make_turns(6))
+
+    assert encoded.aliases == {
+        "[S1]": "SPEAKER_00",
+        "[S2]": "SPEAKER_01",
+        "[S3]": "SPEAKER_02",
+    }
+    assert "SPEAKER_" not in "".join(encoded.chunks)
+    assert encoded.chunks[0].startswith("[0] [S1]: ok")
+
+
+def test_encoder_merges_short_turns() -> None:
+    encoded = TranscriptEncoder(merge_max_tokens=5).encode(make_turns(8))
+
+    assert len(encoded.lines) < 8
+    assert " | [S2]: ok" in "\n".join(encoded.chunks)
+
+
+def test_encoder_respects_token_budget() -> None:
+    budget = 60
+    encoded = TranscriptEncoder(token_budget=budget).encode(make_turns(100))
+
+    assert len(encoded.chunks) > 1
+    assert all(count_tokens(chunk) <= budget for chunk in encoded.chunks)
+
+
+def test_decode_maps_aliases_back() -> None:
+    encoded = TranscriptEncoder().encode(make_turns(10))
+    items = encoded.decode_items([ExtractedItem(text="[S2] will ship, [S9] unknown")])
+
+    assert items[0].text == "SPEAKER_01 will ship, [S9] unknown"
+
+
+def test_decode_leaves_words_that_look_like_aliases() -> None:
+    encoded = TranscriptEncoder().encode(make_turns(10))
+    text = "[S3] said: We will migrate backups to S3"
+
+    assert encoded.decode_text(text) == "SPEAKER_02 said: We will migrate backups to S3"
+    assert encoded.encode_text("SPEAKER_02 uses S3") == "[S3] uses S3"
+
+
+def test_encoder_splits_a_turn_longer_than_the_budget() -> None:
+    budget = 60
+    sentence = "We reviewed the migration plan and the rollback procedure. "
+    monologue = sentence * 30 + "x" * 2000
+    turn = Turn(start=0.0, end=300.0, speaker="SPEAKER_00", text=monologue)
+
+    encoded = TranscriptEncoder(token_budget=budget).encode([turn])
+
+    assert len(encoded.lines) > 1
+    assert all(count_tokens(chunk) <= budget for chunk in encoded.chunks)
+    assert all(line.text.startswith(f"[{line.label}] ") for line in encoded.lines)
+    # Whole sentences are kept together while they fit
+    assert encoded.lines[0].text.endswith("procedure.")
+    assert encoded.lines[-1].end == 300.0
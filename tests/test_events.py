@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, List, Optional
+
+import fakeredis
+import pytest
+
+from app.services import events
+from app.services.events import JobEventStream, iter_job_events
+
+
+@pytest.fixture
+def stream(monkeypatch: pytest.MonkeyPatch) -> JobEventStream:
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        events.aioredis, "Redis", lambda **_: fakeredis.FakeAsyncRedis(server=server)
+    )
+    return JobEventStream(fakeredis.FakeRedis(server=server))
+
+
+def follow(job_status: Any) -> List[Any]:
+    async def collect() -> List[Any]:
+        relayed = iter_job_events("job", block_ms=10, job_status=job_status)
+        return [(event, data) async for _, event, data in relayed]
+
+    return asyncio.run(asyncio.wait_for(collect(), timeout=5))
+
+
+def test_stream_of_a_failed_job_ends(stream: JobEventStream) -> None:
+    stream.publish("job", "summary_partial", text="We agreed")
+
+    async def failed() -> str:
+        return "failed"
+
+    assert follow(failed) == [
+        ("summary_partial", {"text": "We agreed"}),
+        ("error", {"status": "failed"}),
+    ]
+
+
+def test_stream_ends_when_the_job_fails_while_followed(
+    stream: JobEventStream,
+) -> None:
+    statuses = ["running", "running", "failed"]
+
+    async def job_status() -> Optional[str]:
+        return statuses.pop(0)
+
+    assert follow(job_status) == [(None, {}), ("error", {"status": "failed"})]
+
+
+def test_published_terminal_event_ends_the_stream(stream: JobEventStream) -> None:
+    stream.publish("job", "error", stage="diarize", error="RuntimeError: oom")
+
+    async def job_status() -> str:
+        return "running"
+
+    assert follow(job_status) == [
+        ("error", {"stage": "diarize", "error": "RuntimeError: oom"})
+    ]
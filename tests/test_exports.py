@@ -0,0 +1,35 @@
+import json
+
+import fakeredis
+
+from app.services.cache import RedisCache
+from app.services.summarize.exports import ReportExporter, render_markdown
+from tests.test_report import make_result
+
+
+def make_exporter() -> ReportExporter:
+    cache = RedisCache.__new__(RedisCache)
+    cache.cache = fakeredis.FakeRedis()
+    return ReportExporter(cache, pdf_renderer=lambda result: b"%PDF-1.4")
+
+
+def test_markdown_has_every_section() -> None:
+    page = render_markdown(make_result(2)).decode()
+
+    assert page.startswith("# Conversation Summary Report")
+    assert "- Release plan [0.00-10.00]" in page
+    assert "_No decisions recorded_" in page
+    assert "- **[2.00-3.50] SPEAKER_01:** turn 1" in page
+
+
+def test_exports_are_cached_per_result() -> None:
+    exporter = make_exporter()
+    result = make_result(3)
+
+    assert exporter.cached("job", "json", "payload:1") is None
+    entry = exporter.render("job", "json", "payload:1", result)
+
+    assert json.loads(entry["body"])["turns"][0]["speaker"] == "SPEAKER_00"
+    assert exporter.cached("job", "json", "payload:1")["etag"] == entry["etag"]
+    # A new result for the same job (e.g. a retry) invalidates the export
+    assert exporter.cached("job", "json", "payload:2") is None
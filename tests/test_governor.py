@@ -0,0 +1,71 @@
+import contextlib
+import threading
+import time
+from typing import List
+
+import fakeredis
+import pytest
+
+from app.services.summarize.governor import LLMGovernor
+
+
+def make_governor(server: fakeredis.FakeServer, **kwargs) -> LLMGovernor:
+    # The acquire script runs in fakeredis' Lua interpreter
+    kwargs = {"limit": 1, "lease": 30, "timeout": 5, **kwargs}
+    return LLMGovernor(fakeredis.FakeRedis(server=server), poll_interval=0.01, **kwargs)
+
+
+def test_slots_are_limited() -> None:
+    governor = make_governor(fakeredis.FakeServer(), limit=2, timeout=0.2)
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(governor.slot())
+        stack.enter_context(governor.slot())
+        assert governor.in_flight() == 2
+
+        with pytest.raises(TimeoutError):
+            with governor.slot():
+                pass
+        assert governor.queue_depth() == 0
+
+    with governor.slot():
+        assert governor.in_flight() == 1
+
+
+@pytest.mark.parametrize(
+    "order, served", [("fifo", ["late", "urgent"]), ("priority", ["urgent", "late"])]
+)
+def test_waiting_calls_are_served_in_order(order: str, served: List[str]) -> None:
+    server = fakeredis.FakeServer()
+    governor = make_governor(server, order=order)
+    acquired: List[str] = []
+
+    def wait(name: str, priority: int) -> None:
+        with make_governor(server, order=order).slot(priority):
+            acquired.append(name)
+
+    with governor.slot():
+        waiters = []
+        for name, priority in (("late", 5), ("urgent", 0)):
+            waiter = threading.Thread(target=wait, args=(name, priority))
+            waiter.start()
+            waiters.append(waiter)
+            while governor.queue_depth() < len(waiters):
+                time.sleep(0.01)
+    for waiter in waiters:
+        waiter.join(timeout=5)
+
+    assert acquired == served
+
+
+def test_slot_of_a_dead_holder_expires_with_its_lease() -> None:
+    server = fakeredis.FakeServer()
+    # A worker killed while generating never leaves its slot
+    dead = make_governor(server, lease=1).slot()
+    dead.__enter__()
+
+    started = time.monotonic()
+    with make_governor(server).slot():
+        waited = time.monotonic() - started
+
+    assert 0.5 < waited < 3
@@ -0,0 +1,38 @@
+from app.schemas.langchain import ExtractedItem, Turn
+from app.services.summarize.grounding import TranscriptGrounder
+
+TURNS = [
+    Turn(start=0.0, end=5.0, speaker="A", text="Welcome everyone to the weekly sync."),
+    Turn(start=5.0, end=12.0, speaker="B", text="The mobile release is blocked by QA."),
+    Turn(
+        start=12.0, end=20.0, speaker="A", text="Then we postpone the mobile release."
+    ),
+    Turn(
+        start=20.0,
+        end=30.0,
+        speaker="C",
+        text="I will update the hiring plan by Friday.",
+    ),
+    Turn(start=30.0, end=35.0, speaker="B", text="Sounds good, thanks all."),
+]
+
+
+def test_items_are_grounded_on_best_matching_turns() -> None:
+    grounder = TranscriptGrounder(TURNS)
+    items = grounder.ground(
+        [
+            ExtractedItem(text="Postpone the mobile release"),
+            ExtractedItem(text="Update the hiring plan by Friday"),
+        ]
+    )
+
+    assert (items[0].start, items[0].end) == (12.0, 20.0)
+    assert (items[1].start, items[1].end) == (20.0, 30.0)
+    assert items[0].text == "Postpone the mobile release"
+
+
+def test_unmatched_item_spans_whole_conversation() -> None:
+    grounder = TranscriptGrounder(TURNS)
+
+    assert grounder.locate("budget review") == (0.0, 35.0)
+    assert TranscriptGrounder([]).locate("anything") == (0.0, 0.0)
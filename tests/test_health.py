@@ -1,9 +1,36 @@
 import pytest
 from httpx import AsyncClient
 
+from app.api import health
+
 
 @pytest.mark.asyncio
 async def test_read_main(async_client: AsyncClient) -> None:
     response = await async_client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
+
+
+@pytest.mark.asyncio
+async def test_not_ready_until_s3_is_up(
+    async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def unreachable() -> None:
+        raise ConnectionError("S3 is starting")
+
+    monkeypatch.setattr(health.REDIS_CACHE.cache, "ping", lambda: True)
+    monkeypatch.setattr(health.S3_CACHE, "ensure_bucket", unreachable)
+    response = await async_client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"] == {
+        "database": "ok",
+        "redis": "ok",
+        "s3": "ConnectionError: S3 is starting",
+    }
+    # Liveness does not depend on S3
+    assert (await async_client.get("/health")).status_code == 200
+
+    monkeypatch.setattr(health.S3_CACHE, "ensure_bucket", lambda: None)
+    response = await async_client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
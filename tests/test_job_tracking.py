@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.base import Base
+from app.models.job import Job, JobStage
+from app.models.user import User  # noqa: F401
+from app.services import job_tracking
+from app.services.events import JobEventStream, events_key
+from app.services.pipeline import JobCancelled
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}", poolclass=NullPool
+    )
+
+    async def setup() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine)() as session:
+            session.add(Job(id="job-1", user_id=None, audio_duration=60.0))
+            await session.commit()
+
+    asyncio.run(setup())
+    monkeypatch.setattr(job_tracking, "_engine", engine)
+    return engine
+
+
+@pytest.fixture
+def job_events(monkeypatch) -> JobEventStream:
+    stream = JobEventStream(fakeredis.FakeRedis())
+    monkeypatch.setattr(job_tracking, "JOB_EVENTS", stream)
+    return stream
+
+
+def published(stream: JobEventStream) -> list:
+    entries = stream.client.xrange(events_key("job-1"))
+    return [fields[b"event"].decode() for _, fields in entries]
+
+
+def make_task(name: str, last: bool) -> SimpleNamespace:
+    request = SimpleNamespace(
+        hostname="worker@host",
+        chain=None if last else [{"task": "next"}],
+        callbacks=None,
+        chord=None,
+    )
+    return SimpleNamespace(name=f"app.services.x.tasks.{name}", request=request)
+
+
+def load(engine):
+    async def query():
+        async with async_sessionmaker(engine)() as session:
+            job = await session.get(Job, "job-1")
+            stages = (await session.scalars(select(JobStage))).all()
+            return job, stages
+
+    return asyncio.run(query())
+
+
+def test_stages_and_job_status_are_persisted(engine) -> None:
+    kwargs = {"job_id": "job-1"}
+    transcribe = make_task("transcribe", last=False)
+    job_tracking.on_task_prerun("t1", transcribe, kwargs=kwargs)
+
+    job, stages = load(engine)
+    assert job.status == "running"
+    assert stages[0].status == "started"
+    assert stages[0].audio_duration == 60.0
+
+    job_tracking.on_task_postrun("t1", transcribe, kwargs=kwargs, state="SUCCESS")
+    summarize = make_task("summarize_text", last=True)
+    job_tracking.on_task_prerun("t2", summarize, kwargs=kwargs)
+    job_tracking.on_task_postrun("t2", summarize, kwargs=kwargs, state="SUCCESS")
+
+    job, stages = load(engine)
+    assert job.status == "done"
+    assert [(s.stage, s.status) for s in stages] == [
+        ("transcribe", "success"),
+        ("summarize_text", "success"),
+    ]
+    assert all(s.duration is not None and s.worker == "worker@host" for s in stages)
+
+
+def test_failure_and_retries_reuse_the_stage_row(engine, job_events) -> None:
+    kwargs = {"job_id": "job-1"}
+    task = make_task("summarize_text", last=True)
+    job_tracking.on_task_prerun("t1", task, kwargs=kwargs)
+    job_tracking.on_task_postrun("t1", task, kwargs=kwargs, state="RETRY")
+    assert published(job_events) == []
+    job_tracking.on_task_prerun("t1", task, kwargs=kwargs)
+    job_tracking.on_task_failure("t1", TimeoutError("ollama"), task, kwargs=kwargs)
+    assert published(job_events) == ["error"]
+    job_tracking.on_task_postrun("t1", task, kwargs=kwargs, state="FAILURE")
+
+    job, stages = load(engine)
+    assert job.status == "failed"
+    assert len(stages) == 1
+    assert stages[0].attempts == 2
+    assert stages[0].status == "failure"
+    assert stages[0].error == "TimeoutError: ollama"
+
+
+def test_cancelled_stage_cancels_the_job(engine, job_events) -> None:
+    kwargs = {"job_id": "job-1"}
+    task = make_task("transcribe", last=False)
+    job_tracking.on_task_prerun("t1", task, kwargs=kwargs)
+    cancelled = JobCancelled("Job job-1 was cancelled")
+    job_tracking.on_task_failure("t1", cancelled, task, kwargs=kwargs)
+    job_tracking.on_task_postrun(
+        "t1", task, kwargs=kwargs, retval=cancelled, state="FAILURE"
+    )
+
+    job, stages = load(engine)
+    assert job.status == "cancelled"
+    assert stages[0].status == "cancelled"
+    assert stages[0].error is None
+    # The cancel endpoint publishes its own terminal event
+    assert published(job_events) == []
@@ -0,0 +1,74 @@
+from typing import Any, List
+
+import fakeredis
+import pytest
+
+from app.schemas.langchain import SummarizationResponseFormatter
+from app.services.cache import RedisCache
+from app.services.summarize import llm_cache
+from app.services.summarize.llm_cache import LLMResponseCache
+
+SCHEMA = SummarizationResponseFormatter
+MESSAGES = [("system", "Summarize."), ("human", "[0] [S1]: ship it")]
+
+
+class CountingModel:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def invoke(self, messages: List[Any]) -> SummarizationResponseFormatter:
+        self.calls += 1
+        return SCHEMA(summary=f"call {self.calls}", topics=[], decisions=[], actions=[])
+
+
+@pytest.fixture
+def cache() -> RedisCache:
+    cache = RedisCache.__new__(RedisCache)
+    cache.cache = fakeredis.FakeRedis()
+    return cache
+
+
+def test_repeated_call_is_served_from_the_cache(cache: RedisCache) -> None:
+    model = CountingModel()
+    responses = LLMResponseCache(cache, "qwen3:8b", enabled=True)
+
+    first = responses.invoke(model, MESSAGES, SCHEMA)
+    # Whitespace differences do not change the prompt
+    second = responses.invoke(
+        model, [("system", "Summarize. "), ("human", "[0]  [S1]: ship it")], SCHEMA
+    )
+
+    assert model.calls == 1
+    assert second == first
+    assert cache.cache.ttl(responses.make_key(MESSAGES, SCHEMA)) > 0
+
+
+def test_other_messages_models_or_prompts_miss(
+    cache: RedisCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    model = CountingModel()
+    responses = LLMResponseCache(cache, "qwen3:8b", enabled=True)
+    responses.invoke(model, MESSAGES, SCHEMA)
+    key = responses.make_key(MESSAGES, SCHEMA)
+
+    other_messages = [("system", "Summarize."), ("human", "[0] [S1]: wait")]
+    assert responses.invoke(model, other_messages, SCHEMA).summary == "call 2"
+
+    larger = LLMResponseCache(cache, "qwen3:32b", enabled=True)
+    assert larger.make_key(MESSAGES, SCHEMA) != key
+    assert larger.invoke(model, MESSAGES, SCHEMA).summary == "call 3"
+
+    monkeypatch.setattr(llm_cache, "SUMMARIZATION_PROMPT", "Summarize tersely.")
+    assert responses.make_key(MESSAGES, SCHEMA) != key
+    assert responses.invoke(model, MESSAGES, SCHEMA).summary == "call 4"
+
+
+def test_disabled_cache_always_calls_the_model(cache: RedisCache) -> None:
+    model = CountingModel()
+    responses = LLMResponseCache(cache, "qwen3:8b", enabled=False)
+
+    responses.invoke(model, MESSAGES, SCHEMA)
+    responses.invoke(model, MESSAGES, SCHEMA)
+
+    assert model.calls == 2
+    assert cache.cache.keys() == []
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from prometheus_client import REGISTRY
+
+from app.services.metrics import record_cache
+import pytest
+
+from app.services.summarize.governor import output_rate, split_response
+
+
+def _cache_count(cache: str, result: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "cache_requests_total", {"cache": cache, "result": result}
+    )
+    return value or 0.0
+
+
+def test_record_cache_counts_hits_and_misses() -> None:
+    hits, misses = _cache_count("test", "hit"), _cache_count("test", "miss")
+
+    record_cache("test", True)
+    record_cache("test", True)
+    record_cache("test", False)
+
+    assert _cache_count("test", "hit") == hits + 2
+    assert _cache_count("test", "miss") == misses + 1
+
+
+def test_output_tokens_are_the_ones_reported_by_ollama() -> None:
+    message = SimpleNamespace(
+        content='{"summary": "ship it"}',
+        usage_metadata={"input_tokens": 900, "output_tokens": 40},
+        response_metadata={"eval_count": 40, "eval_duration": 2_000_000_000},
+    )
+    structured = {"raw": message, "parsed": "parsed", "parsing_error": None}
+
+    assert split_response(structured) == ("parsed", message)
+    # Timed by Ollama's own eval duration rather than the whole call
+    assert output_rate(message, generation=8.0) == (40, 20.0)
+    message.response_metadata = {}
+    assert output_rate(message, generation=8.0) == (40, 5.0)
+    # Models that report no usage are not guessed at
+    plain = SimpleNamespace(content="hello")
+    assert split_response(plain) == (plain, plain)
+    assert output_rate(plain, generation=1.0) == (None, 0.0)
+
+
+def test_structured_parsing_errors_are_raised() -> None:
+    error = ValueError("invalid structured output")
+    with pytest.raises(ValueError):
+        split_response({"raw": None, "parsed": None, "parsing_error": error})
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from app.core.config import settings
+from app.services.summarize.pdf import (
+    ReportLabPDFRenderer,
+    report_fonts,
+    select_pdf_backend,
+    wrap,
+)
+from tests.test_report import make_result
+
+
+def test_auto_backend_switches_on_turn_count() -> None:
+    threshold = settings.PDF_NATIVE_MIN_TURNS
+
+    assert select_pdf_backend(threshold - 1, "auto") == "weasyprint"
+    assert select_pdf_backend(threshold, "auto") == "reportlab"
+    assert select_pdf_backend(10**6, "weasyprint") == "weasyprint"
+    with pytest.raises(ValueError):
+        select_pdf_backend(10, "latex")
+
+
+def test_wrap_keeps_lines_within_width() -> None:
+    fragments = [("[0.00-1.50] - ", "Helvetica-Bold", None)]
+    fragments.append((" : " + "release " * 60, "Helvetica", None))
+
+    lines = wrap(fragments, 9, 200)
+
+    assert len(lines) > 1
+    assert "".join(t for line in lines for t, _, _ in line).split() == (
+        "".join(t for t, _, _ in fragments).split()
+    )
+
+
+def test_reportlab_renders_long_transcript_on_many_pages() -> None:
+    pdf = ReportLabPDFRenderer().render(make_result(2000))
+
+    assert pdf.startswith(b"%PDF")
+    assert pdf.count(b"/Type /Page\n") > 10
+
+
+def test_words_longer_than_a_line_are_broken() -> None:
+    url = "https://storage.example.com/" + "a1b2c3d4" * 60
+    fragments = [("See ", "Helvetica", None), (url + " for details", "Helvetica", None)]
+
+    lines = wrap(fragments, 9, 200)
+
+    assert len(lines) > 5
+    for line in lines:
+        width = sum(stringWidth(text.rstrip(), font, 9) for text, font, _ in line)
+        assert width <= 200
+    text = "".join(t for line in lines for t, _, _ in line)
+    assert text.replace(" ", "") == "See" + url + "fordetails"
+
+
+def test_reportlab_embeds_a_unicode_font() -> None:
+    # Fails rather than falling back to Helvetica where the fonts are missing
+    for path in (settings.PDF_FONT_PATH, settings.PDF_BOLD_FONT_PATH):
+        assert os.path.exists(path), f"report font {path} is not installed"
+
+    result = make_result(3)
+    result["summary"] = "Обсудили релиз, Ærøskøbing — Δ ≈ 3 ✓"
+
+    pdf = ReportLabPDFRenderer().render(result)
+
+    assert report_fonts() == ("ReportSans", "ReportSans-Bold")
+    # Subsets of the TrueType fonts are embedded, standard fonts never are
+    assert pdf.count(b"/FontFile2") >= 2
@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import fakeredis
+import pytest
+from celery.canvas import _chain, chord
+
+from app.services import pipeline
+from app.services.cache import RedisCache
+from app.services.celery_worker import c_worker
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> RedisCache:
+    cache = RedisCache.__new__(RedisCache)
+    cache.cache = fakeredis.FakeRedis()
+    monkeypatch.setattr(pipeline, "REDIS_CACHE", cache)
+    return cache
+
+
+def test_checkpointed_stage_runs_once_per_job(cache: RedisCache) -> None:
+    calls = []
+
+    @pipeline.checkpointed
+    def transcribe(bytes_key: str, job_id: str = None) -> str:
+        calls.append(bytes_key)
+        return cache.save(["segment"])
+
+    key = transcribe("audio", job_id="job")
+
+    assert transcribe("audio", job_id="job") == key
+    assert pipeline.stage_outputs("job") == {"transcribe": key}
+    assert len(calls) == 1
+    # Without a job there is nothing to checkpoint against
+    transcribe("audio")
+    assert len(calls) == 2
+
+
+def test_expired_output_is_not_reused(cache: RedisCache) -> None:
+    pipeline.record_stage("job", "diarize", "payload:gone")
+
+    assert pipeline.stage_output("job", "diarize") is None
+
+
+def test_pipeline_starts_with_audio_stages() -> None:
+    canvas = pipeline.build_pipeline("job", "audio", "report", streaming=True)
+
+    assert isinstance(canvas, chord)
+    transcribe, diarize = canvas.tasks
+    assert transcribe.kwargs["window_seconds"] > 0
+    assert diarize.task == pipeline.STAGE_TASKS["diarize"]
+
+
+def test_pipeline_resumes_after_last_completed_stage() -> None:
+    audio_done = {"transcribe": "payload:t", "diarize": "payload:d"}
+
+    canvas = pipeline.build_pipeline("job", "audio", "report", completed=audio_done)
+    assert isinstance(canvas, _chain)
+    assert canvas.tasks[0].task == pipeline.STAGE_TASKS["create_conversation"]
+    assert canvas.tasks[0].args == (["payload:t", "payload:d"],)
+
+    completed = {**audio_done, "create_conversation": "payload:c"}
+    canvas = pipeline.build_pipeline("job", "audio", "report", completed=completed)
+    assert [sig.task for sig in canvas.tasks] == [
+        pipeline.STAGE_TASKS["summarize_text"]
+    ]
+    assert canvas.tasks[0].args == ("payload:c",)
+
+
+def test_finished_pipeline_has_nothing_to_resume(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(pipeline.settings, "REPORT_PRERENDER", False)
+    completed = {stage: f"payload:{stage}" for stage in pipeline.STAGE_TASKS}
+
+    with pytest.raises(ValueError):
+        pipeline.build_pipeline("job", "audio", "report", completed=completed)
+
+
+def test_cancelled_job_stops_before_and_after_a_stage(cache: RedisCache) -> None:
+    calls = []
+
+    @pipeline.checkpointed
+    def diarize(bytes_key: str, job_id: str = None) -> str:
+        calls.append(bytes_key)
+        # Cancelled while the stage runs
+        pipeline.cancel_job(job_id)
+        return cache.save("annotation")
+
+    with pytest.raises(pipeline.JobCancelled):
+        diarize("audio", job_id="job")
+    assert cache.cache.keys("payload:*") == []
+    assert pipeline.stage_output("job", "diarize") is None
+
+    with pytest.raises(pipeline.JobCancelled):
+        diarize("audio", job_id="job")
+    assert len(calls) == 1
+
+
+def test_purge_keeps_the_cancellation_flag(
+    cache: RedisCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    deleted_objects = []
+    monkeypatch.setattr(pipeline.S3_CACHE, "delete", deleted_objects.append)
+    output = cache.save(["segment"])
+    pipeline.record_stage("job", "transcribe", output)
+    cache.put("job:job:asr:0", ["segment"])
+    cache.put("job:other:asr:0", ["segment"])
+    cache.cache.xadd("job:job:events", {"event": "cancelled"})
+    cache.cache.rpush("job:job:profiles", "job/profiles/transcribe-1.txt")
+    pipeline.cancel_job("job")
+
+    assert pipeline.purge_job_artifacts("job", ["audio.wav"]) == 4
+
+    assert sorted(cache.cache.keys()) == [
+        b"job:job:cancelled",
+        b"job:job:events",
+        b"job:other:asr:0",
+    ]
+    assert deleted_objects == ["audio.wav", "job/profiles/transcribe-1.txt"]
+
+
+def test_every_task_of_a_frozen_canvas_is_known(memory_backend: None) -> None:
+    canvas = pipeline.build_pipeline("job", "audio", "report")
+    result = canvas.freeze()
+
+    task_ids = pipeline.canvas_task_ids(canvas)
+
+    assert len(task_ids) == len(set(task_ids)) >= 4
+    assert task_ids[-1] == result.id
+
+
+def test_canvas_built_in_a_thread_uses_the_worker_app(memory_backend: None) -> None:
+    # The API builds and sends canvases from its thread pool
+    with ThreadPoolExecutor(1) as executor:
+        result = executor.submit(
+            lambda: pipeline.build_pipeline("job", "audio", "report").freeze()
+        ).result()
+
+    assert result.app is c_worker
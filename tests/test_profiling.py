@@ -0,0 +1,92 @@
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.services import profiling
+from app.services.cache import RedisCache
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> RedisCache:
+    cache = RedisCache.__new__(RedisCache)
+    cache.cache = fakeredis.FakeRedis()
+    monkeypatch.setattr(profiling, "REDIS_CACHE", cache)
+    return cache
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_folds_the_stack_of_a_busy_function() -> None:
+    sampler = profiling.StackSampler(threading.get_ident(), interval=0.005)
+    sampler.start()
+    spin(0.2)
+    counts = sampler.stop()
+
+    folded = profiling.folded_stacks(counts)
+    hottest = folded.splitlines()[0]
+    assert "test_sampler_folds_the_stack_of_a_busy_function" in hottest
+    assert hottest.rsplit(" ", 1)[0].endswith(
+        f"spin (test_profiling.py:{spin.__code__.co_firstlineno})"
+    )
+
+
+def test_stages_are_profiled_by_job_flag_or_setting(
+    cache: RedisCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "PROFILE_STAGES", "")
+    assert not profiling.is_profiled("job", "transcribe")
+
+    monkeypatch.setattr(settings, "PROFILE_STAGES", "diarize, summarize_text")
+    assert profiling.is_profiled("job", "summarize_text")
+    assert not profiling.is_profiled("job", "transcribe")
+
+    profiling.enable_job_profiling("job")
+    assert profiling.is_profiled("job", "transcribe")
+    assert not profiling.is_profiled("other", "transcribe")
+
+
+def test_profiled_task_uploads_its_reports(
+    cache: RedisCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    saved: Dict[str, bytes] = {}
+    monkeypatch.setattr(
+        profiling.S3_CACHE, "save", lambda data, key: saved.setdefault(key, data)
+    )
+
+    async def job_prefix(job_id: str) -> str:
+        return f"user_1/{job_id}"
+
+    monkeypatch.setattr(profiling, "_job_prefix", job_prefix)
+    profiling.enable_job_profiling("job")
+    task = SimpleNamespace(name="app.services.asr.tasks.transcribe")
+    kwargs = {"job_id": "job"}
+
+    profiling.on_task_prerun("t1", task, kwargs=kwargs)
+    spin(0.1)
+    profiling.on_task_postrun("t1", kwargs=kwargs)
+
+    keys = [
+        "user_1/job/profiles/transcribe-t1.folded",
+        "user_1/job/profiles/transcribe-t1.txt",
+    ]
+    assert profiling.profile_keys("job") == keys
+    assert sorted(saved) == keys
+    assert b"spin (test_profiling.py:" in saved[keys[0]]
+    assert b"Peak traced memory" in saved[keys[1]]
+
+    monkeypatch.setattr(
+        profiling.S3_CACHE, "get_presigned_url", lambda key: f"https://s3/{key}"
+    )
+    assert profiling.profile_urls("job") == {
+        "transcribe-t1.folded": f"https://s3/{keys[0]}",
+        "transcribe-t1.txt": f"https://s3/{keys[1]}",
+    }
@@ -0,0 +1,43 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.summarize import render_pool
+from app.services.summarize.render_pool import (
+    RenderQueueFull,
+    ReportRenderPool,
+    render_deadline,
+)
+
+
+def test_render_deadline_aborts_slow_render() -> None:
+    with pytest.raises(TimeoutError):
+        with render_deadline(0.05):
+            time.sleep(1)
+
+
+def test_pool_rejects_renders_beyond_its_queue(monkeypatch) -> None:
+    release = threading.Event()
+
+    def slow_render(result, backend, timeout):
+        release.wait(5)
+        return b"%PDF"
+
+    monkeypatch.setattr(render_pool, "render_pdf", slow_render)
+    pool = ReportRenderPool(workers=1, max_queue=1, timeout=5)
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+
+    running = pool.submit({})
+    queued = pool.submit({})
+    with pytest.raises(RenderQueueFull):
+        pool.submit({})
+
+    release.set()
+    assert running.result() == queued.result() == b"%PDF"
+    # Slots are released once renders complete
+    pool.shutdown()
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+    assert pool.render({}) == b"%PDF"
+    pool.shutdown()
@@ -0,0 +1,59 @@
+import time
+import tracemalloc
+
+from app.schemas.langchain import ItemFormatter, Turn
+from app.services.summarize.report import HTMLReportRenderer
+
+
+def make_result(n_turns: int) -> dict:
+    turns = [
+        Turn(
+            start=i * 2.0,
+            end=i * 2.0 + 1.5,
+            speaker=f"SPEAKER_{i % 4:02d}",
+            text=f"turn {i}: we should ship the release after QA",
+        )
+        for i in range(n_turns)
+    ]
+    return {
+        "status": "success",
+        "summary": "SPEAKER_00 proposed the release plan.",
+        "topics": [ItemFormatter(text="Release plan", start=0.0, end=10.0)],
+        "decisions": [],
+        "actions": [],
+        "turns": turns,
+    }
+
+
+def test_render_escapes_model_and_transcript_text() -> None:
+    result = make_result(1)
+    result["summary"] = "SPEAKER_00 wrote <script>alert(1)</script>"
+    result["turns"][0].text = "a < b & c"
+
+    page = HTMLReportRenderer().render(result, timestamp="2024-01-01 00:00:00")
+
+    assert "<script>" not in page
+    assert "&lt;script&gt;" in page
+    assert "a &lt; b &amp; c" in page
+    assert '<span class="speaker spk-0">SPEAKER_00</span> wrote' in page
+    assert "<p>No decisions recorded</p>" in page
+
+
+def test_render_50k_turns_in_bounded_time_and_memory() -> None:
+    result = make_result(50_000)
+    renderer = HTMLReportRenderer()
+
+    started = time.perf_counter()
+    page = renderer.render(result)
+    elapsed = time.perf_counter() - started
+
+    # Traced separately, tracemalloc slows allocations down
+    tracemalloc.start()
+    renderer.render(result)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert page.count("<li>[") == 50_000
+    assert elapsed < 5.0
+    # Fragments plus the joined page, i.e. linear in the output size
+    assert peak < 4 * len(page.encode("utf-8")) + 16 * 1024 * 1024
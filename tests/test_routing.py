@@ -0,0 +1,23 @@
+from app.services.summarize.routing import ModelRouter, ModelTier
+
+TIERS = [
+    ModelTier(model="small", max_tokens=1000, max_speakers=3),
+    ModelTier(model="medium", max_tokens=5000),
+    ModelTier(model="large"),
+]
+
+
+def test_router_picks_smallest_fitting_tier() -> None:
+    router = ModelRouter(TIERS, pressure_threshold=4, pressure_factor=2.0)
+
+    assert router.select(tokens=800, speakers=2) == "small"
+    assert router.select(tokens=800, speakers=5) == "medium"
+    assert router.select(tokens=4000, speakers=2) == "medium"
+    assert router.select(tokens=20000, speakers=2) == "large"
+
+
+def test_router_relaxes_limits_under_queue_pressure() -> None:
+    router = ModelRouter(TIERS, pressure_threshold=4, pressure_factor=2.0)
+
+    assert router.select(tokens=1500, speakers=2, queue_depth=1) == "medium"
+    assert router.select(tokens=1500, speakers=2, queue_depth=4) == "small"
@@ -0,0 +1,174 @@
+import asyncio
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from celery.canvas import chord
+from celery.result import AsyncResult
+
+from app.services import pipeline, scheduler
+from app.services.cache import RedisCache
+
+DISPATCHED = []
+
+
+class FakeCanvas:
+    """Stands in for a frozen Celery canvas."""
+
+    def __init__(self, job_id: str) -> None:
+        self.id = f"task-{job_id}"
+        self.job_id = job_id
+
+    def freeze(self) -> AsyncResult:
+        return AsyncResult(self.id)
+
+    def apply_async(self) -> AsyncResult:
+        DISPATCHED.append(self.job_id)
+        return AsyncResult(self.id)
+
+
+@pytest.fixture
+def jobs(monkeypatch: pytest.MonkeyPatch) -> scheduler.JobScheduler:
+    cache = RedisCache.__new__(RedisCache)
+    cache.cache = fakeredis.FakeRedis()
+    monkeypatch.setattr(pipeline, "REDIS_CACHE", cache)
+    monkeypatch.setattr(scheduler, "REDIS_CACHE", cache)
+    monkeypatch.setattr(scheduler.settings, "SJF_DURATION_WEIGHT", 0.25)
+    DISPATCHED.clear()
+    return scheduler.JobScheduler(cache.cache, limit=1)
+
+
+def submit(jobs: scheduler.JobScheduler, job_id: str, duration: float) -> None:
+    jobs.submit(job_id, FakeCanvas(job_id), duration)
+
+
+def test_short_jobs_overtake_a_long_one(jobs: scheduler.JobScheduler) -> None:
+    submit(jobs, "running", 600)
+    submit(jobs, "long", 4 * 3600)
+    submit(jobs, "standup-1", 300)
+    submit(jobs, "standup-2", 300)
+    assert DISPATCHED == ["running"]
+    assert jobs.queue_depth() == 3
+
+    for job_id in ["running", "standup-1", "standup-2"]:
+        jobs.finish(job_id)
+
+    assert DISPATCHED == ["running", "standup-1", "standup-2", "long"]
+
+
+def test_long_job_ages_ahead_of_later_short_jobs(
+    jobs: scheduler.JobScheduler, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(scheduler, "time", SimpleNamespace(time=lambda: clock.now))
+    submit(jobs, "running", 600)
+    # Yields at most 0.25 * 4h = 1h to shorter jobs
+    submit(jobs, "long", 4 * 3600)
+    clock.now = 4000.0
+    submit(jobs, "standup", 300)
+
+    jobs.finish("running")
+
+    assert DISPATCHED == ["running", "long"]
+
+
+def test_cancelled_job_is_never_dispatched(jobs: scheduler.JobScheduler) -> None:
+    submit(jobs, "running", 600)
+    submit(jobs, "wrong-file", 300)
+
+    jobs.discard("wrong-file")
+    jobs.finish("running")
+
+    assert DISPATCHED == ["running"]
+    assert jobs.queue_depth() == 0
+
+
+def test_queue_moves_on_once_a_dead_job_lease_expires(
+    jobs: scheduler.JobScheduler,
+) -> None:
+    submit(jobs, "dead-worker", 600)
+    submit(jobs, "queued", 300)
+    # The worker of the admitted job died: it never finishes, its lease expires
+    jobs.client.zadd(jobs.running_key, {"dead-worker": 0})
+
+    async def release_until_dispatched() -> None:
+        releases = asyncio.create_task(scheduler.release_periodically(jobs, 0.01))
+        while DISPATCHED != ["dead-worker", "queued"]:
+            await asyncio.sleep(0.01)
+        releases.cancel()
+
+    asyncio.run(asyncio.wait_for(release_until_dispatched(), timeout=5))
+    assert jobs.queue_depth() == 0
+
+
+def test_stage_priority_ages_towards_the_front() -> None:
+    assert scheduler.stage_priority(300) == 1
+    assert scheduler.stage_priority(4 * 3600) == 5
+    assert scheduler.stage_priority(4 * 3600, waited=3600) == 0
+    assert scheduler.stage_priority(10**9) == scheduler.MAX_PRIORITY
+
+
+def test_occasional_user_goes_between_jobs_of_a_flooding_user(
+    jobs: scheduler.JobScheduler, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(scheduler, "time", SimpleNamespace(time=lambda: clock.now))
+    for idx in range(4):
+        jobs.submit(f"flood-{idx}", FakeCanvas(f"flood-{idx}"), 300, user_id=1)
+    clock.now = 60.0
+    jobs.submit("other", FakeCanvas("other"), 300, user_id=2)
+
+    for job_id in ["flood-0", "other", "flood-1", "flood-2"]:
+        jobs.finish(job_id)
+
+    # The second job of user 1 starts after 300s of its audio, "other" at 60s
+    assert DISPATCHED == ["flood-0", "other", "flood-1", "flood-2", "flood-3"]
+
+
+def test_share_weight_spreads_jobs_less(jobs: scheduler.JobScheduler) -> None:
+    for idx in range(3):
+        jobs.submit(
+            f"heavy-{idx}", FakeCanvas(f"heavy-{idx}"), 300, user_id=1, weight=4
+        )
+
+    scores = [
+        score for _, score in jobs.client.zrange(jobs.queue_key, 0, -1, withscores=True)
+    ]
+
+    assert scores[1] - scores[0] == pytest.approx(75)
+
+
+def test_retry_after_grows_with_queue_depth(
+    jobs: scheduler.JobScheduler, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(scheduler.settings, "ADMISSION_RETRY_AFTER_PER_JOB", 60)
+    assert jobs.retry_after() == 60
+
+    for idx in range(3):
+        submit(jobs, f"job-{idx}", 300)
+
+    assert jobs.retry_after() == 180
+
+
+def test_queued_pipeline_is_dispatched_with_the_recorded_task_ids(
+    jobs: scheduler.JobScheduler,
+    monkeypatch: pytest.MonkeyPatch,
+    memory_backend: None,
+) -> None:
+    sent = []
+
+    def apply_async(canvas: chord) -> AsyncResult:
+        sent.append(pipeline.canvas_task_ids(canvas))
+        return AsyncResult(sent[-1][-1])
+
+    monkeypatch.setattr(chord, "apply_async", apply_async)
+    for job_id in ("running", "queued"):
+        canvas = pipeline.build_pipeline(job_id, f"{job_id}.wav", f"{job_id}.pdf")
+        jobs.submit(job_id, canvas, 600, user_id=1)
+    assert sent == [pipeline.job_task_ids("running")]
+
+    # The queued canvas comes back unpickled from Redis
+    jobs.finish("running")
+
+    assert sent[1] == pipeline.job_task_ids("queued")
+    assert len(set(sent[0] + sent[1])) == len(sent[0]) * 2
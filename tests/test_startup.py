@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+# Seconds from ``import main`` to the first served request, in a cold process
+STARTUP_BUDGET_SECONDS = 5.0
+# Loaded on first use only: S3 client, audio decoding, PDF rendering, models
+DEFERRED_MODULES = (
+    "boto3",
+    "librosa.core",
+    "numba",
+    "weasyprint",
+    "reportlab",
+    "torch",
+    "whisper",
+    "pyannote.audio",
+    "langchain_core",
+)
+
+STARTUP_SCRIPT = f"""
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return (await client.get("/health")).status_code
+
+status = asyncio.run(first_request())
+print(json.dumps({{
+    "import_seconds": imported - started,
+    "first_request_seconds": time.perf_counter() - started,
+    "status": status,
+    "loaded": [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def test_api_starts_fast_without_heavy_imports_or_services() -> None:
+    # Redis, S3 and the database are not running: startup must not need them
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))
+    # Run from the current directory, where settings read their .env
+    completed = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        env={**os.environ, "PYTHONPATH": path},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert completed.returncode == 0, completed.stderr
+    startup = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert startup["status"] == 200
+    assert startup["loaded"] == []
+    assert startup["first_request_seconds"] < STARTUP_BUDGET_SECONDS, startup
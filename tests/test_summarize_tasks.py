@@ -0,0 +1,195 @@
+import threading
+import time
+from typing import Any, List
+
+import fakeredis
+import pytest
+import requests
+from celery.exceptions import Retry
+
+from app.core.config import settings
+from app.schemas.langchain import ExtractedItem
+from app.services import pipeline, scheduler
+from app.services.cache import RedisCache, job_key
+from app.services.summarize import tasks
+
+
+class FailingModel:
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, messages: List[Any]) -> Any:
+        self.calls += 1
+        raise self.error
+
+
+class DirectCache:
+    def invoke(self, model: Any, messages: List[Any], schema: Any) -> Any:
+        return model.invoke(messages)
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> RedisCache:
+    cache = RedisCache.__new__(RedisCache)
+    cache.cache = fakeredis.FakeRedis()
+    monkeypatch.setattr(pipeline, "REDIS_CACHE", cache)
+    monkeypatch.setattr(tasks, "REDIS_CACHE", cache)
+    monkeypatch.setattr(scheduler, "REDIS_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def use_model(monkeypatch: pytest.MonkeyPatch):
+    def use(model: Any) -> None:
+        monkeypatch.setattr(tasks, "get_structured_llm", lambda *_: model)
+        monkeypatch.setattr(tasks, "get_llm_cache", lambda *_: DirectCache())
+        monkeypatch.setattr(tasks, "governed", lambda runnable, *_: runnable)
+
+    return use
+
+
+def section_state(last_attempt: bool) -> dict:
+    return {
+        "context": "[0] [S1]: ship it",
+        "reduce": False,
+        "model": "stub",
+        "job_id": None,
+        "last_attempt": last_attempt,
+    }
+
+
+def test_transient_llm_errors_are_left_to_the_task_retries(use_model) -> None:
+    # Raised by the model pull, not a builtin ConnectionError
+    model = FailingModel(requests.exceptions.ConnectionError("Ollama is down"))
+    use_model(model)
+    node = tasks.make_section_node(["topics", "decisions"])
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        node(section_state(last_attempt=False))
+    assert model.calls == 1
+
+
+def test_sections_fail_on_the_last_attempt_or_on_other_errors(use_model) -> None:
+    node = tasks.make_section_node(["topics", "decisions"])
+
+    use_model(FailingModel(ConnectionError("Ollama is down")))
+    assert node(section_state(last_attempt=True)) == {
+        "failed_sections": ["topics", "decisions"]
+    }
+
+    model = FailingModel(ValueError("invalid structured output"))
+    use_model(model)
+    assert node(section_state(last_attempt=False)) == {
+        "failed_sections": ["topics", "decisions"]
+    }
+    assert model.calls == settings.SECTION_MAX_ATTEMPTS
+
+
+def test_only_a_task_without_retries_left_is_on_its_last_attempt() -> None:
+    assert tasks.is_last_attempt()
+
+    attempts = tasks.summarize_text.max_retries + 1
+    seen = []
+
+    @tasks.c_worker.task(bind=True, max_retries=attempts - 1)
+    def attempt(self: Any) -> None:
+        seen.append(tasks.is_last_attempt())
+        if not seen[-1]:
+            raise self.retry(countdown=0)
+
+    attempt.apply()
+
+    assert seen == [False] * (attempts - 1) + [True]
+
+
+def test_window_waits_for_the_diarization_until_deadline_or_job_end(
+    cache: RedisCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    status = {"job": "running"}
+    monkeypatch.setattr(tasks, "job_status", status.get)
+    later = time.time() + 60
+
+    with pytest.raises(Retry):
+        tasks.summarize_window("job", 0, deadline=later)
+
+    # Past the deadline, summarize_text summarizes the window itself
+    assert tasks.summarize_window("job", 0, deadline=time.time() - 1) is None
+
+    status["job"] = "failed"
+    assert tasks.summarize_window("job", 0, deadline=later) is None
+
+    status["job"] = "running"
+    pipeline.cancel_job("job")
+    assert tasks.summarize_window("job", 0, deadline=later) is None
+
+
+def test_llm_calls_take_the_priority_of_their_job(cache: RedisCache) -> None:
+    now = time.time()
+    cache.put(job_key("meeting", "schedule"), {"duration": 300, "submitted_at": now})
+    cache.put(job_key("lecture", "schedule"), {"duration": 14400, "submitted_at": now})
+
+    assert tasks.job_priority("meeting") < tasks.job_priority("lecture")
+    assert tasks.job_priority("unscheduled") == tasks.job_priority(None) == 0
+    assert tasks.governed(object(), "lecture").priority == scheduler.stage_priority(
+        14400
+    )
+    assert tasks.governed(object(), "lecture", priority=0).priority == 0
+
+
+def test_section_groups_must_cover_every_section_once() -> None:
+    assert tasks.parse_section_groups("summary; topics,decisions ;actions") == [
+        ["summary"],
+        ["topics", "decisions"],
+        ["actions"],
+    ]
+    with pytest.raises(ValueError):
+        tasks.parse_section_groups("summary;topics,topics;decisions;actions")
+    with pytest.raises(ValueError):
+        tasks.parse_section_groups("summary,topics,decisions")
+
+
+def test_section_branches_run_in_parallel_and_join_their_failures(
+    use_model, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        settings, "SUMMARIZATION_SECTION_GROUPS", "summary,topics;decisions;actions"
+    )
+    # Every branch must be running at once to get past the barrier
+    barrier = threading.Barrier(3, timeout=5)
+
+    class SectionModel:
+        def __init__(self, schema: Any) -> None:
+            self.schema = schema
+
+        def invoke(self, messages: List[Any]) -> Any:
+            barrier.wait()
+            fields = set(self.schema.model_fields)
+            if fields & {"decisions", "actions"}:
+                raise ValueError("invalid structured output")
+            return self.schema(
+                summary="Release planning", topics=[ExtractedItem(text="QA")]
+            )
+
+    use_model(None)
+    monkeypatch.setattr(
+        tasks, "get_structured_llm", lambda _, schema: SectionModel(schema)
+    )
+    monkeypatch.setattr(settings, "SECTION_MAX_ATTEMPTS", 1)
+
+    state = tasks.create_graph().invoke(
+        {
+            "messages": [],
+            "job_id": None,
+            "model": "stub",
+            "chunks": ["[0] [S1]: ship it after QA"],
+            "partials": [],
+            "failed_sections": [],
+            "last_attempt": True,
+        }
+    )
+
+    assert state["summary"] == "Release planning"
+    assert [item.text for item in state["topics"]] == ["QA"]
+    assert sorted(state["failed_sections"]) == ["actions", "decisions"]
+    assert "decisions" not in state and "actions" not in state
@@ -0,0 +1,93 @@
+import fakeredis
+import numpy as np
+import pytest
+
+from app.services import pipeline
+from app.services.cache import RedisCache
+from app.services.transcribe.windows import (
+    shift_segments,
+    transcribe_whole,
+    window_bounds,
+)
+
+SR = 1000
+
+
+def speech(seconds: float, silences: list) -> np.ndarray:
+    waveform = np.random.default_rng(0).normal(0, 0.3, int(seconds * SR))
+    for start, end in silences:
+        waveform[int(start * SR) : int(end * SR)] = 0.0
+    return waveform.astype(np.float32)
+
+
+def test_windows_are_cut_in_silences_near_the_boundary() -> None:
+    waveform = speech(25, silences=[(8.0, 8.5), (17.2, 17.6)])
+
+    bounds = window_bounds(waveform, SR, window_seconds=10, search_seconds=3)
+
+    assert len(bounds) == 3
+    assert 8.0 * SR <= bounds[0][1] <= 8.5 * SR
+    assert 17.2 * SR <= bounds[1][1] <= 17.6 * SR
+    # Windows are contiguous, no longer than the target, and cover the audio
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(waveform)
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(bounds, bounds[1:]))
+    assert all(end - start <= 10 * SR for start, end in bounds)
+
+
+def test_short_recording_is_a_single_window() -> None:
+    assert window_bounds(speech(4, silences=[]), SR, window_seconds=10) == [(0, 4000)]
+
+
+def test_window_segments_are_shifted_to_the_recording() -> None:
+    segments = [
+        {
+            "start": 0.5,
+            "end": 2.0,
+            "text": "ship it",
+            "words": [{"start": 0.5, "end": 1.0}, {"start": 1.2, "end": 2.0}],
+        },
+        {"start": 2.5, "end": 3.0, "text": "ok"},
+    ]
+
+    shifted = shift_segments(segments, 300.0)
+
+    assert [(s["start"], s["end"]) for s in shifted] == [(300.5, 302.0), (302.5, 303.0)]
+    assert [(w["start"], w["end"]) for w in shifted[0]["words"]] == [
+        (300.5, 301.0),
+        (301.2, 302.0),
+    ]
+
+
+class CancelledDuringASR:
+    """Whisper stand-in whose job is cancelled while it transcribes."""
+
+    def __init__(self, job_id: str) -> None:
+        self.job_id = job_id
+        self.calls = 0
+
+    def transcribe(self, waveform: np.ndarray, **options) -> dict:
+        self.calls += 1
+        pipeline.cancel_job(self.job_id)
+        return {"segments": [{"start": 0.0, "end": 4.0, "text": "ship it"}]}
+
+
+def test_short_recording_stops_around_the_asr_on_cancellation(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = RedisCache.__new__(RedisCache)
+    cache.cache = fakeredis.FakeRedis()
+    monkeypatch.setattr(pipeline, "REDIS_CACHE", cache)
+    waveform = speech(4, silences=[])
+
+    model = CancelledDuringASR("job")
+    with pytest.raises(pipeline.JobCancelled):
+        transcribe_whole(model, waveform, "job", word_timestamps=True)
+    assert model.calls == 1
+
+    # A job cancelled before its ASR started is not transcribed at all
+    with pytest.raises(pipeline.JobCancelled):
+        transcribe_whole(model, waveform, "job")
+    assert model.calls == 1
+
+    segments = transcribe_whole(CancelledDuringASR("other"), waveform, None)
+    assert [s["text"] for s in segments] == ["ship it"]